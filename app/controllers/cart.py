@@ -1,23 +1,29 @@
 import json
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from sqlalchemy.orm import Session
 
 from app.controllers.auth import get_current_user
 from app.db.database import get_db
-from app.schemas.cart import (CartItemCreate, CartItemResponse, CartItemUpdate,
+from app.schemas.cart import (CartBatchRequest, CartDeltaResponse,
+                              CartItemCreate, CartItemResponse, CartItemUpdate,
                               CartResponse, CartSummaryResponse)
 from app.schemas.order import OrderCreate, OrderResponse  # Nuevo import
-from app.services.cart_service import (add_item_to_cart, checkout_cart,
+from app.services.cart_service import (add_item_to_cart,
+                                       apply_cart_operations, checkout_cart,
                                        clear_cart, get_cart_summary,
                                        get_cart_with_items,
                                        remove_item_from_cart, update_cart_item)
+from app.services.idempotency_service import IdempotencyError, run_idempotent
 from app.services.table_service import get_available_tables
 from app.websocket.websocket_manager import notify_new_order
 
 router = APIRouter(prefix="/cart", tags=["cart"])
 
+# ?delta=true: solo las líneas que cambiaron, los totales y la versión del carrito
+CartMutationResponse = Union[CartDeltaResponse, CartResponse]
+
 @router.get("/", response_model=CartResponse)
 def get_my_cart(
     db: Session = Depends(get_db),
@@ -46,59 +52,79 @@ def get_cart_summary_route(
         )
     return summary
 
-@router.post("/items", response_model=CartResponse)
+@router.post("/items", response_model=CartMutationResponse)
 def add_cart_item(
     item: CartItemCreate,
+    delta: bool = False,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     """Agregar item al carrito."""
     try:
-        return add_item_to_cart(db, current_user.id, item)
+        return add_item_to_cart(db, current_user.id, item, delta=delta)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.post("/items/batch", response_model=CartMutationResponse)
+def apply_cart_batch(
+    batch: CartBatchRequest,
+    delta: bool = False,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Aplicar varias operaciones (add / update / remove) al carrito en una transacción."""
+    try:
+        return apply_cart_operations(db, current_user.id, batch.operations, delta=delta)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
 
-@router.put("/items/{item_id}", response_model=CartResponse)
+@router.put("/items/{item_id}", response_model=CartMutationResponse)
 def update_cart_item_route(
     item_id: int,
     item_update: CartItemUpdate,
+    delta: bool = False,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     """Actualizar item del carrito."""
     try:
-        return update_cart_item(db, current_user.id, item_id, item_update)
+        return update_cart_item(db, current_user.id, item_id, item_update, delta=delta)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
 
-@router.delete("/items/{item_id}", response_model=CartResponse)
+@router.delete("/items/{item_id}", response_model=CartMutationResponse)
 def remove_cart_item(
     item_id: int,
+    delta: bool = False,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     """Eliminar item del carrito."""
     try:
-        return remove_item_from_cart(db, current_user.id, item_id)
+        return remove_item_from_cart(db, current_user.id, item_id, delta=delta)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
         )
 
-@router.delete("/clear", response_model=CartResponse)
+@router.delete("/clear", response_model=CartMutationResponse)
 def clear_my_cart(
+    delta: bool = False,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     """Vaciar todo el carrito."""
-    return clear_cart(db, current_user.id)
+    return clear_cart(db, current_user.id, delta=delta)
 
 @router.post("/checkout", response_model=dict)
 def checkout_cart_old(
@@ -109,8 +135,8 @@ def checkout_cart_old(
     Convertir carrito en orden (esto conecta con el sistema de órdenes existente).
     En una implementación completa, esto crearía una orden desde el carrito.
     """
-    cart = get_cart_with_items(db, current_user.id)
-    if not cart or not cart.items:
+    summary = get_cart_summary(db, current_user.id)
+    if not summary or not summary["items_count"]:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Carrito vacío"
@@ -120,29 +146,26 @@ def checkout_cart_old(
     # Por ahora retornamos un mensaje informativo
     return {
         "message": "Checkout iniciado",
-        "cart_id": cart.id,
-        "total_items": len(cart.items),
-        "total_amount": sum(item.quantity * item.product.price for item in cart.items)
+        "cart_id": summary["id"],
+        "total_items": summary["items_count"],
+        "total_amount": summary["total_amount"]
     }
 
 @router.post("/checkout-with-table", response_model=OrderResponse)
 async def checkout_cart_with_table(
     order_data: Dict[str, Any],
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     """
     Convertir carrito en orden con selección de mesa.
+    Con la cabecera Idempotency-Key, los reintentos reciben el mismo pedido
+    sin volver a vaciar el carrito ni avisar a la cocina.
     """
-    try:
-        # Validar mesa si es dine_in
-        if order_data.get('order_type') == 'dine_in' and order_data.get('table_id'):
-            available_tables = get_available_tables(db)
-            table_ids = [table.id for table in available_tables]
-            if order_data['table_id'] not in table_ids:
-                raise ValueError("Mesa no disponible")
-        
-        # Crear la orden desde el carrito
+    async def place_order():
+        # Crear la orden desde el carrito (create_order ocupa la mesa si es dine_in)
         order = checkout_cart(db, current_user.id, order_data)
         
         # 🔥 OBTENER LA ORDEN COMPLETA CON TODAS LAS RELACIONES
@@ -193,8 +216,14 @@ async def checkout_cart_with_table(
         
         print(f"📢 NOTIFICACIÓN CARRITO ENVIADA: Orden #{complete_order.id}")
         
-        return complete_order
-        
+        return complete_order.id, OrderResponse.model_validate(complete_order).model_dump(mode="json")
+
+    try:
+        result, replayed = await run_idempotent(
+            db, current_user.id, idempotency_key, "POST /cart/checkout-with-table", order_data, place_order
+        )
+    except IdempotencyError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -206,6 +235,10 @@ async def checkout_cart_with_table(
             detail=f"Error al procesar pedido: {str(e)}"
         )
 
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
 
 @router.get("/available-tables", response_model=List[Dict[str, Any]])
 def get_available_tables_for_checkout(
@@ -216,11 +249,7 @@ def get_available_tables_for_checkout(
     Obtener mesas disponibles para checkout.
     """
     try:
-        tables = get_available_tables(db)
-        
-        # Filtrar por capacidad si se especifica
-        if capacity:
-            tables = [table for table in tables if table.capacity >= capacity]
+        tables = get_available_tables(db, capacity=capacity)
         
         # Formatear respuesta
         result = []
@@ -18,6 +18,7 @@ from app.services.category_service import (create_category, delete_category,
                                            get_category_by_id,
                                            get_category_with_products,
                                            update_category)
+from app.services.image_cleanup_service import wake_image_cleanup_worker
 from app.services.image_service import image_service
 
 router = APIRouter(prefix="/categories", tags=["categories"])
@@ -175,43 +176,36 @@ async def update_existing_category(
         
         # Si se proporciona una URL de imagen manualmente
         if url_image is not None:
-            # Si hay una imagen anterior en Firebase, eliminarla
-            await image_service.delete_image_if_exists(
-                image_url=db_category.url_image,
-                db_model=db_category,
-                db=db,
-                model_field="url_image"
-            )
-            update_data["url_image"] = url_image
+            # Las URLs de nuestro bucket suman una referencia; la anterior se libera
+            image_service.replace_image_url(db, db_category, url_image, model_field="url_image")
         
         # Si se sube una nueva imagen
         elif image:
-            # Eliminar imagen anterior si existe
-            await image_service.delete_image_if_exists(
-                image_url=db_category.url_image,
-                db_model=db_category,
-                db=db,
-                model_field="url_image"
-            )
-            
-            # Subir nueva imagen
-            new_image_url = await image_service.upload_and_save_image(
-                file=image,
+            # Subir la nueva imagen y encolar el borrado de la anterior
+            await image_service.replace_image(
+                db,
+                db_category,
+                image,
                 folder="categories",
-                db_model=db_category,
-                db=db,
                 model_field="url_image"
             )
-            update_data["url_image"] = new_image_url
         
-        # Actualizar categoría
+        # Actualizar categoría (un único commit)
         if update_data:
             category_update = CategoryUpdate(**update_data)
             db_category = update_category(db, category_id=category_id, category_update=category_update)
+        else:
+            db.commit()
+            db.refresh(db_category)
         
+        wake_image_cleanup_worker()
         return db_category
         
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al actualizar categoría: {str(e)}"
@@ -243,13 +237,15 @@ async def delete_existing_category(
             detail="Categoría no encontrada"
         )
     
-    # Eliminar imagen de Firebase si existe
+    # Liberar la imagen; el borrado en Firebase se hace en segundo plano
     await image_service.delete_image_if_exists(
-        image_url=db_category.url_image
+        image_url=db_category.url_image,
+        db=db
     )
     
     # Eliminar categoría de la base de datos
     db_category = delete_category(db, category_id=category_id)
+    wake_image_cleanup_worker()
     
     return {
         "message": "Categoría eliminada correctamente",
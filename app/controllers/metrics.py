@@ -0,0 +1,62 @@
+import os
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import Session
+
+from app.db.database import get_db
+from app.monitoring.metrics import registry, websocket_connections
+from app.services.auth import verify_token
+from app.services.user_service import get_user_by_email
+from app.websocket.client_manager import client_manager
+from app.websocket.websocket_manager import manager
+
+router = APIRouter(tags=["metrics"])
+
+# Token del scrape de Prometheus; sin él, /metrics solo responde a administradores
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+# Solo para redes internas donde /metrics no es alcanzable desde afuera
+METRICS_PUBLIC = os.getenv("METRICS_PUBLIC", "false").lower() == "true"
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"  # Starlette añade el charset
+
+websocket_connections.set_function(
+    lambda: len(manager.active_connections),
+    channel="orders"
+)
+websocket_connections.set_function(
+    lambda: sum(len(connections) for connections in client_manager.active_connections.values()),
+    channel="clients"
+)
+
+
+def _is_admin(db: Session, token: str) -> bool:
+    token_data = verify_token(token)
+    if token_data is None:
+        return False
+    user = get_user_by_email(db, email=token_data.email)
+    return user is not None and user.role == "administrador"
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def read_metrics(authorization: str = Header(None), db: Session = Depends(get_db)):
+    """
+    Métricas en formato de texto de Prometheus. Requiere METRICS_TOKEN o el
+    token de un administrador (salvo METRICS_PUBLIC=true).
+    """
+    if not METRICS_PUBLIC:
+        scheme, _, token = (authorization or "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Se requiere autenticación para las métricas",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        if not (METRICS_TOKEN and secrets.compare_digest(token.encode(), METRICS_TOKEN.encode())) and not _is_admin(db, token):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token de métricas inválido",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
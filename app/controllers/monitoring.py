@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from sqlalchemy.orm import Session
+
+from app.controllers.auth import get_current_admin
+from app.db.database import get_db
+from app.monitoring.profiler import profile_store
+from app.monitoring.slow_queries import slow_query_log
+from app.services.cart_cleanup_service import (CART_ABANDONED_DAYS,
+                                               sweep_abandoned_carts)
+
+router = APIRouter(prefix="/admin", tags=["monitoring"], dependencies=[Depends(get_current_admin)])
+
+@router.get("/slow-queries")
+def read_slow_queries(limit: int = Query(50, ge=1, le=500)):
+    """
+    Consultas SQL que superaron el umbral, de la más reciente a la más antigua (Solo administradores).
+    """
+    return {
+        "threshold_ms": slow_query_log.threshold_ms,
+        "entries": slow_query_log.entries(limit)
+    }
+
+@router.delete("/slow-queries")
+def clear_slow_queries():
+    """
+    Vaciar el log de consultas lentas (Solo administradores).
+    """
+    slow_query_log.clear()
+    return {"message": "Log de consultas lentas vaciado"}
+
+@router.get("/profiles")
+def read_profiles(limit: int = Query(50, ge=1, le=500)):
+    """
+    Perfiles de CPU capturados, del más reciente al más antiguo (Solo administradores).
+    Se capturan con la cabecera X-Profile o por muestreo (PROFILE_SAMPLE_RATE).
+    El tiempo del event loop incluye las peticiones async concurrentes.
+    """
+    return profile_store.entries(limit)
+
+@router.get("/profiles/{profile_id}")
+def read_profile(profile_id: str, format: str = Query("json", pattern="^(json|text)$")):
+    """
+    Detalle de un perfil: funciones más costosas y tiempo por categoría (Solo administradores).
+    `profile_id` es el de la cabecera X-Profile-ID de la respuesta perfilada.
+    """
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Perfil no encontrado"
+        )
+    if format == "text":
+        return PlainTextResponse((profile.report or {}).get("text", ""))
+    return profile.to_dict()
+
+@router.delete("/profiles")
+def clear_profiles():
+    """
+    Vaciar los perfiles almacenados (Solo administradores).
+    """
+    profile_store.clear()
+    return {"message": "Perfiles eliminados"}
+
+@router.post("/carts/sweep")
+def sweep_carts(
+    days: int = Query(CART_ABANDONED_DAYS, ge=1),
+    dry_run: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    Eliminar ahora los carritos sin cambios en `days` días (Solo administradores).
+    Con dry_run=true solo cuenta los carritos y líneas que se eliminarían.
+    """
+    return sweep_abandoned_carts(db, days=days, dry_run=dry_run)
@@ -2,16 +2,19 @@ import json
 import logging
 from typing import List, Optional
 
-from fastapi import (APIRouter, BackgroundTasks, Depends, HTTPException, Query,
-                     WebSocket, WebSocketDisconnect, status)
+from fastapi import (APIRouter, BackgroundTasks, Depends, Header,
+                     HTTPException, Query, Response, WebSocket,
+                     WebSocketDisconnect, status)
 from sqlalchemy.orm import Session
 
 from app.controllers.auth import get_current_admin, get_current_user
 from app.db.database import SessionLocal, get_db
 from app.schemas.order import OrderCreate, OrderResponse, OrderUpdate
+from app.services.idempotency_service import IdempotencyError, run_idempotent
 from app.services.order_service import (create_order, delete_order,
                                         get_order_by_id, get_orders,
                                         update_order, update_order_status)
+from app.services.pagination import next_cursor
 from app.websocket.websocket_manager import manager, notify_new_order
 
 # Agregar logger
@@ -22,13 +25,16 @@ router = APIRouter(prefix="/orders", tags=["orders"])
 @router.post("/", response_model=OrderResponse)
 async def create_new_order(
     order: OrderCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     """
     Crear un nuevo pedido (Delivery o Dine-in).
+    Con la cabecera Idempotency-Key, los reintentos reciben el mismo pedido.
     """
-    try:
+    async def place_order():
         new_order = create_order(db=db, order=order, user_id=current_user.id)
         
         # 🔥 OBTENER LA ORDEN COMPLETA CON TODAS LAS RELACIONES
@@ -78,13 +84,23 @@ async def create_new_order(
         
         print(f"📢 NOTIFICACIÓN ENVIADA: Orden #{complete_order.id}")
         
-        return complete_order
-        
+        return complete_order.id, OrderResponse.model_validate(complete_order).model_dump(mode="json")
+
+    try:
+        result, replayed = await run_idempotent(
+            db, current_user.id, idempotency_key, "POST /orders/", order.model_dump(mode="json"), place_order
+        )
+    except IdempotencyError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
     
 
 @router.websocket("/ws")
@@ -119,17 +135,41 @@ async def websocket_endpoint(websocket: WebSocket):
         logger.error(f"Error en WebSocket: {e}")
         manager.disconnect(websocket)
 
+def _get_orders_page(
+    db: Session,
+    response: Response,
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    user_id: int = None
+):
+    try:
+        orders = get_orders(db, skip=skip, limit=limit, user_id=user_id, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    following = next_cursor(orders, limit)
+    if following:
+        response.headers["X-Next-Cursor"] = following
+    return orders
+
 @router.get("/my-orders", response_model=List[OrderResponse])
 def read_my_orders(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor de la cabecera X-Next-Cursor (ignora skip)"),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     """
     Obtener los pedidos del usuario actual.
+    La página siguiente se pide con el cursor de la cabecera X-Next-Cursor.
     """
-    orders = get_orders(db, skip=skip, limit=limit, user_id=current_user.id)
+    orders = _get_orders_page(db, response, skip, limit, cursor, user_id=current_user.id)
     
     # 🔥 CORREGIR: Convertir extras para incluir extra_name
     result = []
@@ -184,15 +224,18 @@ def read_order(
 # Rutas de administrador
 @router.get("/", response_model=List[OrderResponse])
 def read_all_orders(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor de la cabecera X-Next-Cursor (ignora skip)"),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_admin)
 ):
     """
     Obtener todos los pedidos (Solo administradores).
+    La página siguiente se pide con el cursor de la cabecera X-Next-Cursor.
     """
-    return get_orders(db, skip=skip, limit=limit)
+    return _get_orders_page(db, response, skip, limit, cursor)
 
 @router.put("/{order_id}", response_model=OrderResponse)
 def update_existing_order(
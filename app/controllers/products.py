@@ -8,8 +8,11 @@ from sqlalchemy.orm import Session
 from app.controllers.auth import get_current_admin, get_current_user
 from app.db.database import get_db
 from app.models.product import Product
-from app.schemas.product import (ProductCreate, ProductCreateWithImage,
-                                 ProductResponse, ProductUpdate)
+from app.schemas.product import (AutocompleteSuggestion, ProductCreate,
+                                 ProductCreateWithImage, ProductResponse,
+                                 ProductUpdate)
+from app.services.autocomplete_service import autocomplete
+from app.services.image_cleanup_service import wake_image_cleanup_worker
 from app.services.image_service import image_service
 from app.services.product_service import (create_product, delete_product,
                                           get_product_by_id, get_products,
@@ -50,7 +53,8 @@ def search_products_endpoint(
     db: Session = Depends(get_db)
 ):
     """
-    Buscar productos por nombre, descripción o SKU.
+    Buscar productos por nombre o descripción (sin acentos, plurales ni
+    mayúsculas), ordenados por relevancia.
     """
     return search_products(
         db=db,
@@ -62,6 +66,19 @@ def search_products_endpoint(
     )
 
 
+@router.get("/autocomplete", response_model=List[AutocompleteSuggestion])
+def autocomplete_products(
+    q: str = Query(..., min_length=1, max_length=100, description="Texto escrito hasta el momento"),
+    limit: int = Query(8, ge=1, le=20),
+    db: Session = Depends(get_db)
+):
+    """
+    Sugerencias de productos y categorías mientras se escribe, tolerantes a
+    errores ("cebiche" → Ceviche). Se responde desde memoria.
+    """
+    return autocomplete(db, q, limit=limit)
+
+
 @router.get("/{product_id}", response_model=ProductResponse)
 def read_product(product_id: int, db: Session = Depends(get_db)):
     """
@@ -168,43 +185,36 @@ async def update_existing_product(
         
         # Si se proporciona una URL de imagen manualmente
         if image_url is not None:
-            # Si hay una imagen anterior en Firebase, eliminarla
-            await image_service.delete_image_if_exists(
-                image_url=db_product.image_url,
-                db_model=db_product,
-                db=db,
-                model_field="image_url"
-            )
-            update_data["image_url"] = image_url
+            # Las URLs de nuestro bucket suman una referencia; la anterior se libera
+            image_service.replace_image_url(db, db_product, image_url, model_field="image_url")
         
         # Si se sube una nueva imagen
         elif image:
-            # Eliminar imagen anterior si existe
-            await image_service.delete_image_if_exists(
-                image_url=db_product.image_url,
-                db_model=db_product,
-                db=db,
-                model_field="image_url"
-            )
-            
-            # Subir nueva imagen
-            new_image_url = await image_service.upload_and_save_image(
-                file=image,
+            # Subir la nueva imagen y encolar el borrado de la anterior
+            await image_service.replace_image(
+                db,
+                db_product,
+                image,
                 folder="products",
-                db_model=db_product,
-                db=db,
                 model_field="image_url"
             )
-            update_data["image_url"] = new_image_url
         
-        # Actualizar producto con los datos restantes
+        # Actualizar producto con los datos restantes (un único commit)
         if update_data:
             product_update = ProductUpdate(**update_data)
             db_product = update_product(db, product_id=product_id, product_update=product_update)
+        else:
+            db.commit()
+            db.refresh(db_product)
         
+        wake_image_cleanup_worker()
         return db_product
         
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al actualizar producto: {str(e)}"
@@ -228,22 +238,16 @@ async def update_product_image_only(
                 detail="Producto no encontrado"
             )
         
-        # Eliminar imagen anterior si existe
-        await image_service.delete_image_if_exists(
-            image_url=db_product.image_url,
-            db_model=db_product,
-            db=db,
-            model_field="image_url"
-        )
-        
-        # Subir nueva imagen
-        new_image_url = await image_service.upload_and_save_image(
-            file=image,
+        # Subir la nueva imagen y encolar el borrado de la anterior
+        new_image_url = await image_service.replace_image(
+            db,
+            db_product,
+            image,
             folder="products",
-            db_model=db_product,
-            db=db,
             model_field="image_url"
         )
+        db.commit()
+        wake_image_cleanup_worker()
         
         return {
             "message": "Imagen actualizada exitosamente",
@@ -252,6 +256,7 @@ async def update_product_image_only(
         }
         
     except Exception as e:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al actualizar imagen: {str(e)}"
@@ -274,13 +279,15 @@ async def delete_existing_product(
             detail="Producto no encontrado"
         )
     
-    # Eliminar imagen de Firebase si existe
+    # Liberar la imagen; el borrado en Firebase se hace en segundo plano
     await image_service.delete_image_if_exists(
-        image_url=db_product.image_url
+        image_url=db_product.image_url,
+        db=db
     )
     
     # Eliminar producto de la base de datos
     db_product = delete_product(db, product_id=product_id)
+    wake_image_cleanup_worker()
     
     return {"message": "Producto eliminado correctamente"}
 
@@ -0,0 +1,124 @@
+from datetime import date, datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.controllers.auth import get_current_admin, get_current_user
+from app.db.database import get_db
+from app.schemas.reservation import (FreeTableResponse, ReservationCreate,
+                                     ReservationResponse)
+from app.services.reservation_service import (cancel_reservation,
+                                              create_reservation,
+                                              find_free_tables,
+                                              get_reservation_by_id,
+                                              get_reservations)
+
+router = APIRouter(prefix="/reservations", tags=["reservations"])
+
+# Rutas estáticas antes de /{reservation_id} para que no se interpreten como ID
+@router.get("/availability", response_model=List[FreeTableResponse])
+def read_availability(
+    party_size: int = Query(..., ge=1, description="Número de personas"),
+    starts_at: datetime = Query(..., description="Inicio (UTC)"),
+    ends_at: Optional[datetime] = Query(None, description="Fin (UTC)"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Mesas libres para el grupo en el horario, de mejor a peor ajuste
+    (menos asientos vacíos primero).
+    """
+    try:
+        return find_free_tables(db, party_size, starts_at, ends_at, limit=limit)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.post("/", response_model=ReservationResponse)
+def create_new_reservation(
+    reservation: ReservationCreate,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Reservar una mesa. Sin table_id se asigna la de mejor ajuste.
+    """
+    try:
+        return create_reservation(db, current_user.id, reservation)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.get("/me", response_model=List[ReservationResponse])
+def read_my_reservations(
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Obtener las reservas confirmadas del usuario actual.
+    """
+    return get_reservations(db, user_id=current_user.id)
+
+@router.get("/{reservation_id}", response_model=ReservationResponse)
+def read_reservation(
+    reservation_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Obtener una reserva específica por ID.
+    """
+    db_reservation = get_reservation_by_id(db, reservation_id)
+    if db_reservation is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Reserva no encontrada"
+        )
+    if current_user.role != "administrador" and db_reservation.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permisos para ver esta reserva"
+        )
+    return db_reservation
+
+@router.patch("/{reservation_id}/cancel", response_model=ReservationResponse)
+def cancel_existing_reservation(
+    reservation_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Cancelar una reserva (el usuario que la hizo o un administrador).
+    """
+    db_reservation = get_reservation_by_id(db, reservation_id)
+    if db_reservation is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Reserva no encontrada"
+        )
+    if current_user.role != "administrador" and db_reservation.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permisos para cancelar esta reserva"
+        )
+    return cancel_reservation(db, reservation_id)
+
+# Rutas de administrador
+@router.get("/", response_model=List[ReservationResponse])
+def read_reservations(
+    day: Optional[date] = Query(None, description="Día (UTC)"),
+    include_cancelled: bool = Query(False),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_admin)
+):
+    """
+    Obtener las reservas, por día (Solo administradores).
+    """
+    return get_reservations(db, day=day, include_cancelled=include_cancelled, skip=skip, limit=limit)
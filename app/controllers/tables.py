@@ -5,12 +5,17 @@ from sqlalchemy.orm import Session
 
 from app.controllers.auth import get_current_admin, get_current_user
 from app.db.database import get_db
-from app.schemas.table import (TableCreate, TablePositionUpdate, TableResponse,
-                               TableUpdate)
+from app.schemas.table import (FloorTableResponse, TableCreate,
+                               TablePositionBatch, TablePositionUpdate,
+                               TableResponse, TableUpdate)
 from app.services.table_service import (create_table, delete_table,
-                                        get_available_tables, get_table_by_id,
-                                        get_tables, get_tables_with_status,
-                                        update_table, update_table_position)
+                                        get_available_tables, get_floor_tables,
+                                        get_nearest_free_tables,
+                                        get_position_collisions,
+                                        get_table_by_id, get_tables,
+                                        get_tables_with_status, update_table,
+                                        update_table_position,
+                                        update_table_positions)
 
 router = APIRouter(prefix="/tables", tags=["tables"])
 
@@ -35,6 +40,100 @@ def read_available_tables(db: Session = Depends(get_db)):
     """
     return get_available_tables(db)
 
+# Rutas estáticas antes de /{table_id} para que no se interpreten como ID
+@router.get("/available-for-order", response_model=List[TableResponse])
+def read_available_tables_for_order(
+    capacity: Optional[int] = Query(None, description="Filtrar por capacidad mínima"),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtener mesas disponibles para realizar un pedido.
+    Incluye información de capacidad y posición.
+    """
+    try:
+        return get_available_tables(db, capacity=capacity)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al obtener mesas disponibles: {str(e)}"
+        )
+
+@router.get("/with-status", response_model=List[dict])
+def get_tables_with_order_status(db: Session = Depends(get_db)):
+    """
+    Obtener todas las mesas con su estado actual (disponible/ocupada)
+    y información de órdenes activas.
+    """
+    try:
+        return get_tables_with_status(db)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al obtener estado de mesas: {str(e)}"
+        )
+
+@router.get("/floor", response_model=List[FloorTableResponse])
+def read_floor_tables(
+    min_x: float = Query(..., description="Vista del plano: esquina superior izquierda"),
+    min_y: float = Query(...),
+    max_x: float = Query(..., description="Vista del plano: esquina inferior derecha"),
+    max_y: float = Query(...),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtener solo las mesas dentro de la vista del plano.
+    """
+    if max_x < min_x or max_y < min_y:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Vista del plano inválida"
+        )
+    return get_floor_tables(db, min_x, min_y, max_x, max_y)
+
+@router.get("/nearest-free", response_model=List[FloorTableResponse])
+def read_nearest_free_tables(
+    x: float = Query(...),
+    y: float = Query(...),
+    capacity: Optional[int] = Query(None, ge=1, description="Capacidad mínima"),
+    limit: int = Query(1, ge=1, le=20),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtener las mesas disponibles más cercanas a un punto del plano.
+    """
+    return get_nearest_free_tables(db, x, y, capacity=capacity, limit=limit)
+
+@router.get("/collisions", response_model=List[FloorTableResponse])
+def read_position_collisions(
+    x: float = Query(...),
+    y: float = Query(...),
+    table_id: Optional[int] = Query(None, description="Mesa que se está moviendo"),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_admin)
+):
+    """
+    Mesas con las que chocaría una mesa en (x, y) (Solo administradores).
+    """
+    return get_position_collisions(db, x, y, table_id=table_id)
+
+@router.patch("/positions", response_model=List[FloorTableResponse])
+def update_table_positions_route(
+    batch: TablePositionBatch,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_admin)
+):
+    """
+    Mover una o varias mesas con un solo commit (Solo administradores).
+    El editor del plano la llama al soltar, una vez por gesto de arrastre.
+    """
+    try:
+        return update_table_positions(db, batch.positions)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
 @router.get("/{table_id}", response_model=TableResponse)
 def read_table(table_id: int, db: Session = Depends(get_db)):
     """
@@ -99,8 +198,15 @@ def update_table_position_route(
 ):
     """
     Actualizar la posición de una mesa en el plano (Solo administradores).
+    Para arrastrar mesas, PATCH /tables/positions al soltar.
     """
-    db_table = update_table_position(db, table_id=table_id, position_update=position)
+    try:
+        db_table = update_table_position(db, table_id=table_id, position_update=position)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     if db_table is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -124,41 +230,3 @@ def delete_existing_table(
             detail="Mesa no encontrada"
         )
     return {"message": "Mesa eliminada correctamente"}
-
-
-@router.get("/available-for-order", response_model=List[TableResponse])
-def read_available_tables_for_order(
-    capacity: Optional[int] = Query(None, description="Filtrar por capacidad mínima"),
-    db: Session = Depends(get_db)
-):
-    """
-    Obtener mesas disponibles para realizar un pedido.
-    Incluye información de capacidad y posición.
-    """
-    try:
-        tables = get_available_tables(db)
-        
-        # Filtrar por capacidad si se especifica
-        if capacity:
-            tables = [table for table in tables if table.capacity >= capacity]
-            
-        return tables
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error al obtener mesas disponibles: {str(e)}"
-        )
-
-@router.get("/with-status", response_model=List[dict])
-def get_tables_with_order_status(db: Session = Depends(get_db)):
-    """
-    Obtener todas las mesas con su estado actual (disponible/ocupada)
-    y información de órdenes activas.
-    """
-    try:
-        return get_tables_with_status(db)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error al obtener estado de mesas: {str(e)}"
-        )
\ No newline at end of file
@@ -1,17 +1,34 @@
+from sqlalchemy import inspect
+
 from app.models.cart import Cart, CartItem
 from app.models.category import Category
 from app.models.favorite import Favorite
+from app.models.idempotency_key import IdempotencyKey
+from app.models.image_cleanup_job import ImageCleanupJob
 from app.models.order import Order
+from app.models.order_review import OrderReview
 from app.models.product import Product
+from app.models.reservation import Reservation
 from app.models.review import Review
+from app.models.stored_image import StoredImage
 from app.models.table import Table
 from app.models.user import User
 from app.models.extra import Extra
 
 from .database import Base, engine
+from .migrate import pending_migrations, upgrade
 
 
 def create_tables():
     print("Creando tablas en la base de datos...")
+    fresh = not inspect(engine).get_table_names()
     Base.metadata.create_all(bind=engine)
-    print("Tablas creadas exitosamente!")
\ No newline at end of file
+    if fresh:
+        # Las tablas ya coinciden con los modelos: las migraciones solo agregan
+        # lo que create_all no crea (índices propios de cada motor)
+        upgrade(engine)
+    else:
+        pending = pending_migrations(engine)
+        if pending:
+            print(f"⚠️  {len(pending)} migraciones pendientes ({', '.join(m.version for m in pending)}): python migrate.py")
+    print("Tablas creadas exitosamente!")
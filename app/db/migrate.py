@@ -0,0 +1,320 @@
+"""
+Migraciones del esquema (app/db/migrations/NNNN_nombre.py).
+
+Cada módulo define upgrade(conn) y downgrade(conn) y se aplica en orden de
+versión; la tabla schema_migrations guarda las aplicadas. Un módulo con
+`transactional = False` se ejecuta en autocommit (necesario para CREATE INDEX
+CONCURRENTLY en Postgres). Las operaciones de este módulo son idempotentes y
+no bloquean escrituras donde el motor lo permite.
+"""
+import importlib
+import os
+import pkgutil
+from datetime import datetime
+from types import ModuleType
+from typing import List, Optional, Sequence
+
+from sqlalchemy import (Column, DateTime, MetaData, String, Table, inspect,
+                        select, text)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.schema import CreateColumn
+
+MIGRATIONS_PACKAGE = "app.db.migrations"
+
+# Tabla de control: una fila por migración aplicada
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", String(32), primary_key=True),
+    Column("name", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+MIGRATION_TEMPLATE = '''"""
+{description}
+"""
+from app.db.migrate import create_index, drop_index
+
+# False: autocommit (CREATE INDEX CONCURRENTLY en Postgres)
+transactional = True
+
+
+def upgrade(conn):
+    pass
+
+
+def downgrade(conn):
+    pass
+'''
+
+
+class Migration:
+    def __init__(self, version: str, name: str, module: ModuleType):
+        self.version = version
+        self.name = name
+        self.module = module
+
+    @property
+    def description(self) -> str:
+        return (self.module.__doc__ or self.name).strip().splitlines()[0]
+
+    @property
+    def transactional(self) -> bool:
+        return getattr(self.module, "transactional", True)
+
+
+def discover_migrations() -> List[Migration]:
+    """
+    Migraciones de app/db/migrations (archivos NNNN_nombre.py) en orden de versión
+    """
+    package = importlib.import_module(MIGRATIONS_PACKAGE)
+    migrations = []
+    for module_info in pkgutil.iter_modules(package.__path__):
+        version, _, name = module_info.name.partition("_")
+        if not version.isdigit():
+            continue
+        module = importlib.import_module(f"{MIGRATIONS_PACKAGE}.{module_info.name}")
+        migrations.append(Migration(version=version, name=name, module=module))
+    migrations.sort(key=lambda migration: migration.version)
+
+    versions = [migration.version for migration in migrations]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError(f"Versiones de migración duplicadas: {versions}")
+    return migrations
+
+
+def applied_versions(conn: Connection) -> set:
+    _metadata.create_all(bind=conn, tables=[schema_migrations])
+    return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def pending_migrations(engine: Engine) -> List[Migration]:
+    with engine.begin() as conn:
+        applied = applied_versions(conn)
+    return [migration for migration in discover_migrations() if migration.version not in applied]
+
+
+def _find(version: str, migrations: List[Migration]) -> Migration:
+    if version == "head":
+        return migrations[-1]
+    for migration in migrations:
+        if migration.version == version.zfill(len(migration.version)):
+            return migration
+    raise ValueError(f"Migración {version} no encontrada")
+
+
+def _run(engine: Engine, migration: Migration, direction: str):
+    if migration.transactional:
+        with engine.begin() as conn:
+            getattr(migration.module, direction)(conn)
+    else:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            getattr(migration.module, direction)(conn)
+
+
+def _record(conn: Connection, migration: Migration):
+    conn.execute(schema_migrations.insert().values(
+        version=migration.version,
+        name=migration.name,
+        applied_at=datetime.utcnow()
+    ))
+
+
+def upgrade(engine: Engine, target: str = "head") -> List[Migration]:
+    """
+    Aplicar las migraciones pendientes hasta `target`, cada una en su propia
+    transacción. En MySQL el DDL hace commit implícito: las migraciones deben
+    ser idempotentes.
+    """
+    migrations = discover_migrations()
+    if not migrations:
+        return []
+    last = _find(target, migrations).version
+    applied = []
+    for migration in pending_migrations(engine):
+        if migration.version > last:
+            break
+        _run(engine, migration, "upgrade")
+        with engine.begin() as conn:
+            _record(conn, migration)
+        applied.append(migration)
+    return applied
+
+
+def downgrade(engine: Engine, version: str) -> Migration:
+    """
+    Revertir una migración aplicada y borrar su registro
+    """
+    migration = _find(version, discover_migrations())
+    with engine.begin() as conn:
+        if migration.version not in applied_versions(conn):
+            raise ValueError(f"La migración {migration.version} no está aplicada")
+    _run(engine, migration, "downgrade")
+    with engine.begin() as conn:
+        conn.execute(schema_migrations.delete().where(schema_migrations.c.version == migration.version))
+    return migration
+
+
+def stamp(engine: Engine, target: str = "head") -> List[Migration]:
+    """
+    Marcar como aplicadas las migraciones hasta `target` sin ejecutarlas (y
+    como pendientes las posteriores). Para bases de datos cuyo esquema ya
+    coincide, p. ej. recién creadas con create_all.
+    """
+    migrations = discover_migrations()
+    if not migrations:
+        return []
+    last = _find(target, migrations).version
+    stamped = []
+    with engine.begin() as conn:
+        applied = applied_versions(conn)
+        for migration in migrations:
+            if migration.version <= last and migration.version not in applied:
+                _record(conn, migration)
+                stamped.append(migration)
+        conn.execute(schema_migrations.delete().where(schema_migrations.c.version > last))
+    return stamped
+
+
+def schema_differences(engine: Engine, metadata: MetaData) -> List[str]:
+    """
+    Tablas, columnas e índices de los modelos que faltan en la base de datos:
+    cambios de modelo sin su migración
+    """
+    inspector = inspect(engine)
+    existing = set(inspector.get_table_names())
+    differences = []
+    for table in metadata.sorted_tables:
+        if table.name not in existing:
+            differences.append(f"falta la tabla {table.name}")
+            continue
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in columns:
+                differences.append(f"falta la columna {table.name}.{column.name}")
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in indexes:
+                differences.append(f"falta el índice {index.name} en {table.name}")
+    return differences
+
+
+def new_migration(name: str, description: Optional[str] = None) -> str:
+    """
+    Crear el archivo de la siguiente migración a partir de la plantilla
+    """
+    package = importlib.import_module(MIGRATIONS_PACKAGE)
+    migrations = discover_migrations()
+    version = int(migrations[-1].version) + 1 if migrations else 0
+    slug = "_".join(name.lower().split())
+    path = os.path.join(package.__path__[0], f"{version:04d}_{slug}.py")
+    with open(path, "x", encoding="utf-8") as file:
+        file.write(MIGRATION_TEMPLATE.format(description=description or name))
+    return path
+
+
+def _autocommit(conn: Connection) -> bool:
+    return conn.get_execution_options().get("isolation_level") == "AUTOCOMMIT"
+
+
+def index_exists(conn: Connection, table: str, name: str) -> bool:
+    return any(index["name"] == name for index in inspect(conn).get_indexes(table))
+
+
+def column_exists(conn: Connection, table: str, name: str) -> bool:
+    return any(column["name"] == name for column in inspect(conn).get_columns(table))
+
+
+def _postgres_index_invalid(conn: Connection, name: str) -> bool:
+    # Un CREATE INDEX CONCURRENTLY interrumpido deja el índice marcado como inválido
+    return bool(conn.execute(text(
+        "SELECT NOT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name"
+    ), {"name": name}).scalar())
+
+
+def create_index(conn: Connection, name: str, table: str, columns: Sequence[str], unique: bool = False) -> bool:
+    """
+    Crear un índice si no existe (create_all ya lo crea en bases de datos nuevas)
+    sin bloquear las escrituras de la tabla:
+    - Postgres: CREATE INDEX CONCURRENTLY, requiere `transactional = False`
+    - MySQL: ALGORITHM=INPLACE, LOCK=NONE (falla en vez de bloquear)
+    Retorna True si se creó.
+    """
+    dialect = conn.dialect.name
+    if index_exists(conn, table, name):
+        if dialect != "postgresql" or not _postgres_index_invalid(conn, name):
+            return False
+        drop_index(conn, name, table)
+
+    quote = conn.dialect.identifier_preparer.quote
+    column_list = ", ".join(quote(column) for column in columns)
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    if dialect == "mysql":
+        statement = (f"ALTER TABLE {quote(table)} ADD {kind} {quote(name)} ({column_list}), "
+                     "ALGORITHM=INPLACE, LOCK=NONE")
+    elif dialect == "postgresql":
+        if not _autocommit(conn):
+            raise RuntimeError(f"CREATE INDEX CONCURRENTLY {name}: la migración debe declarar transactional = False")
+        statement = f"CREATE {kind} CONCURRENTLY {quote(name)} ON {quote(table)} ({column_list})"
+    else:
+        statement = f"CREATE {kind} {quote(name)} ON {quote(table)} ({column_list})"
+    conn.execute(text(statement))
+    return True
+
+
+def drop_index(conn: Connection, name: str, table: str) -> bool:
+    """
+    Eliminar un índice si existe, sin bloquear donde el motor lo permite.
+    Retorna True si se eliminó.
+    """
+    if not index_exists(conn, table, name):
+        return False
+    quote = conn.dialect.identifier_preparer.quote
+    dialect = conn.dialect.name
+    if dialect == "mysql":
+        conn.execute(text(f"ALTER TABLE {quote(table)} DROP INDEX {quote(name)}, ALGORITHM=INPLACE, LOCK=NONE"))
+    elif dialect == "postgresql" and _autocommit(conn):
+        conn.execute(text(f"DROP INDEX CONCURRENTLY {quote(name)}"))
+    else:
+        conn.execute(text(f"DROP INDEX {quote(name)}"))
+    return True
+
+
+def add_column(conn: Connection, table: str, column: Column) -> bool:
+    """
+    Agregar una columna si no existe. Debe ser nullable o tener un
+    server_default constante: así Postgres 11+ y MySQL 8 (ALGORITHM=INSTANT)
+    solo cambian metadatos en vez de reescribir la tabla.
+    Retorna True si se agregó.
+    """
+    if column_exists(conn, table, column.name):
+        return False
+    if not column.nullable and column.server_default is None:
+        raise ValueError(f"{table}.{column.name}: una columna NOT NULL necesita server_default")
+
+    quote = conn.dialect.identifier_preparer.quote
+    definition = CreateColumn(column).compile(dialect=conn.dialect)
+    statement = f"ALTER TABLE {quote(table)} ADD COLUMN {definition}"
+    if conn.dialect.name == "mysql":
+        try:
+            conn.execute(text(f"{statement}, ALGORITHM=INSTANT"))
+        except OperationalError:
+            # MySQL < 8.0.12 o columna que INSTANT no admite
+            conn.execute(text(f"{statement}, ALGORITHM=INPLACE, LOCK=NONE"))
+    else:
+        conn.execute(text(statement))
+    return True
+
+
+def drop_column(conn: Connection, table: str, name: str) -> bool:
+    """
+    Eliminar una columna si existe. Retorna True si se eliminó.
+    """
+    if not column_exists(conn, table, name):
+        return False
+    quote = conn.dialect.identifier_preparer.quote
+    conn.execute(text(f"ALTER TABLE {quote(table)} DROP COLUMN {quote(name)}"))
+    return True
@@ -0,0 +1,183 @@
+"""
+Esquema base: las tablas tal como las creaba create_all antes de las migraciones
+
+Copia congelada (no importa app.models): los índices de 0001 y los cambios
+posteriores de los modelos van en migraciones nuevas. Solo crea las tablas que
+faltan, así que en una base de datos creada con create_all no hace nada.
+"""
+from sqlalchemy import (Boolean, Column, DateTime, Float, ForeignKey, Integer,
+                        MetaData, String, Table, Text, UniqueConstraint)
+from sqlalchemy.sql import func
+
+metadata = MetaData()
+
+
+def _timestamps():
+    return [
+        Column("created_at", DateTime(timezone=True), server_default=func.now()),
+        Column("updated_at", DateTime(timezone=True)),
+    ]
+
+
+Table(
+    "users", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("email", String(255), unique=True, index=True, nullable=False),
+    Column("password", String(255), nullable=True),
+    Column("full_name", String(255), nullable=False),
+    Column("role", String(50)),
+    Column("is_active", Boolean),
+    Column("firebase_uid", String(255), unique=True, nullable=True),
+    Column("auth_provider", String(50)),
+    Column("email_verified", Boolean),
+    Column("photo_url", String(500), nullable=True),
+    Column("phone_number", String(50), nullable=True),
+    *_timestamps(),
+)
+
+Table(
+    "categories", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(255), unique=True, nullable=False),
+    Column("description", Text),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("url_image", String(255), nullable=True),
+)
+
+Table(
+    "products", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(255), nullable=False),
+    Column("description", Text),
+    Column("price", Float, nullable=False),
+    Column("category_id", Integer, ForeignKey("categories.id")),
+    Column("image_url", String(500)),
+    Column("is_available", Boolean),
+    Column("stock", Integer),
+    *_timestamps(),
+)
+
+Table(
+    "tables", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("number", Integer, unique=True, nullable=False),
+    Column("capacity", Integer, nullable=False),
+    Column("position_x", Float, nullable=False),
+    Column("position_y", Float, nullable=False),
+    Column("is_available", Boolean),
+    Column("is_active", Boolean),
+    *_timestamps(),
+)
+
+Table(
+    "extras", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(100), nullable=False),
+    Column("description", Text, nullable=True),
+    Column("price", Float),
+    Column("category", String(50)),
+    Column("is_available", Boolean),
+    Column("is_free", Boolean),
+    Column("stock", Integer),
+    Column("image_url", String(500), nullable=True),
+    *_timestamps(),
+)
+
+Table(
+    "carts", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    *_timestamps(),
+)
+
+Table(
+    "cart_items", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("cart_id", Integer, ForeignKey("carts.id"), nullable=False),
+    Column("product_id", Integer, ForeignKey("products.id"), nullable=False),
+    Column("quantity", Integer, nullable=False),
+    Column("special_instructions", Text, nullable=True),
+    *_timestamps(),
+)
+
+Table(
+    "favorites", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("product_id", Integer, ForeignKey("products.id"), nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    UniqueConstraint("user_id", "product_id", name="uq_user_product"),
+)
+
+Table(
+    "orders", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id")),
+    Column("table_id", Integer, ForeignKey("tables.id"), nullable=True),
+    Column("order_type", String(20)),
+    Column("status", String(50)),
+    Column("special_instructions", Text),
+    Column("delivery_address", Text, nullable=True),
+    Column("estimated_time", Integer),
+    Column("total_amount", Float),
+    Column("is_paid", Boolean),
+    *_timestamps(),
+)
+
+Table(
+    "order_items", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("order_id", Integer, ForeignKey("orders.id")),
+    Column("product_id", Integer, ForeignKey("products.id")),
+    Column("quantity", Integer, nullable=False),
+    Column("unit_price", Float, nullable=False),
+    Column("subtotal", Float, nullable=False),
+    Column("special_instructions", Text, nullable=True),
+)
+
+Table(
+    "order_extras", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("order_id", Integer, ForeignKey("orders.id"), nullable=False),
+    Column("extra_id", Integer, ForeignKey("extras.id"), nullable=False),
+    Column("quantity", Integer),
+    Column("unit_price", Float, nullable=False),
+    Column("subtotal", Float, nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+Table(
+    "reviews", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("product_id", Integer, ForeignKey("products.id"), nullable=False),
+    Column("rating", Float, nullable=False),
+    Column("comment", Text),
+    Column("is_approved", Boolean),
+    *_timestamps(),
+)
+
+Table(
+    "order_reviews", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("order_id", Integer, ForeignKey("orders.id"), nullable=False),
+    Column("overall_rating", Float, nullable=False),
+    Column("food_quality_rating", Float, nullable=True),
+    Column("service_rating", Float, nullable=True),
+    Column("delivery_rating", Float, nullable=True),
+    Column("ambiance_rating", Float, nullable=True),
+    Column("comment", Text),
+    Column("is_approved", Boolean),
+    Column("would_recommend", Boolean),
+    Column("issues_reported", Text, nullable=True),
+    *_timestamps(),
+)
+
+
+def upgrade(conn):
+    metadata.create_all(bind=conn, checkfirst=True)
+
+
+def downgrade(conn):
+    metadata.drop_all(bind=conn, checkfirst=True)
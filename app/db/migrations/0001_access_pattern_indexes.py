@@ -0,0 +1,30 @@
+"""
+Índices para los filtros más usados (pedidos, carrito, reseñas, extras, productos)
+"""
+from app.db.migrate import create_index, drop_index
+
+# Autocommit: CREATE INDEX CONCURRENTLY en Postgres
+transactional = False
+
+# (nombre, tabla, columnas): los mismos que declaran los modelos
+INDEXES = [
+    ("ix_orders_created_at_id", "orders", ["created_at", "id"]),
+    ("ix_orders_user_id_created_at_id", "orders", ["user_id", "created_at", "id"]),
+    ("ix_orders_table_id_status", "orders", ["table_id", "status"]),
+    ("ix_carts_user_id", "carts", ["user_id"]),
+    ("ix_cart_items_cart_id_product_id", "cart_items", ["cart_id", "product_id"]),
+    ("ix_reviews_product_id_is_approved", "reviews", ["product_id", "is_approved"]),
+    ("ix_order_extras_order_id", "order_extras", ["order_id"]),
+    ("ix_products_category_id_is_available", "products", ["category_id", "is_available"]),
+    ("ix_extras_category", "extras", ["category"]),
+]
+
+
+def upgrade(conn):
+    for name, table, columns in INDEXES:
+        create_index(conn, name, table, columns)
+
+
+def downgrade(conn):
+    for name, table, _ in reversed(INDEXES):
+        drop_index(conn, name, table)
@@ -0,0 +1,42 @@
+"""
+Índice de búsqueda de productos: tsvector + GIN en Postgres, FULLTEXT en MySQL
+"""
+from sqlalchemy import text
+
+from app.db.migrate import drop_index, index_exists
+from app.services.search_service import POSTGRES_DOCUMENT, SEARCH_INDEX_NAME
+
+# Autocommit: CREATE INDEX CONCURRENTLY en Postgres
+transactional = False
+
+
+def upgrade(conn):
+    dialect = conn.dialect.name
+    if dialect == "postgresql":
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS unaccent"))
+        # unaccent() no es IMMUTABLE y no puede usarse en la expresión de un índice
+        conn.execute(text(
+            "CREATE OR REPLACE FUNCTION immutable_unaccent(text) RETURNS text "
+            "AS $$ SELECT public.unaccent('public.unaccent', $1) $$ "
+            "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT"
+        ))
+    if dialect not in ("postgresql", "mysql") or index_exists(conn, "products", SEARCH_INDEX_NAME):
+        return
+
+    if dialect == "postgresql":
+        conn.execute(text(
+            f"CREATE INDEX CONCURRENTLY {SEARCH_INDEX_NAME} ON products USING GIN ({POSTGRES_DOCUMENT})"
+        ))
+    else:
+        # InnoDB no admite LOCK=NONE para FULLTEXT: se permiten lecturas durante la creación
+        conn.execute(text(
+            f"ALTER TABLE products ADD FULLTEXT INDEX {SEARCH_INDEX_NAME} (name, description), "
+            "ALGORITHM=INPLACE, LOCK=SHARED"
+        ))
+
+
+def downgrade(conn):
+    if conn.dialect.name in ("postgresql", "mysql"):
+        drop_index(conn, SEARCH_INDEX_NAME, "products")
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("DROP FUNCTION IF EXISTS immutable_unaccent(text)"))
@@ -0,0 +1,51 @@
+"""
+Índices únicos de carrito por usuario y de línea por (carrito, producto)
+"""
+from sqlalchemy import text
+
+from app.db.migrate import create_index, drop_index
+
+# Autocommit: CREATE INDEX CONCURRENTLY en Postgres
+transactional = False
+
+
+def _merge_duplicates(conn):
+    # Carritos repetidos de un usuario: sus líneas pasan al más antiguo
+    duplicated_users = conn.execute(text(
+        "SELECT user_id, MIN(id) FROM carts GROUP BY user_id HAVING COUNT(*) > 1"
+    )).all()
+    for user_id, keeper in duplicated_users:
+        conn.execute(text(
+            "UPDATE cart_items SET cart_id = :keeper "
+            "WHERE cart_id IN (SELECT id FROM carts WHERE user_id = :user_id AND id <> :keeper)"
+        ), {"keeper": keeper, "user_id": user_id})
+        conn.execute(text("DELETE FROM carts WHERE user_id = :user_id AND id <> :keeper"),
+                     {"keeper": keeper, "user_id": user_id})
+
+    # Líneas repetidas de un producto: se suman en la más antigua
+    duplicated_lines = conn.execute(text(
+        "SELECT cart_id, product_id, MIN(id), SUM(quantity) FROM cart_items "
+        "GROUP BY cart_id, product_id HAVING COUNT(*) > 1"
+    )).all()
+    for cart_id, product_id, keeper, quantity in duplicated_lines:
+        conn.execute(text("UPDATE cart_items SET quantity = :quantity WHERE id = :keeper"),
+                     {"quantity": quantity, "keeper": keeper})
+        conn.execute(text(
+            "DELETE FROM cart_items WHERE cart_id = :cart_id AND product_id = :product_id AND id <> :keeper"
+        ), {"cart_id": cart_id, "product_id": product_id, "keeper": keeper})
+
+
+def upgrade(conn):
+    _merge_duplicates(conn)
+    # Los únicos se crean antes de quitar los anteriores: nunca queda la tabla sin índice
+    create_index(conn, "uq_carts_user_id", "carts", ["user_id"], unique=True)
+    create_index(conn, "uq_cart_items_cart_id_product_id", "cart_items", ["cart_id", "product_id"], unique=True)
+    drop_index(conn, "ix_carts_user_id", "carts")
+    drop_index(conn, "ix_cart_items_cart_id_product_id", "cart_items")
+
+
+def downgrade(conn):
+    create_index(conn, "ix_carts_user_id", "carts", ["user_id"])
+    create_index(conn, "ix_cart_items_cart_id_product_id", "cart_items", ["cart_id", "product_id"])
+    drop_index(conn, "uq_carts_user_id", "carts")
+    drop_index(conn, "uq_cart_items_cart_id_product_id", "cart_items")
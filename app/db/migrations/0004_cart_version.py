@@ -0,0 +1,15 @@
+"""
+Versión del carrito: aumenta con cada cambio (respuestas delta del carrito)
+"""
+from sqlalchemy import Column, Integer
+
+from app.db.migrate import add_column, drop_column
+
+
+def upgrade(conn):
+    # server_default constante: en MySQL 8 y Postgres 11+ solo cambia metadatos
+    add_column(conn, "carts", Column("version", Integer, nullable=False, server_default="0"))
+
+
+def downgrade(conn):
+    drop_column(conn, "carts", "version")
@@ -0,0 +1,15 @@
+"""
+Índice de última actividad de los carritos (limpieza de carritos abandonados)
+"""
+from app.db.migrate import create_index, drop_index
+
+# Autocommit: CREATE INDEX CONCURRENTLY en Postgres
+transactional = False
+
+
+def upgrade(conn):
+    create_index(conn, "ix_carts_updated_at", "carts", ["updated_at"])
+
+
+def downgrade(conn):
+    drop_index(conn, "ix_carts_updated_at", "carts")
@@ -0,0 +1,34 @@
+"""
+Tabla idempotency_keys: checkout y creación de pedidos con Idempotency-Key
+"""
+from sqlalchemy import (Column, DateTime, ForeignKey, Index, Integer, MetaData,
+                        String, Table, Text)
+from sqlalchemy.sql import func
+
+# Copia congelada del modelo IdempotencyKey
+metadata = MetaData()
+Table("users", metadata, Column("id", Integer, primary_key=True))
+Table("orders", metadata, Column("id", Integer, primary_key=True))
+idempotency_keys = Table(
+    "idempotency_keys", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("key", String(255), nullable=False),
+    Column("endpoint", String(100), nullable=False),
+    Column("request_hash", String(64), nullable=False),
+    Column("status", String(20), nullable=False),
+    Column("order_id", Integer, ForeignKey("orders.id", ondelete="SET NULL"), nullable=True),
+    Column("response_body", Text, nullable=True),
+    Column("locked_at", DateTime, nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("updated_at", DateTime(timezone=True)),
+    Index("uq_idempotency_keys_user_id_key", "user_id", "key", unique=True),
+)
+
+
+def upgrade(conn):
+    idempotency_keys.create(bind=conn, checkfirst=True)
+
+
+def downgrade(conn):
+    idempotency_keys.drop(bind=conn, checkfirst=True)
@@ -0,0 +1,34 @@
+"""
+Tabla reservations: reservas de mesas por horario
+"""
+from sqlalchemy import (Column, DateTime, ForeignKey, Index, Integer, MetaData,
+                        String, Table, Text)
+from sqlalchemy.sql import func
+
+# Copia congelada del modelo Reservation
+metadata = MetaData()
+Table("users", metadata, Column("id", Integer, primary_key=True))
+Table("tables", metadata, Column("id", Integer, primary_key=True))
+reservations = Table(
+    "reservations", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("table_id", Integer, ForeignKey("tables.id"), nullable=False),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("party_size", Integer, nullable=False),
+    Column("starts_at", DateTime, nullable=False),
+    Column("ends_at", DateTime, nullable=False),
+    Column("status", String(20), nullable=False),
+    Column("special_instructions", Text, nullable=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("updated_at", DateTime(timezone=True)),
+    Index("ix_reservations_table_id_starts_at", "table_id", "starts_at"),
+    Index("ix_reservations_starts_at", "starts_at"),
+)
+
+
+def upgrade(conn):
+    reservations.create(bind=conn, checkfirst=True)
+
+
+def downgrade(conn):
+    reservations.drop(bind=conn, checkfirst=True)
@@ -0,0 +1,46 @@
+"""
+Imágenes: variantes WebP de productos y categorías, imágenes deduplicadas y cola de limpieza
+"""
+from sqlalchemy import (JSON, Column, DateTime, Integer, MetaData, String,
+                        Table, Text)
+from sqlalchemy.sql import func
+
+from app.db.migrate import add_column, drop_column
+
+# Copias congeladas de los modelos StoredImage e ImageCleanupJob
+metadata = MetaData()
+stored_images = Table(
+    "stored_images", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("content_hash", String(64), unique=True, index=True, nullable=False),
+    Column("url", String(500), unique=True, nullable=False),
+    Column("variants", JSON, nullable=True),
+    Column("content_type", String(100), nullable=True),
+    Column("size_bytes", Integer),
+    Column("ref_count", Integer, nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("updated_at", DateTime(timezone=True)),
+)
+image_cleanup_jobs = Table(
+    "image_cleanup_jobs", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("image_url", String(500), nullable=False),
+    Column("status", String(20), index=True),
+    Column("attempts", Integer, nullable=False),
+    Column("last_error", Text, nullable=True),
+    Column("next_attempt_at", DateTime, nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("updated_at", DateTime(timezone=True)),
+)
+
+
+def upgrade(conn):
+    add_column(conn, "products", Column("image_variants", JSON, nullable=True))
+    add_column(conn, "categories", Column("image_variants", JSON, nullable=True))
+    metadata.create_all(bind=conn, checkfirst=True)
+
+
+def downgrade(conn):
+    metadata.drop_all(bind=conn, checkfirst=True)
+    drop_column(conn, "categories", "image_variants")
+    drop_column(conn, "products", "image_variants")
@@ -0,0 +1,14 @@
+"""
+Estado de las imágenes deduplicadas: "borrando" mientras el worker de limpieza borra sus objetos
+"""
+from sqlalchemy import Column, String
+
+from app.db.migrate import add_column, drop_column
+
+
+def upgrade(conn):
+    add_column(conn, "stored_images", Column("status", String(20), nullable=False, server_default="activo"))
+
+
+def downgrade(conn):
+    drop_column(conn, "stored_images", "status")
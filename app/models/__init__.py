@@ -2,10 +2,14 @@ from app.models.cart import Cart, CartItem
 
 from .category import Category
 from .favorite import Favorite
+from .idempotency_key import IdempotencyKey
+from .image_cleanup_job import ImageCleanupJob
 from .order import Order
 from .product import Product
+from .reservation import Reservation
 from .review import Review
+from .stored_image import StoredImage
 from .table import Table
 from .user import User
 
-__all__ = ["User", "Category", "Product", "Order", "Favorite", "Table", "Review", "Cart", "CartItem"]
+__all__ = ["User", "Category", "Product", "Order", "Favorite", "Table", "Review", "Cart", "CartItem", "StoredImage", "ImageCleanupJob", "IdempotencyKey", "Reservation"]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -10,12 +10,21 @@ class Cart(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Aumenta con cada cambio del carrito: el cliente detecta si su copia está al día
+    version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relaciones
     user = relationship("User", backref="carts")
     items = relationship("CartItem", back_populates="cart", cascade="all, delete-orphan")
+
+    # Un carrito por usuario: permite crearlo con upsert sin carreras.
+    # updated_at: búsqueda de carritos abandonados
+    __table_args__ = (
+        Index("uq_carts_user_id", "user_id", unique=True),
+        Index("ix_carts_updated_at", "updated_at"),
+    )
     
     # Campos dinámicos (no se almacenan en BD)
     def __init__(self, **kwargs):
@@ -53,6 +62,11 @@ class CartItem(Base):
     # Relaciones
     cart = relationship("Cart", back_populates="items")
     product = relationship("Product")
+
+    # Una línea por producto: destino del upsert (INSERT ... ON CONFLICT)
+    __table_args__ = (
+        Index("uq_cart_items_cart_id_product_id", "cart_id", "product_id", unique=True),
+    )
     
     # Campos dinámicos (no se almacenan en BD)
     def __init__(self, **kwargs):
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, Integer, String, Text
+from sqlalchemy import JSON, Column, DateTime, Integer, String, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -13,6 +13,7 @@ class Category(Base):
     description = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     url_image = Column(String(255), nullable=True)  # Añadir columna de imagen
+    image_variants = Column(JSON, nullable=True)  # Variantes redimensionadas de url_image
 
     # Relación con productos
     products = relationship("Product", back_populates="category", cascade="all, delete-orphan")
\ No newline at end of file
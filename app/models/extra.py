@@ -12,7 +12,7 @@ class Extra(Base):
     name = Column(String(100), nullable=False)
     description = Column(Text, nullable=True)
     price = Column(Float, default=0.0)  # 0.0 para extras gratuitos
-    category = Column(String(50), default="condimento")  # 'bebida', 'condimento', 'acompanamiento'
+    category = Column(String(50), default="condimento", index=True)  # 'bebida', 'condimento', 'acompanamiento'
     is_available = Column(Boolean, default=True)
     is_free = Column(Boolean, default=False)  # Si es gratuito (cortesía de la casa)
     stock = Column(Integer, default=0)
@@ -24,7 +24,7 @@ class OrderExtra(Base):
     __tablename__ = "order_extras"
     
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
     extra_id = Column(Integer, ForeignKey("extras.id"), nullable=False)
     quantity = Column(Integer, default=1)
     unit_price = Column(Float, nullable=False)
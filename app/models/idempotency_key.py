@@ -0,0 +1,25 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    key = Column(String(255), nullable=False)  # cabecera Idempotency-Key
+    endpoint = Column(String(100), nullable=False)
+    request_hash = Column(String(64), nullable=False)  # sha256 del cuerpo de la solicitud
+    status = Column(String(20), nullable=False, default="en_proceso")  # en_proceso, completado
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="SET NULL"), nullable=True)
+    response_body = Column(Text, nullable=True)  # JSON de la respuesta original
+    locked_at = Column(DateTime, nullable=False)  # UTC, calculado en Python
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # La inserción reclama la clave: un duplicado choca con este índice
+    __table_args__ = (
+        Index("uq_idempotency_keys_user_id_key", "user_id", "key", unique=True),
+    )
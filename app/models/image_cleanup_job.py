@@ -0,0 +1,17 @@
+from sqlalchemy import Column, DateTime, Integer, String, Text
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+
+class ImageCleanupJob(Base):
+    __tablename__ = "image_cleanup_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    image_url = Column(String(500), nullable=False)
+    status = Column(String(20), default="pendiente", index=True)  # pendiente, completado, omitido, fallido
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    next_attempt_at = Column(DateTime, nullable=False)  # UTC, calculado en Python
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
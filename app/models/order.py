@@ -1,5 +1,5 @@
-from sqlalchemy import (Boolean, Column, DateTime, Float, ForeignKey, Integer,
-                        String, Text)
+from sqlalchemy import (Boolean, Column, DateTime, Float, ForeignKey, Index,
+                        Integer, String, Text)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -27,6 +27,15 @@ class Order(Base):
     table = relationship("Table", backref="orders")
     items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
 
+    # Índices de la paginación por cursor (created_at DESC, id DESC); el de
+    # user_id sirve también para "mis pedidos". (table_id, status) para el
+    # estado de las mesas (pedidos activos por mesa).
+    __table_args__ = (
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        Index("ix_orders_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_orders_table_id_status", "table_id", "status"),
+    )
+
 class OrderItem(Base):
     __tablename__ = "order_items"
 
@@ -1,5 +1,5 @@
 from sqlalchemy import (JSON, Boolean, Column, DateTime, Float, ForeignKey,
-                        Integer, String, Text)
+                        Index, Integer, String, Text)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -15,10 +15,16 @@ class   Product(Base):
     price = Column(Float, nullable=False)
     category_id = Column(Integer, ForeignKey("categories.id"))
     image_url = Column(String(500))
+    image_variants = Column(JSON, nullable=True)  # {"thumb": url, "card": url, "full": url}
     is_available = Column(Boolean, default=True)
     stock = Column(Integer, default=0)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-    category = relationship("Category", back_populates="products")
\ No newline at end of file
+    category = relationship("Category", back_populates="products")
+
+    # Menú por categoría (solo disponibles)
+    __table_args__ = (
+        Index("ix_products_category_id_is_available", "category_id", "is_available"),
+    )
\ No newline at end of file
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+
+class Reservation(Base):
+    __tablename__ = "reservations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    table_id = Column(Integer, ForeignKey("tables.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    party_size = Column(Integer, nullable=False)  # Número de personas
+    starts_at = Column(DateTime, nullable=False)  # UTC
+    ends_at = Column(DateTime, nullable=False)  # UTC
+    status = Column(String(20), nullable=False, default="confirmada")  # confirmada, cancelada
+    special_instructions = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    table = relationship("Table")
+
+    __table_args__ = (
+        # Choques de una mesa (reservation_service._overlapping) y agenda de un día
+        Index("ix_reservations_table_id_starts_at", "table_id", "starts_at"),
+        Index("ix_reservations_starts_at", "starts_at"),
+    )
@@ -1,5 +1,5 @@
-from sqlalchemy import (Boolean, Column, DateTime, Float, ForeignKey, Integer,
-                        Text)
+from sqlalchemy import (Boolean, Column, DateTime, Float, ForeignKey, Index,
+                        Integer, Text)
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -22,6 +22,11 @@ class Review(Base):
     # Relaciones
     user = relationship("User", backref="reviews", lazy="joined")
     product = relationship("Product", backref="reviews", lazy="joined")
+
+    # Reseñas aprobadas de un producto
+    __table_args__ = (
+        Index("ix_reviews_product_id_is_approved", "product_id", "is_approved"),
+    )
     
     # Propiedades híbridas para los campos calculados
     @hybrid_property
@@ -0,0 +1,20 @@
+from sqlalchemy import JSON, Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+
+class StoredImage(Base):
+    __tablename__ = "stored_images"
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), unique=True, index=True, nullable=False)  # SHA-256 del contenido
+    url = Column(String(500), unique=True, nullable=False)
+    variants = Column(JSON, nullable=True)  # {"thumb": url, "card": url, "full": url}
+    content_type = Column(String(100), nullable=True)
+    size_bytes = Column(Integer, default=0)
+    ref_count = Column(Integer, nullable=False, default=0)  # Registros que usan esta imagen
+    # activo, borrando (el worker de limpieza está borrando sus objetos)
+    status = Column(String(20), nullable=False, default="activo", server_default="activo")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
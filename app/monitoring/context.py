@@ -0,0 +1,19 @@
+from contextvars import ContextVar
+from typing import Optional
+
+
+class RequestStats:
+    """
+    Estadísticas de base de datos acumuladas durante una petición
+    """
+    __slots__ = ("method", "route", "queries", "db_seconds")
+
+    def __init__(self, method: str = "", route: str = ""):
+        self.method = method
+        self.route = route
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# Petición en curso; se copia a los hilos del threadpool junto con el contexto
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
@@ -0,0 +1,39 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.monitoring.context import current_request
+from app.monitoring.metrics import db_queries_total, db_query_duration_seconds
+
+_installed_engines = set()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_time = getattr(context, "_query_start_time", None)
+    if start_time is None:
+        return
+    elapsed = time.perf_counter() - start_time
+
+    db_queries_total.inc()
+    db_query_duration_seconds.observe(elapsed)
+
+    stats = current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+
+
+def install_db_hooks(engine: Engine):
+    """
+    Registrar los eventos de SQLAlchemy que miden consultas y tiempo en BD
+    """
+    if id(engine) in _installed_engines:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    _installed_engines.add(id(engine))
@@ -0,0 +1,55 @@
+import time
+
+from app.monitoring.context import RequestStats, current_request
+from app.monitoring.metrics import (http_request_db_queries,
+                                    http_request_db_seconds,
+                                    http_request_duration_seconds,
+                                    http_requests_total)
+
+
+def route_template(scope) -> str:
+    """
+    Plantilla de la ruta (p. ej. /orders/{order_id}) para no disparar la cardinalidad
+    """
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que registra latencia, códigos de estado y uso de BD por ruta
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # La ruta real se conoce tras el enrutado; mientras tanto, el path
+        stats = RequestStats(method=scope["method"], route=scope["path"])
+        token = current_request.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            stats.route = route_template(scope)
+            method = stats.method
+            status = str(status_code)
+
+            http_requests_total.inc(method=method, route=stats.route, status=status)
+            http_request_duration_seconds.observe(elapsed, method=method, route=stats.route, status=status)
+            http_request_db_queries.observe(stats.queries, method=method, route=stats.route)
+            http_request_db_seconds.observe(stats.db_seconds, method=method, route=stats.route)
+            current_request.reset(token)
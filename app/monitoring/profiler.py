@@ -0,0 +1,315 @@
+import cProfile
+import functools
+import inspect
+import io
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.monitoring.middleware import route_template
+
+logger = logging.getLogger(__name__)
+
+PROFILING_ENABLED = os.getenv("PROFILING", "false").lower() == "true"
+# Fracción del tráfico que se perfila sin pedirlo (0 = solo con cabecera)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+PROFILE_STORE_SIZE = int(os.getenv("PROFILE_STORE_SIZE", 50))
+PROFILE_RENDER_LIMIT = int(os.getenv("PROFILE_RENDER_LIMIT", 60))
+PROFILE_HEADER = b"x-profile"
+
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))).replace(os.sep, "/")
+
+# Agrupación del tiempo propio de cada función según el módulo que la define
+_CATEGORIES = (
+    ("idle", ("selectors.py", "select.epoll", "select.select")),
+    ("orm", ("sqlalchemy", "pymysql", "psycopg", "sqlite3")),
+    ("serialization", ("pydantic", "fastapi/encoders", "json", "starlette/responses")),
+    ("websocket", (f"{_APP_ROOT}/websocket", "websockets", "starlette/websockets")),
+    ("app", (f"{_APP_ROOT}/",)),
+)
+
+
+def _categorize(func: tuple) -> str:
+    filename, _, name = func
+    # Las funciones internas (C) vienen como ("~", 0, "<method 'poll' ...>")
+    path = (name if filename == "~" else filename).replace(os.sep, "/")
+    for category, markers in _CATEGORIES:
+        if any(marker in path for marker in markers):
+            return category
+    return "other"
+
+
+def _describe_function(func: tuple) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+class RequestProfile:
+    """
+    Perfil de CPU de una petición: combina el hilo del event loop y los hilos del
+    threadpool donde FastAPI ejecuta endpoints y dependencias síncronos.
+
+    Lo medido en el hilo del event loop abarca todo el loop mientras dura la
+    petición: incluye el código async de otras peticiones concurrentes. Los
+    endpoints síncronos sí se miden solo en los hilos de esta petición.
+    """
+
+    def __init__(self, profile_id: str, method: str, path: str, reason: str, request_id: Optional[str] = None):
+        # profile_id lo genera el servidor; request_id es el X-Request-ID del cliente (solo informativo)
+        self.profile_id = profile_id
+        self.request_id = request_id
+        self.method = method
+        self.path = path
+        self.route = path
+        self.reason = reason
+        self.started_at = datetime.utcnow()
+        self.duration_ms = 0.0
+        self.status_code = None
+        self.partial = False
+        self._profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self.report: Optional[Dict[str, Any]] = None
+
+    def add(self, profile: cProfile.Profile):
+        with self._lock:
+            self._profiles.append(profile)
+
+    def render(self, limit: int = PROFILE_RENDER_LIMIT):
+        """
+        Convertir las mediciones en texto (pstats) y un resumen por categoría
+        """
+        with self._lock:
+            profiles = list(self._profiles)
+            self._profiles = []
+        if not profiles:
+            self.report = {"text": "", "top": [], "breakdown": {}}
+            return
+
+        stream = io.StringIO()
+        stats = pstats.Stats(profiles[0], stream=stream)
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.sort_stats("cumulative").print_stats(limit)
+
+        breakdown: Dict[str, float] = {}
+        rows = []
+        for func, (primitive_calls, total_calls, tottime, cumtime, _) in stats.stats.items():
+            category = _categorize(func)
+            breakdown[category] = breakdown.get(category, 0.0) + tottime
+            rows.append((cumtime, tottime, total_calls, func))
+        rows.sort(key=lambda row: row[0], reverse=True)
+
+        self.report = {
+            "text": stream.getvalue(),
+            "top": [
+                {
+                    "function": _describe_function(func),
+                    "calls": calls,
+                    "tottime_ms": round(tottime * 1000, 3),
+                    "cumtime_ms": round(cumtime * 1000, 3),
+                }
+                for cumtime, tottime, calls, func in rows[:25]
+            ],
+            "breakdown": {
+                category: round(seconds * 1000, 3)
+                for category, seconds in sorted(breakdown.items(), key=lambda item: -item[1])
+            },
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "profile_id": self.profile_id,
+            "request_id": self.request_id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status_code": self.status_code,
+            "reason": self.reason,
+            "partial": self.partial,
+            "duration_ms": round(self.duration_ms, 2),
+            "started_at": self.started_at.isoformat(),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**self.summary(), **(self.report or {})}
+
+
+class ProfileStore:
+    """
+    Últimos perfiles capturados, indexados por el ID de perfil del servidor
+    """
+
+    def __init__(self, size: int = PROFILE_STORE_SIZE):
+        self.size = size
+        self._profiles: "OrderedDict[str, RequestProfile]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: RequestProfile):
+        with self._lock:
+            self._profiles[profile.profile_id] = profile
+            self._profiles.move_to_end(profile.profile_id)
+            while len(self._profiles) > self.size:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def entries(self, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = list(self._profiles.values())
+        items.reverse()
+        return [profile.summary() for profile in items[:limit]]
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+
+
+profile_store = ProfileStore()
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+# cProfile es por hilo y solo admite un perfilador activo en el hilo del event loop
+_loop_profiler_busy = threading.Lock()
+
+
+def _profiled_sync_call(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        request_profile = current_profile.get()
+        if request_profile is None:
+            return func(*args, **kwargs)
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            request_profile.add(profiler)
+
+    wrapper._profiled = True
+    return wrapper
+
+
+def _instrument_dependant(dependant):
+    for sub_dependant in dependant.dependencies:
+        _instrument_dependant(sub_dependant)
+
+    call = dependant.call
+    if call is None or getattr(call, "_profiled", False):
+        return
+    # Las funciones async ya corren en el hilo del event loop (perfilado por el
+    # middleware); los generadores (get_db) se ejecutan por partes en otros hilos
+    if inspect.iscoroutinefunction(call) or inspect.isgeneratorfunction(call):
+        return
+    if not (inspect.isfunction(call) or inspect.ismethod(call)):
+        return
+    dependant.call = _profiled_sync_call(call)
+
+
+def instrument_routes(app):
+    """
+    Envolver endpoints y dependencias síncronos para perfilarlos dentro del
+    threadpool. Llamar después de incluir todos los routers.
+    """
+    from fastapi.routing import APIRoute
+
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            _instrument_dependant(route.dependant)
+
+
+def _is_admin_request(headers: Dict[bytes, bytes]) -> bool:
+    from app.services.auth import verify_token
+
+    authorization = headers.get(b"authorization", b"").decode("latin-1")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    token_data = verify_token(token)
+    return token_data is not None and token_data.role == "administrador"
+
+
+class ProfilerMiddleware:
+    """
+    Middleware ASGI que perfila las peticiones con cabecera X-Profile (solo
+    administradores) o una fracción aleatoria del tráfico
+    """
+
+    def __init__(self, app, sample_rate: float = PROFILE_SAMPLE_RATE, store: ProfileStore = profile_store):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.store = store
+
+    def _profile_reason(self, headers: Dict[bytes, bytes]) -> Optional[str]:
+        if PROFILE_HEADER in headers and _is_admin_request(headers):
+            return "header"
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return "sample"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers", []))
+        reason = self._profile_reason(headers)
+        if reason is None:
+            await self.app(scope, receive, send)
+            return
+
+        # La clave del almacén no la elige el cliente: un X-Request-ID repetido
+        # reemplazaría el perfil de otra petición
+        profile_id = uuid.uuid4().hex
+        request_id = headers.get(b"x-request-id", b"").decode("latin-1")[:64] or None
+        request_profile = RequestProfile(profile_id, scope["method"], scope["path"], reason, request_id)
+        token = current_profile.set(request_profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                request_profile.status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile_id.encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        # Otra petición perfilada ocupa el hilo del loop: solo se miden los hilos del threadpool
+        loop_profiler = None
+        if _loop_profiler_busy.acquire(blocking=False):
+            loop_profiler = cProfile.Profile()
+            loop_profiler.enable()
+        else:
+            request_profile.partial = True
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_profile.duration_ms = (time.perf_counter() - start) * 1000
+            if loop_profiler is not None:
+                loop_profiler.disable()
+                _loop_profiler_busy.release()
+                request_profile.add(loop_profiler)
+            current_profile.reset(token)
+
+            request_profile.route = route_template(scope)
+            # pstats puede tardar decenas de ms: fuera del event loop
+            await run_in_threadpool(request_profile.render)
+            self.store.add(request_profile)
+            logger.info(
+                f"🔬 Perfil {profile_id} de {request_profile.method} {request_profile.route}: "
+                f"{request_profile.duration_ms:.0f} ms"
+            )
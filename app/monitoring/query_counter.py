@@ -0,0 +1,150 @@
+import logging
+import os
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.monitoring.middleware import route_template
+
+logger = logging.getLogger(__name__)
+
+# Modo desarrollo/test: contar sentencias por petición y detectar N+1
+QUERY_DEBUG_ENABLED = os.getenv("QUERY_DEBUG", "false").lower() == "true"
+# Repeticiones de la misma forma de sentencia a partir de las cuales se sospecha N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv("QUERY_DEBUG_N1_THRESHOLD", 5))
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM_LIST = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))*\s*\)")
+_NAMED_PARAM = re.compile(r"%\(\w+\)s|:\w+|%s")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """
+    Reducir una sentencia a su "forma": sin literales, parámetros ni listas IN variables
+    """
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _NAMED_PARAM.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PARAM_LIST.sub("(...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryTracker:
+    """
+    Cuenta las sentencias SQL ejecutadas y agrupa las repetidas por forma
+    """
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.total = 0
+        self.shapes: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str):
+        shape = normalize_statement(statement)
+        with self._lock:
+            self.total += 1
+            self.shapes[shape] += 1
+
+    def top(self, limit: int = 5) -> List[Tuple[str, int]]:
+        return self.shapes.most_common(limit)
+
+    def suspected_n_plus_one(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> List[Tuple[str, int]]:
+        """
+        Formas de sentencia repetidas al menos `threshold` veces (posible N+1)
+        """
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    def report(self, limit: int = 5) -> str:
+        lines = [f"{self.total} consultas SQL{f' en {self.label}' if self.label else ''}"]
+        for shape, count in self.top(limit):
+            lines.append(f"  {count:>4} × {shape[:300]}")
+        return "\n".join(lines)
+
+
+# Tracker de la petición en curso (middleware)
+current_tracker: ContextVar[Optional[QueryTracker]] = ContextVar("current_tracker", default=None)
+# Trackers globales (helpers de test: ven las consultas de cualquier hilo)
+_global_trackers: List[QueryTracker] = []
+_installed_engines = set()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    tracker = current_tracker.get()
+    if tracker is not None:
+        tracker.record(statement)
+    for global_tracker in _global_trackers:
+        global_tracker.record(statement)
+
+
+def install_query_counter(engine: Engine):
+    """
+    Registrar el contador de sentencias en el engine
+    """
+    if id(engine) in _installed_engines:
+        return
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    _installed_engines.add(id(engine))
+
+
+@contextmanager
+def track_queries(label: str = "", engine: Optional[Engine] = None):
+    """
+    Contar todas las sentencias ejecutadas dentro del bloque, en cualquier hilo
+    """
+    if engine is None:
+        from app.db.database import engine
+    install_query_counter(engine)
+
+    tracker = QueryTracker(label)
+    _global_trackers.append(tracker)
+    try:
+        yield tracker
+    finally:
+        _global_trackers.remove(tracker)
+
+
+class QueryCounterMiddleware:
+    """
+    Middleware ASGI de desarrollo: expone X-Query-Count y avisa de posibles N+1
+    """
+
+    def __init__(self, app, threshold: int = N_PLUS_ONE_THRESHOLD):
+        self.app = app
+        self.threshold = threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        tracker = QueryTracker()
+        token = current_tracker.set(tracker)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-query-count", str(tracker.total).encode()))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_tracker.reset(token)
+            tracker.label = f"{scope['method']} {route_template(scope)}"
+            suspects = tracker.suspected_n_plus_one(self.threshold)
+            if suspects:
+                logger.warning(
+                    f"⚠️ Posible N+1 en {tracker.label}: " + tracker.report()
+                )
+            else:
+                logger.debug(tracker.report())
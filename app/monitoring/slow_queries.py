@@ -0,0 +1,174 @@
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.monitoring.context import current_request
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_LOG_ENABLED = os.getenv("SLOW_QUERY_LOG", "false").lower() == "true"
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 200))
+SLOW_QUERY_BUFFER_SIZE = int(os.getenv("SLOW_QUERY_BUFFER_SIZE", 200))
+# Capturar el plan de ejecución (re-ejecuta la consulta: usar con cuidado en producción)
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "false").lower() == "true"
+
+# Consultas que toman bloqueos: re-ejecutarlas en otra conexión bloquearía filas
+# (o esperaría a la transacción que las tiene) solo para obtener el plan
+_LOCKING_RE = re.compile(r"\bFOR\s+(UPDATE|SHARE)\b|\bLOCK\s+IN\s+SHARE\s+MODE\b", re.IGNORECASE)
+
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_MONITORING_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def describe_parameters(parameters: Any, executemany: bool = False) -> Any:
+    """
+    Forma de los parámetros (tipos, no valores) para no guardar datos personales
+    """
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = describe_parameters(parameters[0]) if parameters else None
+        return {"executemany": len(parameters), "row": first}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def explainable(statement: str) -> bool:
+    """
+    Si se puede pedir el plan de la consulta sin efectos: SELECT sin bloqueos
+    """
+    return statement.lstrip().upper().startswith("SELECT") and not _LOCKING_RE.search(statement)
+
+
+def find_caller() -> Optional[str]:
+    """
+    Primera función de la aplicación (fuera de monitoring) en la pila de llamadas
+    """
+    frame = sys._getframe(2)
+    fallback = None
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(_APP_ROOT) and not filename.startswith(_MONITORING_ROOT):
+            location = f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}:{frame.f_lineno}"
+            # Preferir la capa de servicios sobre controladores y modelos
+            if f"{os.sep}services{os.sep}" in filename:
+                return location
+            fallback = fallback or location
+        frame = frame.f_back
+    return fallback
+
+
+class SlowQueryLog:
+    """
+    Buffer circular con las consultas que superan el umbral
+    """
+
+    def __init__(self, threshold_ms: float = SLOW_QUERY_THRESHOLD_MS, size: int = SLOW_QUERY_BUFFER_SIZE):
+        self.threshold_ms = threshold_ms
+        self._entries = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._explain_pool: Optional[ThreadPoolExecutor] = None
+
+    def record(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            entry["id"] = self._next_id
+            self._next_id += 1
+            self._entries.append(entry)
+        return entry
+
+    def entries(self, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = list(self._entries)
+        items.reverse()
+        return items[:limit]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def schedule_explain(self, engine: Engine, entry: Dict[str, Any], statement: str, parameters: Any):
+        """
+        Capturar el plan en segundo plano, en otra conexión, para no alargar la petición
+        """
+        if self._explain_pool is None:
+            self._explain_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+        self._explain_pool.submit(self._explain, engine, entry, statement, parameters)
+
+    def _explain(self, engine: Engine, entry: Dict[str, Any], statement: str, parameters: Any):
+        dialect = engine.dialect.name
+        if dialect == "postgresql":
+            prefix = "EXPLAIN (ANALYZE, BUFFERS) "
+        elif dialect == "mysql":
+            prefix = "EXPLAIN ANALYZE "
+        else:
+            return
+
+        _explaining.active = True
+        try:
+            with engine.connect() as conn:
+                cursor = conn.connection.cursor()
+                try:
+                    cursor.execute(prefix + statement, parameters)
+                    entry["plan"] = "\n".join(str(row[0]) for row in cursor.fetchall())
+                finally:
+                    cursor.close()
+                conn.rollback()
+        except Exception as e:
+            entry["plan_error"] = str(e)
+        finally:
+            _explaining.active = False
+
+
+slow_query_log = SlowQueryLog()
+_explaining = threading.local()
+_installed_engines = set()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._slow_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_time = getattr(context, "_slow_query_start", None)
+    if start_time is None:
+        return
+    duration_ms = (time.perf_counter() - start_time) * 1000
+    if duration_ms < slow_query_log.threshold_ms or getattr(_explaining, "active", False):
+        return
+
+    request = current_request.get()
+    entry = slow_query_log.record({
+        "timestamp": datetime.utcnow().isoformat(),
+        "duration_ms": round(duration_ms, 2),
+        "statement": statement,
+        "parameters": describe_parameters(parameters, executemany),
+        "caller": find_caller(),
+        "route": f"{request.method} {request.route}".strip() if request else None,
+    })
+    logger.warning(f"🐢 Consulta lenta ({duration_ms:.0f} ms) desde {entry['caller']}: {statement[:200]}")
+
+    if SLOW_QUERY_EXPLAIN and not executemany and explainable(statement):
+        slow_query_log.schedule_explain(conn.engine, entry, statement, parameters)
+
+
+def install_slow_query_log(engine: Engine):
+    """
+    Registrar los eventos que alimentan el log de consultas lentas
+    """
+    if id(engine) in _installed_engines:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    _installed_engines.add(id(engine))
@@ -0,0 +1,58 @@
+"""
+Helpers para tests: limitar el número de consultas SQL de un bloque o endpoint.
+
+    from app.monitoring.testing import assert_max_queries
+
+    def test_tables_with_status(client):
+        with assert_max_queries(3):
+            client.get("/tables/with-status")
+
+tests/conftest.py expone la fixture query_counter (ver tests/test_query_budgets.py).
+"""
+from contextlib import contextmanager
+from typing import Optional
+
+from sqlalchemy.engine import Engine
+
+from app.monitoring.query_counter import N_PLUS_ONE_THRESHOLD, track_queries
+
+
+@contextmanager
+def assert_max_queries(max_queries: int, label: str = "", engine: Optional[Engine] = None):
+    """
+    Fallar si el bloque ejecuta más de `max_queries` sentencias SQL
+    """
+    with track_queries(label, engine=engine) as tracker:
+        yield tracker
+    if tracker.total > max_queries:
+        raise AssertionError(
+            f"Se esperaban como máximo {max_queries} consultas y se ejecutaron "
+            f"{tracker.report(limit=10)}"
+        )
+
+
+@contextmanager
+def assert_no_n_plus_one(threshold: int = N_PLUS_ONE_THRESHOLD, label: str = "", engine: Optional[Engine] = None):
+    """
+    Fallar si alguna forma de sentencia se repite `threshold` veces o más
+    """
+    with track_queries(label, engine=engine) as tracker:
+        yield tracker
+    suspects = tracker.suspected_n_plus_one(threshold)
+    if suspects:
+        details = "\n".join(f"  {count:>4} × {shape[:300]}" for shape, count in suspects)
+        raise AssertionError(f"Posible N+1{f' en {label}' if label else ''}:\n{details}")
+
+
+try:
+    import pytest
+except ImportError:  # pytest solo está disponible en el entorno de tests
+    pytest = None
+
+if pytest is not None:
+    @pytest.fixture
+    def query_counter():
+        """
+        Fixture: `with query_counter(5): client.get(...)`
+        """
+        return assert_max_queries
@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class CartItemBase(BaseModel):
@@ -16,6 +16,16 @@ class CartItemUpdate(BaseModel):
     quantity: Optional[int] = None
     special_instructions: Optional[str] = None
 
+class CartBatchOperation(BaseModel):
+    op: Literal["add", "update", "remove"]
+    product_id: Optional[int] = None  # add
+    item_id: Optional[int] = None  # update / remove
+    quantity: Optional[int] = Field(None, gt=0)
+    special_instructions: Optional[str] = None
+
+class CartBatchRequest(BaseModel):
+    operations: List[CartBatchOperation] = Field(..., min_length=1, max_length=100)
+
 class CartItemResponse(CartItemBase):
     model_config = ConfigDict(from_attributes=True)
     
@@ -33,12 +43,26 @@ class CartResponse(BaseModel):
     
     id: int
     user_id: int
+    version: int = 0
     total_amount: float
     items_count: int
     created_at: datetime
     updated_at: Optional[datetime]
     items: List[CartItemResponse]
 
+class CartDeltaResponse(BaseModel):
+    """
+    Respuesta de un cambio con ?delta=true: solo las líneas que cambiaron y los
+    totales nuevos. Si `version` no es la versión local + 1, hubo otros cambios:
+    volver a pedir GET /cart.
+    """
+    id: int
+    version: int
+    total_amount: float
+    items_count: int
+    changed: List[CartItemResponse]
+    removed: List[int]  # item_id de las líneas eliminadas
+
 class CartSummaryResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     
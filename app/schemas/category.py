@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -27,6 +27,7 @@ class CategoryResponse(CategoryBase):
     
     id: int
     created_at: datetime
+    image_variants: Optional[Dict[str, str]] = None
 
 class CategoryWithProductsResponse(CategoryResponse):
     products: List[ProductResponse] = []
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -29,9 +29,17 @@ class ProductUpdate(BaseModel):
 class ProductResponse(ProductBase):
     id: int
     image_url: Optional[str]
+    image_variants: Optional[Dict[str, str]] = None  # thumb / card / full
     is_available: bool
     created_at: datetime
     updated_at: Optional[datetime]
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class AutocompleteSuggestion(BaseModel):
+    type: Literal["product", "category"]
+    id: int
+    name: str
+    category_id: Optional[int] = None
+    fuzzy: bool = False  # Coincidencia aproximada (error de escritura)
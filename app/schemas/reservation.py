@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ReservationBase(BaseModel):
+    party_size: int = Field(..., gt=0)
+    starts_at: datetime  # UTC
+    ends_at: Optional[datetime] = None  # Por defecto, RESERVATION_DEFAULT_MINUTES después del inicio
+    special_instructions: Optional[str] = None
+
+class ReservationCreate(ReservationBase):
+    table_id: Optional[int] = None  # Sin mesa: se asigna la de mejor ajuste
+
+class ReservationResponse(ReservationBase):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    table_id: int
+    user_id: int
+    ends_at: datetime
+    status: str
+    created_at: datetime
+    table_number: Optional[int] = None
+    table_capacity: Optional[int] = None
+
+class FreeTableResponse(BaseModel):
+    id: int
+    number: int
+    capacity: int
+    position_x: float
+    position_y: float
+    wasted_seats: int  # Asientos que quedarían vacíos
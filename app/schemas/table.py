@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class TableBase(BaseModel):
@@ -32,4 +32,20 @@ class TableResponse(TableBase):
 
 class TablePositionUpdate(BaseModel):
     position_x: float
-    position_y: float
\ No newline at end of file
+    position_y: float
+
+class TablePositionItem(TablePositionUpdate):
+    id: int
+
+class TablePositionBatch(BaseModel):
+    # Posiciones finales de un gesto de arrastre (una o varias mesas)
+    positions: List[TablePositionItem] = Field(..., min_length=1, max_length=500)
+
+class FloorTableResponse(BaseModel):
+    id: int
+    number: int
+    capacity: int
+    position_x: float
+    position_y: float
+    is_available: bool
+    distance: Optional[float] = None  # Solo en la búsqueda de la mesa más cercana
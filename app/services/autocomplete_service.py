@@ -0,0 +1,253 @@
+"""
+Autocompletado del buscador del menú, sin consultar la base de datos:
+- trie de prefijos sobre las palabras de los nombres de productos y categorías
+- índice de trigramas sobre una forma fonética de cada palabra, para tolerar
+  errores de escritura ("cebiche", "sevíche" → "Ceviche")
+
+Se construye desde la BD en la primera consulta y se reconstruye cada
+AUTOCOMPLETE_INDEX_TTL segundos (otros procesos pueden haber cambiado el menú);
+product_service y category_service lo actualizan en cada alta, edición o baja
+de este proceso.
+"""
+import heapq
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.category import Category
+from app.models.product import Product
+from app.services.search_service import tokenize
+
+# Similitud mínima de trigramas (el umbral por defecto de pg_trgm)
+SIMILARITY_THRESHOLD = 0.3
+MAX_LIMIT = 20
+AUTOCOMPLETE_INDEX_TTL = float(os.getenv("AUTOCOMPLETE_INDEX_TTL", 300))
+
+# Equivalencias de pronunciación del español para los trigramas
+_PHONETIC_RULES = [
+    (re.compile(r"c([ei])"), r"s\1"),
+    (re.compile(r"z"), "s"),
+    (re.compile(r"v"), "b"),
+    (re.compile(r"ll"), "y"),
+    (re.compile(r"qu([ei])"), r"k\1"),
+    (re.compile(r"c"), "k"),
+    (re.compile(r"h"), ""),
+]
+
+Key = Tuple[str, int]  # ("product" | "category", id)
+
+
+def phonetic(word: str) -> str:
+    for pattern, replacement in _PHONETIC_RULES:
+        word = pattern.sub(replacement, word)
+    return word
+
+
+def trigrams(word: str) -> Set[str]:
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _TrieNode:
+    __slots__ = ("children", "keys", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.keys: Set[Key] = set()
+        # Mejores sugerencias del nodo, se recalcula tras cada cambio
+        self.top: Optional[List[Key]] = None
+
+
+class AutocompleteIndex:
+    def __init__(self, ttl: float = AUTOCOMPLETE_INDEX_TTL):
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._reset()
+        self._built_at: Optional[float] = None
+
+    @property
+    def built(self) -> bool:
+        return self._built_at is not None and time.monotonic() - self._built_at < self.ttl
+
+    def _reset(self):
+        self._root = _TrieNode()
+        self._entries: Dict[Key, dict] = {}
+        self._words: Dict[Key, Set[str]] = {}
+        # palabra → entradas que la contienen; trigrama → palabras (forma fonética)
+        self._word_keys: Dict[str, Set[Key]] = defaultdict(set)
+        self._phonetic_words: Dict[str, Set[str]] = defaultdict(set)
+        self._trigram_words: Dict[str, Set[str]] = defaultdict(set)
+
+    def build(self, db: Session):
+        products = db.query(Product.id, Product.name, Product.category_id, Product.is_available).all()
+        categories = db.query(Category.id, Category.name).all()
+        with self._lock:
+            self._reset()
+            for category in categories:
+                self._add(("category", category.id), category.name, None, True)
+            for product in products:
+                self._add(("product", product.id), product.name, product.category_id, product.is_available)
+            self._built_at = time.monotonic()
+
+    # Orden estático de las sugerencias: categorías primero, nombres cortos primero
+    def _rank(self, key: Key):
+        entry = self._entries[key]
+        return (key[0] != "category", len(entry["name"]), entry["name"], key[1])
+
+    def _add(self, key: Key, name: str, category_id: Optional[int], is_available: bool):
+        words = set(tokenize(name))
+        self._entries[key] = {
+            "type": key[0],
+            "id": key[1],
+            "name": name,
+            "category_id": category_id,
+            "is_available": bool(is_available),
+        }
+        self._words[key] = words
+        for word in words:
+            node = self._root
+            for char in word:
+                node = node.children.setdefault(char, _TrieNode())
+                node.keys.add(key)
+                node.top = None
+            if not self._word_keys[word]:
+                sound = phonetic(word)
+                if not self._phonetic_words[sound]:
+                    for trigram in trigrams(sound):
+                        self._trigram_words[trigram].add(sound)
+                self._phonetic_words[sound].add(word)
+            self._word_keys[word].add(key)
+
+    def _remove(self, key: Key):
+        if self._entries.pop(key, None) is None:
+            return
+        for word in self._words.pop(key):
+            node = self._root
+            for char in word:
+                node = node.children[char]
+                node.keys.discard(key)
+                node.top = None
+            self._word_keys[word].discard(key)
+            if self._word_keys[word]:
+                continue
+            del self._word_keys[word]
+            sound = phonetic(word)
+            self._phonetic_words[sound].discard(word)
+            if not self._phonetic_words[sound]:
+                del self._phonetic_words[sound]
+                for trigram in trigrams(sound):
+                    self._trigram_words[trigram].discard(sound)
+
+    def update(self, kind: str, item_id: int, name: str, category_id: Optional[int] = None, is_available: bool = True):
+        if self._built_at is None:
+            return
+        with self._lock:
+            self._remove((kind, item_id))
+            self._add((kind, item_id), name, category_id, is_available)
+
+    def remove(self, kind: str, item_id: int):
+        if self._built_at is None:
+            return
+        with self._lock:
+            self._remove((kind, item_id))
+
+    def _node(self, prefix: str) -> Optional[_TrieNode]:
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def _similar_keys(self, word: str) -> Dict[Key, float]:
+        """
+        Entradas con palabras parecidas a `word` (similitud de trigramas)
+        """
+        query = trigrams(phonetic(word))
+        shared: Dict[str, int] = defaultdict(int)
+        for trigram in query:
+            for sound in self._trigram_words.get(trigram, ()):
+                shared[sound] += 1
+
+        similarity: Dict[Key, float] = {}
+        for sound, count in shared.items():
+            score = count / (len(query) + len(trigrams(sound)) - count)
+            if score < SIMILARITY_THRESHOLD:
+                continue
+            for indexed_word in self._phonetic_words[sound]:
+                for key in self._word_keys[indexed_word]:
+                    if score > similarity.get(key, 0.0):
+                        similarity[key] = score
+        return similarity
+
+    def suggest(self, query: str, limit: int = 8, available_only: bool = True) -> List[dict]:
+        words = tokenize(query)
+        if not words:
+            return []
+        limit = min(limit, MAX_LIMIT)
+        with self._lock:
+            candidates = None
+            fuzzy: Dict[Key, float] = {}
+            for word in words:
+                node = self._node(word)
+                if node is not None and node.keys:
+                    word_keys = node.keys
+                else:
+                    # Sin coincidencia de prefijo: palabras parecidas
+                    similar = self._similar_keys(word)
+                    for key, score in similar.items():
+                        fuzzy[key] = min(fuzzy.get(key, 1.0), score)
+                    word_keys = similar.keys()
+                candidates = set(word_keys) if candidates is None else candidates & word_keys
+                if not candidates:
+                    return []
+
+            def usable(key):
+                return not available_only or self._entries[key]["is_available"]
+
+            if len(words) == 1 and not fuzzy:
+                # Caso más frecuente (una palabra a medio escribir): sugerencias precalculadas del nodo
+                node = self._node(words[0])
+                if node.top is None:
+                    node.top = heapq.nsmallest(MAX_LIMIT * 4, node.keys, key=self._rank)
+                top = [key for key in node.top if usable(key)][:limit]
+                if len(top) == limit or len(node.top) == len(node.keys):
+                    keys = top
+                else:
+                    keys = heapq.nsmallest(limit, filter(usable, node.keys), key=self._rank)
+            else:
+                # Coincidencias exactas de prefijo antes que las aproximadas
+                keys = heapq.nsmallest(
+                    limit,
+                    filter(usable, candidates),
+                    key=lambda key: (-fuzzy.get(key, 2.0), self._rank(key))
+                )
+
+            return [
+                {
+                    "type": key[0],
+                    "id": key[1],
+                    "name": self._entries[key]["name"],
+                    "category_id": self._entries[key]["category_id"],
+                    "fuzzy": key in fuzzy,
+                }
+                for key in keys
+            ]
+
+
+autocomplete_index = AutocompleteIndex()
+
+
+def autocomplete(db: Session, query: str, limit: int = 8) -> List[dict]:
+    """
+    Sugerencias de productos y categorías para lo que el usuario lleva escrito.
+    Solo consulta la BD para construir el índice (la primera vez y al vencer).
+    """
+    if not autocomplete_index.built:
+        autocomplete_index.build(db)
+    return autocomplete_index.suggest(query, limit=limit)
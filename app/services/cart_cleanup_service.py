@@ -0,0 +1,118 @@
+"""
+Limpieza de carritos abandonados: elimina los carritos sin cambios en
+CART_ABANDONED_DAYS días junto con sus líneas, en lotes cortos (una
+transacción por lote) para no bloquear las tablas del carrito.
+
+Se ejecuta cada CART_SWEEP_INTERVAL segundos (run_cart_sweep_worker), bajo
+demanda con POST /admin/carts/sweep o desde la consola con sweep_carts.py.
+El usuario recupera un carrito vacío la próxima vez que lo use.
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, delete, func, or_
+from sqlalchemy.orm import Session
+
+from app.db.database import SessionLocal
+from app.models.cart import Cart, CartItem
+from app.services.cart_service import cart_summary_cache
+from app.services.cart_store import cart_store
+
+logger = logging.getLogger(__name__)
+
+CART_ABANDONED_DAYS = int(os.getenv("CART_ABANDONED_DAYS", 30))
+CART_SWEEP_BATCH_SIZE = int(os.getenv("CART_SWEEP_BATCH_SIZE", 500))
+CART_SWEEP_INTERVAL_SECONDS = float(os.getenv("CART_SWEEP_INTERVAL", 6 * 3600))
+# Pausa entre lotes: deja pasar a las escrituras de los usuarios
+CART_SWEEP_PAUSE_SECONDS = float(os.getenv("CART_SWEEP_PAUSE", 0.05))
+
+_carts = Cart.__table__
+_cart_items = CartItem.__table__
+
+
+def _abandoned(cutoff: datetime):
+    # Un carrito creado y nunca modificado no tiene updated_at
+    return or_(
+        Cart.updated_at < cutoff,
+        and_(Cart.updated_at.is_(None), Cart.created_at < cutoff)
+    )
+
+
+def sweep_abandoned_carts(
+    db: Session,
+    days: int = CART_ABANDONED_DAYS,
+    batch_size: int = CART_SWEEP_BATCH_SIZE,
+    dry_run: bool = False,
+    pause: float = CART_SWEEP_PAUSE_SECONDS
+) -> dict:
+    """
+    Eliminar los carritos sin actividad en `days` días y sus líneas. Cada lote
+    bloquea solo sus carritos (SKIP LOCKED: los que un usuario está modificando
+    se dejan para la próxima vez) y hace commit antes del siguiente.
+    Con `dry_run` solo cuenta lo que se eliminaría.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    report = {"cutoff": cutoff.isoformat(), "dry_run": dry_run, "carts": 0, "items": 0, "batches": 0}
+
+    if dry_run:
+        report["carts"] = db.query(func.count(Cart.id)).filter(_abandoned(cutoff)).scalar()
+        report["items"] = db.query(func.count(CartItem.id)).join(
+            Cart, Cart.id == CartItem.cart_id
+        ).filter(_abandoned(cutoff)).scalar()
+        return report
+
+    last_id = 0
+    while True:
+        rows = db.query(Cart.id, Cart.user_id).filter(
+            _abandoned(cutoff), Cart.id > last_id
+        ).order_by(Cart.id).limit(batch_size).with_for_update(skip_locked=True).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        # Carritos en memoria con cambios aún sin escribir: siguen activos
+        cart_ids = [row.id for row in rows if cart_store.discard_clean(row.user_id)]
+        if cart_ids:
+            items = db.execute(delete(_cart_items).where(_cart_items.c.cart_id.in_(cart_ids))).rowcount
+            carts = db.execute(delete(_carts).where(_carts.c.id.in_(cart_ids))).rowcount
+            report["items"] += items
+            report["carts"] += carts
+        db.commit()
+        report["batches"] += 1
+
+        # Un carrito nuevo del mismo usuario vuelve a empezar en la versión 0
+        for row in rows:
+            cart_summary_cache.discard(row.user_id)
+
+        if len(rows) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    if report["carts"]:
+        logger.info(
+            f"🧹 {report['carts']} carritos abandonados eliminados ({report['items']} líneas, "
+            f"{report['batches']} lotes, sin cambios desde {report['cutoff']})"
+        )
+    return report
+
+
+def run_cart_sweep() -> dict:
+    with SessionLocal() as db:
+        return sweep_abandoned_carts(db)
+
+
+async def run_cart_sweep_worker():
+    """
+    Bucle en segundo plano que elimina los carritos abandonados
+    """
+    logger.info("🧹 Worker de limpieza de carritos iniciado")
+    while True:
+        await asyncio.sleep(CART_SWEEP_INTERVAL_SECONDS)
+        try:
+            await asyncio.to_thread(run_cart_sweep)
+        except Exception as e:
+            logger.error(f"❌ Error en la limpieza de carritos abandonados: {e}")
@@ -1,9 +1,132 @@
-from sqlalchemy.orm import Session, joinedload
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, func, or_, select, text
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session, joinedload, load_only
 
 from app.models.cart import Cart, CartItem
 from app.models.product import Product
-from app.schemas.cart import CartItemCreate, CartItemUpdate
+from app.schemas.cart import CartBatchOperation, CartItemCreate, CartItemUpdate
 from app.schemas.order import OrderCreate, OrderItemCreate
+from app.services.cart_store import MemoryCart, MemoryCartLine, cart_store
+from app.services.catalog_cache import product_catalog
+
+# "database": cada cambio es un commit en carts/cart_items
+# "memory": carritos activos en memoria con escritura diferida (app/services/cart_store.py)
+CART_BACKEND = os.getenv("CART_BACKEND", "database").lower()
+
+CART_SUMMARY_CACHE_SIZE = int(os.getenv("CART_SUMMARY_CACHE_SIZE", 10000))
+CART_SUMMARY_TTL_SECONDS = float(os.getenv("CART_SUMMARY_TTL", 60))
+
+# Upsert de una línea validando carrito, disponibilidad y stock en la misma
+# sentencia. En SQL literal: la construcción equivalente de SQLAlchemy no se
+# cachea (se compila en cada toque) y en MySQL 8.0.20+ agrega un alias "AS new"
+# que INSERT ... SELECT no admite.
+_UPSERT_ITEM_SELECT = (
+    "INSERT INTO cart_items (cart_id, product_id, quantity, special_instructions) "
+    "SELECT carts.id, products.id, :quantity, :special_instructions "
+    "FROM products JOIN carts ON carts.user_id = :user_id "
+    "WHERE products.id = :product_id AND products.is_available = :available AND products.stock >= :quantity "
+)
+_UPSERT_ITEM = {
+    "mysql": text(
+        _UPSERT_ITEM_SELECT +
+        "ON DUPLICATE KEY UPDATE quantity = cart_items.quantity + :quantity, "
+        "special_instructions = COALESCE(:special_instructions, cart_items.special_instructions), "
+        "updated_at = CURRENT_TIMESTAMP"
+    ),
+    # Postgres y SQLite 3.24+
+    "on_conflict": text(
+        _UPSERT_ITEM_SELECT +
+        "ON CONFLICT (cart_id, product_id) DO UPDATE SET quantity = cart_items.quantity + excluded.quantity, "
+        "special_instructions = COALESCE(excluded.special_instructions, cart_items.special_instructions), "
+        "updated_at = CURRENT_TIMESTAMP"
+    ),
+}
+
+
+_cart_items = CartItem.__table__
+_UPDATE_LINE = _cart_items.update().where(_cart_items.c.id == bindparam("line_id")).values(
+    quantity=bindparam("quantity"),
+    special_instructions=bindparam("special_instructions"),
+    updated_at=func.now(),
+)
+
+
+class CartSummaryCache:
+    """
+    Total y cantidad de líneas por usuario, válidos mientras no cambien la
+    versión del carrito ni los precios del catálogo de este proceso. El TTL
+    cubre los precios cambiados desde otro proceso.
+    """
+
+    def __init__(self, max_size: int = CART_SUMMARY_CACHE_SIZE, ttl: float = CART_SUMMARY_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+
+    def get(self, user_id: int, version: int) -> Optional[Tuple[float, int]]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            cached_version, generation, expires_at, totals = entry
+            if cached_version != version or generation != product_catalog.generation or expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return totals
+
+    def discard(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def set(self, user_id: int, version: int, total_amount: float, items_count: int):
+        with self._lock:
+            self._entries[user_id] = (
+                version, product_catalog.generation, time.monotonic() + self.ttl, (total_amount, items_count)
+            )
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+cart_summary_cache = CartSummaryCache()
+
+
+def _memory_backend() -> bool:
+    return CART_BACKEND == "memory"
+
+
+def _dialect(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+
+def _user_cart_id(user_id: int):
+    return select(Cart.id).where(Cart.user_id == user_id).scalar_subquery()
+
+
+def _create_cart(db: Session, user_id: int):
+    """Crear el carrito del usuario si no existe, sin error si otra petición lo creó a la vez."""
+    dialect = _dialect(db)
+    if dialect == "postgresql":
+        statement = postgresql.insert(Cart).values(user_id=user_id).on_conflict_do_nothing(index_elements=["user_id"])
+    elif dialect == "sqlite":
+        statement = sqlite.insert(Cart).values(user_id=user_id).on_conflict_do_nothing(index_elements=["user_id"])
+    elif dialect == "mysql":
+        statement = mysql.insert(Cart).values(user_id=user_id).on_duplicate_key_update(user_id=Cart.user_id)
+    else:
+        if db.query(Cart.id).filter(Cart.user_id == user_id).first():
+            return
+        statement = Cart.__table__.insert().values(user_id=user_id)
+    db.execute(statement)
 
 
 def get_or_create_cart(db: Session, user_id: int):
@@ -11,119 +134,378 @@ def get_or_create_cart(db: Session, user_id: int):
     cart = db.query(Cart).filter(Cart.user_id == user_id).first()
     
     if not cart:
-        cart = Cart(user_id=user_id)
-        db.add(cart)
+        _create_cart(db, user_id)
         db.commit()
-        db.refresh(cart)
+        cart = db.query(Cart).filter(Cart.user_id == user_id).one()
     
     return cart
 
 def get_cart_with_items(db: Session, user_id: int):
-    """Obtener carrito con todos sus items."""
+    """Obtener carrito con todos sus items (una sola consulta)."""
+    if _memory_backend():
+        cart = _load_memory_cart(db, user_id)
+        return _memory_cart_view(db, cart) if cart else None
+
     cart = db.query(Cart).options(
-        joinedload(Cart.items).joinedload(CartItem.product)
+        joinedload(Cart.items).joinedload(CartItem.product).load_only(
+            Product.name, Product.price, Product.image_url
+        )
     ).filter(Cart.user_id == user_id).first()
     
     if cart:
         # Calcular campos dinámicos
         cart.total_amount = calculate_cart_total(cart)
         cart.items_count = len(cart.items)
+        cart_summary_cache.set(user_id, cart.version, cart.total_amount, cart.items_count)
         
         # Calcular campos para cada item
         for item in cart.items:
-            item.product_name = item.product.name
-            item.product_price = item.product.price
-            item.product_image = item.product.image_url
-            item.subtotal = item.quantity * item.product.price
+            _fill_item_fields(item)
     
     return cart
 
-def add_item_to_cart(db: Session, user_id: int, item_data: CartItemCreate):
-    """Agregar item al carrito."""
-    cart = get_or_create_cart(db, user_id)
-    
-    # Verificar si el producto existe
-    product = db.query(Product).filter(Product.id == item_data.product_id).first()
-    if not product or not product.is_available:
-        raise ValueError("Producto no disponible")
-    
-    # Verificar stock
-    if product.stock < item_data.quantity:
-        raise ValueError(f"Stock insuficiente. Disponible: {product.stock}")
-    
-    # Verificar si el producto ya está en el carrito
+def _fill_item_fields(item: CartItem):
+    item.product_name = item.product.name
+    item.product_price = item.product.price
+    item.product_image = item.product.image_url
+    item.subtotal = item.quantity * item.product.price
+
+def _bump_version(db: Session, user_id: int) -> bool:
+    """
+    Subir la versión del carrito. Va antes que los cambios de las líneas:
+    bloquea la fila del carrito hasta el commit, así las versiones no se cruzan.
+    Retorna False si el usuario no tiene carrito. No lee la versión nueva (sería
+    otra consulta por cambio): _cart_totals la trae junto con los totales.
+    """
+    return db.query(Cart).filter(Cart.user_id == user_id).update(
+        {Cart.version: Cart.version + 1, Cart.updated_at: func.now()},
+        synchronize_session=False
+    ) > 0
+
+def _cart_totals(db: Session, user_id: int):
+    """
+    id, versión, fecha, total y cantidad de líneas del carrito en una consulta
+    de agregación (sin cargar objetos). Guarda los totales en cart_summary_cache.
+    """
+    totals = db.query(
+        Cart.id,
+        Cart.version,
+        Cart.created_at,
+        func.coalesce(func.sum(CartItem.quantity * Product.price), 0).label("total_amount"),
+        func.count(CartItem.id).label("items_count")
+    ).outerjoin(CartItem, CartItem.cart_id == Cart.id).outerjoin(
+        Product, Product.id == CartItem.product_id
+    ).filter(Cart.user_id == user_id).group_by(Cart.id, Cart.version, Cart.created_at).first()
+    if totals is not None:
+        cart_summary_cache.set(user_id, totals.version, float(totals.total_amount), totals.items_count)
+    return totals
+
+def _cart_delta(db: Session, user_id: int, product_ids=(), item_ids=(), removed=()):
+    """
+    Respuesta delta (CartDeltaResponse): las líneas indicadas, los totales y la
+    versión, sin recargar el resto del carrito.
+    """
+    totals = _cart_totals(db, user_id)
+    conditions = []
+    if product_ids:
+        conditions.append(CartItem.product_id.in_(list(product_ids)))
+    if item_ids:
+        conditions.append(CartItem.id.in_(list(item_ids)))
+
+    changed = []
+    if conditions:
+        changed = db.query(CartItem).options(
+            joinedload(CartItem.product).load_only(Product.name, Product.price, Product.image_url)
+        ).filter(CartItem.cart_id == totals.id, or_(*conditions)).all()
+        for item in changed:
+            _fill_item_fields(item)
+
+    return {
+        "id": totals.id,
+        "version": totals.version,
+        "total_amount": float(totals.total_amount),
+        "items_count": totals.items_count,
+        "changed": changed,
+        "removed": list(removed),
+    }
+
+def _upsert_cart_item(db: Session, user_id: int, item_data: CartItemCreate) -> int:
+    """
+    Sumar la cantidad a la línea del producto (o crearla) en una sentencia,
+    solo si el carrito existe y el producto está disponible con stock.
+    Retorna las filas afectadas (0 si no se cumplió alguna condición).
+    """
+    dialect = _dialect(db)
+    if dialect == "mysql":
+        statement = _UPSERT_ITEM["mysql"]
+    elif dialect in ("postgresql", "sqlite"):
+        statement = _UPSERT_ITEM["on_conflict"]
+    else:
+        return _update_or_insert_cart_item(db, user_id, item_data)
+
+    return db.execute(statement, {
+        "user_id": user_id,
+        "product_id": item_data.product_id,
+        "quantity": item_data.quantity,
+        "special_instructions": item_data.special_instructions,
+        "available": True,
+    }).rowcount
+
+def _update_or_insert_cart_item(db: Session, user_id: int, item_data: CartItemCreate) -> int:
+    """Variante sin upsert para otros motores: lectura y escritura."""
+    cart_id = db.query(Cart.id).filter(Cart.user_id == user_id).scalar()
+    product = db.query(Product.is_available, Product.stock).filter(Product.id == item_data.product_id).first()
+    if cart_id is None or not product or not product.is_available or product.stock < item_data.quantity:
+        return 0
+
     existing_item = db.query(CartItem).filter(
-        CartItem.cart_id == cart.id,
+        CartItem.cart_id == cart_id,
         CartItem.product_id == item_data.product_id
     ).first()
-    
     if existing_item:
-        # Actualizar cantidad si ya existe
         existing_item.quantity += item_data.quantity
         if item_data.special_instructions:
             existing_item.special_instructions = item_data.special_instructions
     else:
-        # Crear nuevo item
-        cart_item = CartItem(
-            cart_id=cart.id,
+        db.add(CartItem(
+            cart_id=cart_id,
             product_id=item_data.product_id,
             quantity=item_data.quantity,
             special_instructions=item_data.special_instructions
-        )
-        db.add(cart_item)
+        ))
+    db.flush()
+    return 1
+
+def add_item_to_cart(db: Session, user_id: int, item_data: CartItemCreate, delta: bool = False):
+    """
+    Agregar item al carrito: un upsert y la recarga del carrito (o solo la
+    línea y los totales con `delta`). Las consultas de diagnóstico solo se
+    hacen si el upsert no afectó ninguna fila.
+    """
+    if _memory_backend():
+        return _memory_add_item(db, user_id, item_data, delta)
+
+    _bump_version(db, user_id)
+    if not _upsert_cart_item(db, user_id, item_data):
+        product = db.query(Product.is_available, Product.stock).filter(
+            Product.id == item_data.product_id
+        ).first()
+        if not product or not product.is_available:
+            db.rollback()
+            raise ValueError("Producto no disponible")
+        if product.stock < item_data.quantity:
+            db.rollback()
+            raise ValueError(f"Stock insuficiente. Disponible: {product.stock}")
+
+        # El usuario aún no tenía carrito
+        _create_cart(db, user_id)
+        _bump_version(db, user_id)
+        if not _upsert_cart_item(db, user_id, item_data):
+            db.rollback()
+            raise ValueError("Producto no disponible")
     
     db.commit()
+    if delta:
+        return _cart_delta(db, user_id, product_ids=[item_data.product_id])
     return get_cart_with_items(db, user_id)
 
-def update_cart_item(db: Session, user_id: int, item_id: int, item_update: CartItemUpdate):
-    """Actualizar item del carrito."""
-    cart = get_or_create_cart(db, user_id)
-    
-    cart_item = db.query(CartItem).filter(
-        CartItem.id == item_id,
-        CartItem.cart_id == cart.id
-    ).first()
-    
-    if not cart_item:
-        raise ValueError("Item no encontrado en el carrito")
-    
-    # Verificar stock si se está actualizando la cantidad
+def update_cart_item(db: Session, user_id: int, item_id: int, item_update: CartItemUpdate, delta: bool = False):
+    """
+    Actualizar item del carrito con un UPDATE condicionado al stock.
+    """
+    if _memory_backend():
+        return _memory_update_item(db, user_id, item_id, item_update, delta)
+
+    values = {}
     if item_update.quantity is not None:
-        product = db.query(Product).filter(Product.id == cart_item.product_id).first()
-        if product.stock < item_update.quantity:
-            raise ValueError(f"Stock insuficiente. Disponible: {product.stock}")
-        cart_item.quantity = item_update.quantity
-    
+        values["quantity"] = item_update.quantity
     if item_update.special_instructions is not None:
-        cart_item.special_instructions = item_update.special_instructions
+        values["special_instructions"] = item_update.special_instructions
+
+    query = db.query(CartItem).filter(
+        CartItem.id == item_id,
+        CartItem.cart_id == _user_cart_id(user_id)
+    )
+    if item_update.quantity is not None:
+        stock = select(Product.stock).where(Product.id == CartItem.product_id).scalar_subquery()
+        query = query.filter(stock >= item_update.quantity)
+
+    if values:
+        values["updated_at"] = func.now()
+        _bump_version(db, user_id)
+        updated = query.update(values, synchronize_session=False)
+    else:
+        updated = query.count()
+
+    if not updated:
+        db.rollback()
+        cart_item = db.query(CartItem.product_id).filter(
+            CartItem.id == item_id,
+            CartItem.cart_id == _user_cart_id(user_id)
+        ).first()
+        if not cart_item:
+            raise ValueError("Item no encontrado en el carrito")
+        stock = db.query(Product.stock).filter(Product.id == cart_item.product_id).scalar()
+        raise ValueError(f"Stock insuficiente. Disponible: {stock}")
     
     db.commit()
+    if delta:
+        return _cart_delta(db, user_id, item_ids=[item_id])
     return get_cart_with_items(db, user_id)
 
-def remove_item_from_cart(db: Session, user_id: int, item_id: int):
+def remove_item_from_cart(db: Session, user_id: int, item_id: int, delta: bool = False):
     """Eliminar item del carrito."""
-    cart = get_or_create_cart(db, user_id)
-    
-    cart_item = db.query(CartItem).filter(
+    if _memory_backend():
+        return _memory_remove_item(db, user_id, item_id, delta)
+
+    _bump_version(db, user_id)
+    deleted = db.query(CartItem).filter(
         CartItem.id == item_id,
-        CartItem.cart_id == cart.id
-    ).first()
+        CartItem.cart_id == _user_cart_id(user_id)
+    ).delete(synchronize_session=False)
     
-    if not cart_item:
+    if not deleted:
+        db.rollback()
         raise ValueError("Item no encontrado en el carrito")
     
-    db.delete(cart_item)
     db.commit()
+    if delta:
+        return _cart_delta(db, user_id, removed=[item_id])
     return get_cart_with_items(db, user_id)
 
-def clear_cart(db: Session, user_id: int):
+def clear_cart(db: Session, user_id: int, delta: bool = False):
     """Vaciar todo el carrito."""
-    cart = get_or_create_cart(db, user_id)
-    
-    # Eliminar todos los items
-    db.query(CartItem).filter(CartItem.cart_id == cart.id).delete()
+    if _memory_backend():
+        return _memory_clear(db, user_id, delta)
+
+    if not _bump_version(db, user_id):
+        _create_cart(db, user_id)
+    removed = []
+    if delta:
+        removed = [row.id for row in db.query(CartItem.id).filter(CartItem.cart_id == _user_cart_id(user_id))]
+    db.query(CartItem).filter(
+        CartItem.cart_id == _user_cart_id(user_id)
+    ).delete(synchronize_session=False)
     db.commit()
+    if delta:
+        return _cart_delta(db, user_id, removed=removed)
     
+    cart = get_cart_with_items(db, user_id)
+    if cart is None:
+        get_or_create_cart(db, user_id)
+        cart = get_cart_with_items(db, user_id)
+    return cart
+
+def _plan_cart_operations(
+    operations: List[CartBatchOperation],
+    lines: Dict[int, dict],
+    item_products: Dict[int, int],
+    product_info: Callable[[int], Optional[dict]]
+) -> Dict[int, dict]:
+    """
+    Aplicar las operaciones de un lote sobre las líneas actuales
+    ({product_id: {"quantity", "special_instructions"}}) sin tocar la BD.
+    `item_products` traduce el item_id de update/remove al producto de la línea.
+    El stock se valida contra la cantidad final de cada línea modificada.
+    Retorna las líneas finales o lanza ValueError con la operación que falló.
+    """
+    lines = {product_id: dict(line) for product_id, line in lines.items()}
+    changed = set()
+    for number, operation in enumerate(operations, start=1):
+        if operation.op == "add":
+            if operation.product_id is None or operation.quantity is None:
+                raise ValueError(f"Operación {number}: add requiere product_id y quantity")
+            product = product_info(operation.product_id)
+            if not product or not product["is_available"]:
+                raise ValueError(f"Operación {number}: Producto no disponible")
+            line = lines.setdefault(operation.product_id, {"quantity": 0, "special_instructions": None})
+            line["quantity"] += operation.quantity
+            if operation.special_instructions is not None:
+                line["special_instructions"] = operation.special_instructions
+            changed.add(operation.product_id)
+            continue
+
+        product_id = item_products.get(operation.item_id)
+        if product_id is None or product_id not in lines:
+            raise ValueError(f"Operación {number}: Item no encontrado en el carrito")
+        if operation.op == "remove":
+            del lines[product_id]
+            continue
+        if operation.quantity is not None:
+            lines[product_id]["quantity"] = operation.quantity
+        if operation.special_instructions is not None:
+            lines[product_id]["special_instructions"] = operation.special_instructions
+        changed.add(product_id)
+
+    for product_id in changed & lines.keys():
+        product = product_info(product_id)
+        stock = product["stock"] if product else 0
+        if stock < lines[product_id]["quantity"]:
+            name = product["name"] if product else product_id
+            raise ValueError(f"Stock insuficiente para {name}. Disponible: {stock}")
+    return lines
+
+def apply_cart_operations(db: Session, user_id: int, operations: List[CartBatchOperation], delta: bool = False):
+    """
+    Aplicar un lote de operaciones (add / update / remove) en una transacción:
+    todas o ninguna. Lee las líneas del carrito (bloqueadas) y el stock de
+    todos los productos en una consulta cada una, escribe solo las líneas que
+    cambiaron y recarga el carrito una vez.
+    """
+    if _memory_backend():
+        return _memory_apply_operations(db, user_id, operations, delta)
+
+    if not _bump_version(db, user_id):
+        _create_cart(db, user_id)
+    cart_id = db.query(Cart.id).filter(Cart.user_id == user_id).scalar()
+
+    current = db.query(
+        CartItem.id, CartItem.product_id, CartItem.quantity, CartItem.special_instructions
+    ).filter(CartItem.cart_id == cart_id).with_for_update().all()
+    lines = {
+        row.product_id: {"quantity": row.quantity, "special_instructions": row.special_instructions}
+        for row in current
+    }
+    line_ids = {row.product_id: row.id for row in current}
+    item_products = {row.id: row.product_id for row in current}
+
+    product_ids = {operation.product_id for operation in operations if operation.op == "add"}
+    product_ids.update(item_products.get(operation.item_id) for operation in operations if operation.op != "add")
+    product_ids.discard(None)
+    products = {
+        row.id: {"name": row.name, "is_available": row.is_available, "stock": row.stock or 0}
+        for row in db.query(Product.id, Product.name, Product.is_available, Product.stock).filter(
+            Product.id.in_(product_ids)
+        )
+    } if product_ids else {}
+
+    try:
+        final = _plan_cart_operations(operations, lines, item_products, products.get)
+    except ValueError:
+        db.rollback()
+        raise
+
+    removed = [product_id for product_id in lines if product_id not in final]
+    added = [product_id for product_id in final if product_id not in lines]
+    updated = [product_id for product_id in final if product_id in lines and final[product_id] != lines[product_id]]
+    if not (removed or added or updated):
+        # Nada cambió: deshacer la subida de versión
+        db.rollback()
+    if removed:
+        db.execute(_cart_items.delete().where(
+            _cart_items.c.id.in_([line_ids[product_id] for product_id in removed])
+        ))
+    if added:
+        db.execute(_cart_items.insert(), [
+            {"cart_id": cart_id, "product_id": product_id, **final[product_id]} for product_id in added
+        ])
+    if updated:
+        db.execute(_UPDATE_LINE, [{"line_id": line_ids[product_id], **final[product_id]} for product_id in updated])
+    db.commit()
+    if delta:
+        return _cart_delta(
+            db, user_id, product_ids=added + updated, removed=[line_ids[product_id] for product_id in removed]
+        )
     return get_cart_with_items(db, user_id)
 
 def calculate_cart_total(cart: Cart) -> float:
@@ -134,19 +516,28 @@ def calculate_cart_total(cart: Cart) -> float:
     return total
 
 def get_cart_summary(db: Session, user_id: int):
-    """Obtener resumen del carrito."""
-    cart = get_cart_with_items(db, user_id)
+    """
+    Resumen del carrito (el contador que se muestra en todas las pantallas):
+    una consulta por índice para la versión y, si los totales de esa versión
+    no están en caché, una de agregación SUM/COUNT.
+    """
+    if _memory_backend():
+        return _memory_summary(db, user_id)
+
+    cart = db.query(Cart.id, Cart.version, Cart.created_at).filter(Cart.user_id == user_id).first()
     if not cart:
         return None
-    
-    total_amount = calculate_cart_total(cart)
-    items_count = len(cart.items)
+
+    totals = cart_summary_cache.get(user_id, cart.version)
+    if totals is None:
+        row = _cart_totals(db, user_id)
+        totals = (float(row.total_amount), row.items_count)
     
     return {
         "id": cart.id,
-        "user_id": cart.user_id,
-        "total_amount": total_amount,
-        "items_count": items_count,
+        "user_id": user_id,
+        "total_amount": totals[0],
+        "items_count": totals[1],
         "created_at": cart.created_at
     }
 
@@ -185,5 +576,219 @@ def checkout_cart(db: Session, user_id: int, order_data: dict):
     
     # Limpiar el carrito después de crear la orden
     clear_cart(db, user_id)
+    if _memory_backend():
+        # El carrito vaciado se escribe ya, no en el próximo lote
+        memory_cart = cart_store.get(user_id)
+        if memory_cart is not None:
+            cart_store.flush(db, [memory_cart])
     
-    return order
\ No newline at end of file
+    return order
+
+
+# Backend en memoria (CART_BACKEND=memory): mismas respuestas y errores que
+# las funciones de arriba. Cada línea se identifica por su product_id (hay
+# una por producto), que es el item_id de las rutas /cart/items/{item_id}.
+
+def _load_memory_cart(db: Session, user_id: int, create: bool = False) -> Optional[MemoryCart]:
+    """Carrito en memoria del usuario; si no está, se carga de la BD (dos consultas)."""
+    cart = cart_store.get(user_id)
+    if cart is not None:
+        return cart
+
+    columns = (Cart.id, Cart.created_at, Cart.updated_at, Cart.version)
+    row = db.query(*columns).filter(Cart.user_id == user_id).first()
+    if row is None:
+        if not create:
+            return None
+        _create_cart(db, user_id)
+        db.commit()
+        row = db.query(*columns).filter(Cart.user_id == user_id).one()
+
+    cart = MemoryCart(row.id, user_id, row.created_at, row.updated_at, row.version)
+    lines = db.query(
+        CartItem.product_id, CartItem.quantity, CartItem.special_instructions,
+        CartItem.created_at, CartItem.updated_at
+    ).filter(CartItem.cart_id == row.id).order_by(CartItem.id)
+    for line in lines:
+        cart.lines[line.product_id] = MemoryCartLine(
+            line.product_id, line.quantity, line.special_instructions, line.created_at, line.updated_at
+        )
+    return cart_store.add(cart)
+
+def _memory_cart_view(db: Session, cart: MemoryCart):
+    """Carrito con los campos de CartResponse y precios de la caché del catálogo."""
+    with cart.lock:
+        lines = list(cart.lines.values())
+        updated_at = cart.updated_at
+        version = cart.version
+
+    items = []
+    for line in lines:
+        product = product_catalog.get(db, line.product_id)
+        if product is None:
+            continue
+        items.append(SimpleNamespace(
+            id=line.product_id,
+            cart_id=cart.id,
+            product_id=line.product_id,
+            quantity=line.quantity,
+            special_instructions=line.special_instructions,
+            product=SimpleNamespace(name=product["name"], price=product["price"], image_url=product["image_url"]),
+            product_name=product["name"],
+            product_price=product["price"],
+            product_image=product["image_url"],
+            subtotal=line.quantity * product["price"],
+            created_at=line.created_at,
+            updated_at=line.updated_at,
+        ))
+
+    return SimpleNamespace(
+        id=cart.id,
+        user_id=cart.user_id,
+        version=version,
+        total_amount=sum(item.subtotal for item in items),
+        items_count=len(items),
+        created_at=cart.created_at,
+        updated_at=updated_at,
+        items=items,
+    )
+
+def _memory_summary(db: Session, user_id: int):
+    cart = _load_memory_cart(db, user_id)
+    if cart is None:
+        return None
+    with cart.lock:
+        lines = [(line.product_id, line.quantity) for line in cart.lines.values()]
+
+    total_amount = 0.0
+    items_count = 0
+    for product_id, quantity in lines:
+        product = product_catalog.get(db, product_id)
+        if product is not None:
+            total_amount += quantity * product["price"]
+            items_count += 1
+    return {
+        "id": cart.id,
+        "user_id": user_id,
+        "total_amount": total_amount,
+        "items_count": items_count,
+        "created_at": cart.created_at
+    }
+
+def _memory_delta(db: Session, cart: MemoryCart, product_ids=(), removed=()):
+    view = _memory_cart_view(db, cart)
+    product_ids = set(product_ids)
+    return {
+        "id": view.id,
+        "version": view.version,
+        "total_amount": view.total_amount,
+        "items_count": view.items_count,
+        "changed": [item for item in view.items if item.product_id in product_ids],
+        "removed": list(removed),
+    }
+
+def _memory_add_item(db: Session, user_id: int, item_data: CartItemCreate, delta: bool = False):
+    product = product_catalog.get(db, item_data.product_id)
+    if not product or not product["is_available"]:
+        raise ValueError("Producto no disponible")
+    if product["stock"] < item_data.quantity:
+        raise ValueError(f"Stock insuficiente. Disponible: {product['stock']}")
+
+    cart = _load_memory_cart(db, user_id, create=True)
+    with cart.lock:
+        line = cart.lines.get(item_data.product_id)
+        if line is None:
+            cart.lines[item_data.product_id] = MemoryCartLine(
+                item_data.product_id, item_data.quantity, item_data.special_instructions
+            )
+        else:
+            line.quantity += item_data.quantity
+            if item_data.special_instructions is not None:
+                line.special_instructions = item_data.special_instructions
+            line.updated_at = datetime.now(timezone.utc)
+        cart.touch()
+    if delta:
+        return _memory_delta(db, cart, product_ids=[item_data.product_id])
+    return _memory_cart_view(db, cart)
+
+def _memory_update_item(db: Session, user_id: int, item_id: int, item_update: CartItemUpdate, delta: bool = False):
+    cart = _load_memory_cart(db, user_id)
+    if cart is None or item_id not in cart.lines:
+        raise ValueError("Item no encontrado en el carrito")
+    if item_update.quantity is not None:
+        product = product_catalog.get(db, item_id)
+        stock = product["stock"] if product else 0
+        if stock < item_update.quantity:
+            raise ValueError(f"Stock insuficiente. Disponible: {stock}")
+
+    with cart.lock:
+        line = cart.lines.get(item_id)
+        if line is None:
+            raise ValueError("Item no encontrado en el carrito")
+        if item_update.quantity is not None or item_update.special_instructions is not None:
+            if item_update.quantity is not None:
+                line.quantity = item_update.quantity
+            if item_update.special_instructions is not None:
+                line.special_instructions = item_update.special_instructions
+            line.updated_at = datetime.now(timezone.utc)
+            cart.touch()
+    if delta:
+        return _memory_delta(db, cart, product_ids=[item_id])
+    return _memory_cart_view(db, cart)
+
+def _memory_remove_item(db: Session, user_id: int, item_id: int, delta: bool = False):
+    cart = _load_memory_cart(db, user_id)
+    if cart is None:
+        raise ValueError("Item no encontrado en el carrito")
+    with cart.lock:
+        if cart.lines.pop(item_id, None) is None:
+            raise ValueError("Item no encontrado en el carrito")
+        cart.touch()
+    if delta:
+        return _memory_delta(db, cart, removed=[item_id])
+    return _memory_cart_view(db, cart)
+
+def _memory_clear(db: Session, user_id: int, delta: bool = False):
+    cart = _load_memory_cart(db, user_id, create=True)
+    with cart.lock:
+        removed = list(cart.lines)
+        if cart.lines:
+            cart.lines.clear()
+            cart.touch()
+    if delta:
+        return _memory_delta(db, cart, removed=removed)
+    return _memory_cart_view(db, cart)
+
+def _memory_apply_operations(db: Session, user_id: int, operations: List[CartBatchOperation], delta: bool = False):
+    cart = _load_memory_cart(db, user_id, create=True)
+    # El catálogo puede consultar la BD: resolver los productos antes de bloquear el carrito
+    product_ids = {operation.product_id for operation in operations if operation.op == "add"}
+    product_ids.update(operation.item_id for operation in operations if operation.op != "add")
+    products = {product_id: product_catalog.get(db, product_id) for product_id in product_ids if product_id is not None}
+
+    with cart.lock:
+        lines = {
+            product_id: {"quantity": line.quantity, "special_instructions": line.special_instructions}
+            for product_id, line in cart.lines.items()
+        }
+        final = _plan_cart_operations(
+            operations, lines, {product_id: product_id for product_id in lines}, products.get
+        )
+        changed = [product_id for product_id, values in final.items() if values != lines.get(product_id)]
+        removed = [product_id for product_id in lines if product_id not in final]
+        if final != lines:
+            now = datetime.now(timezone.utc)
+            for product_id in lines.keys() - final.keys():
+                del cart.lines[product_id]
+            for product_id, values in final.items():
+                line = cart.lines.get(product_id)
+                if line is None:
+                    cart.lines[product_id] = MemoryCartLine(product_id, values["quantity"], values["special_instructions"])
+                elif values != lines[product_id]:
+                    line.quantity = values["quantity"]
+                    line.special_instructions = values["special_instructions"]
+                    line.updated_at = now
+            cart.touch()
+    if delta:
+        return _memory_delta(db, cart, product_ids=changed, removed=removed)
+    return _memory_cart_view(db, cart)
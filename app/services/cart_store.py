@@ -0,0 +1,290 @@
+"""
+Almacén en memoria de los carritos activos (backend CART_BACKEND=memory).
+
+Los carritos cambian en cada toque mientras el cliente mira la carta, pero
+solo importan al hacer el pedido: se guardan en un LRU por usuario y los
+cambios se escriben en la BD después (write-behind), en lotes:
+- el worker run_cart_flush_worker cada CART_FLUSH_INTERVAL segundos
+- al sacar un carrito del LRU (más de CART_MEMORY_MAX_CARTS activos)
+- al hacer checkout y al apagar la app
+
+Cada carrito es del proceso que lo cargó: con varios workers el balanceador
+debe enviar a cada usuario siempre al mismo (sticky sessions).
+"""
+import asyncio
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import bindparam, delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db.database import SessionLocal
+from app.models.cart import Cart, CartItem
+from app.services.catalog_cache import product_catalog
+
+logger = logging.getLogger(__name__)
+
+CART_MEMORY_MAX_CARTS = int(os.getenv("CART_MEMORY_MAX_CARTS", 10000))
+CART_FLUSH_INTERVAL_SECONDS = float(os.getenv("CART_FLUSH_INTERVAL", 5))
+CART_FLUSH_BATCH_SIZE = int(os.getenv("CART_FLUSH_BATCH_SIZE", 200))
+
+# Tablas Core: executemany sin pasar por la sincronización de la sesión
+_carts = Cart.__table__
+_cart_items = CartItem.__table__
+_TOUCH_CART = update(_carts).where(_carts.c.id == bindparam("cart_id")).values(
+    version=bindparam("cart_version"),
+    updated_at=bindparam("updated_at"),
+)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class MemoryCartLine:
+    __slots__ = ("product_id", "quantity", "special_instructions", "created_at", "updated_at")
+
+    def __init__(self, product_id: int, quantity: int, special_instructions: Optional[str] = None,
+                 created_at: Optional[datetime] = None, updated_at: Optional[datetime] = None):
+        self.product_id = product_id
+        self.quantity = quantity
+        self.special_instructions = special_instructions
+        self.created_at = created_at or _now()
+        self.updated_at = updated_at
+
+
+class MemoryCart:
+    """
+    Carrito de un usuario: una línea por producto (como uq_cart_items_cart_id_product_id).
+    `version` es la de carts.version más los cambios en memoria y
+    `flushed_version` la última escrita en la BD.
+    """
+
+    def __init__(self, cart_id: int, user_id: int, created_at: datetime,
+                 updated_at: Optional[datetime] = None, version: int = 0):
+        self.id = cart_id
+        self.user_id = user_id
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.lines: Dict[int, MemoryCartLine] = {}
+        self.lock = threading.Lock()
+        self.version = version
+        self.flushed_version = version
+
+    @property
+    def dirty(self) -> bool:
+        return self.version != self.flushed_version
+
+    def touch(self):
+        """Registrar un cambio; llamar con `lock` tomado."""
+        self.updated_at = _now()
+        self.version += 1
+
+
+class CartStore:
+    def __init__(self, max_carts: int = CART_MEMORY_MAX_CARTS):
+        self.max_carts = max_carts
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._carts: "OrderedDict[int, MemoryCart]" = OrderedDict()
+        # Sacados del LRU con cambios aún no escritos
+        self._evicted: Dict[int, MemoryCart] = {}
+
+    def __len__(self):
+        return len(self._carts)
+
+    def get(self, user_id: int) -> Optional[MemoryCart]:
+        with self._lock:
+            cart = self._carts.get(user_id)
+            if cart is None:
+                cart = self._evicted.pop(user_id, None)
+                if cart is None:
+                    return None
+                self._carts[user_id] = cart
+            self._carts.move_to_end(user_id)
+        return cart
+
+    def add(self, cart: MemoryCart) -> MemoryCart:
+        """
+        Guardar un carrito recién cargado (o el que otra petición cargó a la vez)
+        y escribir los que salen del LRU.
+        """
+        with self._lock:
+            existing = self._carts.get(cart.user_id) or self._evicted.pop(cart.user_id, None)
+            if existing is not None:
+                cart = existing
+            self._carts[cart.user_id] = cart
+            self._carts.move_to_end(cart.user_id)
+
+            evicted = []
+            while len(self._carts) > self.max_carts:
+                _, old = self._carts.popitem(last=False)
+                if old.dirty:
+                    self._evicted[old.user_id] = old
+                    evicted.append(old)
+        if evicted:
+            with SessionLocal() as db:
+                self.flush(db, evicted)
+            with self._lock:
+                for old in evicted:
+                    if self._evicted.get(old.user_id) is old and not old.dirty:
+                        del self._evicted[old.user_id]
+        return cart
+
+    def discard_clean(self, user_id: int) -> bool:
+        """
+        Sacar el carrito del usuario si no tiene cambios sin escribir.
+        Retorna False si los tiene (el carrito está activo).
+        """
+        with self._lock:
+            cart = self._carts.get(user_id) or self._evicted.get(user_id)
+            if cart is not None and cart.dirty:
+                return False
+            self._carts.pop(user_id, None)
+            self._evicted.pop(user_id, None)
+        return True
+
+    def discard(self, user_id: int):
+        with self._lock:
+            self._carts.pop(user_id, None)
+            self._evicted.pop(user_id, None)
+
+    def dirty_carts(self) -> List[MemoryCart]:
+        with self._lock:
+            carts = list(self._carts.values()) + list(self._evicted.values())
+        return [cart for cart in carts if cart.dirty]
+
+    def flush(self, db: Session, carts: Iterable[MemoryCart]) -> int:
+        """
+        Escribir el estado de los carritos en la BD en una transacción: un
+        DELETE de sus líneas y un INSERT múltiple de las actuales. Si el lote
+        viola una restricción se reintenta carrito por carrito y se descartan
+        los que fallan. Retorna las líneas escritas.
+        """
+        # Un solo flush a la vez: uno más viejo no debe pisar a uno más nuevo
+        with self._flush_lock:
+            return self._flush(db, carts)
+
+    def _flush(self, db: Session, carts: Iterable[MemoryCart]) -> int:
+        snapshots = []
+        for cart in carts:
+            with cart.lock:
+                rows = []
+                for line in cart.lines.values():
+                    # Producto eliminado mientras estaba en el carrito
+                    if product_catalog.cached(line.product_id) is None:
+                        continue
+                    rows.append({
+                        "cart_id": cart.id,
+                        "product_id": line.product_id,
+                        "quantity": line.quantity,
+                        "special_instructions": line.special_instructions,
+                        "created_at": line.created_at,
+                        "updated_at": line.updated_at,
+                    })
+                snapshots.append((cart, cart.version, cart.updated_at, rows))
+        if not snapshots:
+            return 0
+
+        try:
+            self._write(db, snapshots)
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            # Un carrito o producto que ya no existe en la BD: escribir cada
+            # carrito en su SAVEPOINT para no bloquear al resto del lote
+            logger.warning(f"⚠️ Lote de {len(snapshots)} carritos rechazado, se escriben uno por uno: {e.orig}")
+            snapshots = self._write_each(db, snapshots)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        for cart, version, _, _ in snapshots:
+            with cart.lock:
+                cart.flushed_version = max(cart.flushed_version, version)
+        return sum(len(rows) for _, _, _, rows in snapshots)
+
+    @staticmethod
+    def _write(db: Session, snapshots: list):
+        """Un DELETE de las líneas de los carritos, un INSERT múltiple y la versión."""
+        cart_ids = [cart.id for cart, _, _, _ in snapshots]
+        rows = [row for _, _, _, cart_rows in snapshots for row in cart_rows]
+        touched = [
+            {"cart_id": cart.id, "cart_version": version, "updated_at": updated_at}
+            for cart, version, updated_at, _ in snapshots
+        ]
+        db.execute(delete(_cart_items).where(_cart_items.c.cart_id.in_(cart_ids)))
+        if rows:
+            db.execute(_cart_items.insert(), rows)
+        db.execute(_TOUCH_CART, touched)
+
+    def _write_each(self, db: Session, snapshots: list) -> list:
+        """
+        Escribir cada carrito en su SAVEPOINT. Los que violan una restricción
+        se descartan del almacén (se recargan de la BD en el próximo acceso).
+        Retorna los escritos.
+        """
+        written = []
+        for snapshot in snapshots:
+            cart = snapshot[0]
+            try:
+                with db.begin_nested():
+                    self._write(db, [snapshot])
+            except IntegrityError as e:
+                logger.error(f"❌ Carrito {cart.id} del usuario {cart.user_id} descartado al escribirlo: {e.orig}")
+                self.discard(cart.user_id)
+                continue
+            written.append(snapshot)
+        return written
+
+    def flush_dirty(self, db: Session, batch_size: int = CART_FLUSH_BATCH_SIZE) -> int:
+        """
+        Escribir todos los carritos con cambios, en lotes. Un lote que falla
+        queda sucio para el próximo ciclo sin frenar a los siguientes.
+        Retorna los carritos escritos.
+        """
+        carts = self.dirty_carts()
+        written = 0
+        for start in range(0, len(carts), batch_size):
+            batch = carts[start:start + batch_size]
+            try:
+                self.flush(db, batch)
+            except Exception as e:
+                logger.error(f"❌ Error al escribir un lote de {len(batch)} carritos: {e}")
+                continue
+            written += len(batch)
+        with self._lock:
+            for user_id, cart in list(self._evicted.items()):
+                if not cart.dirty:
+                    del self._evicted[user_id]
+        return written
+
+
+cart_store = CartStore()
+
+
+def flush_cart_store() -> int:
+    with SessionLocal() as db:
+        return cart_store.flush_dirty(db)
+
+
+async def run_cart_flush_worker():
+    """
+    Bucle en segundo plano que escribe en la BD los carritos en memoria con
+    cambios. Al apagar la app, llamar a flush_cart_store para no perder los últimos.
+    """
+    logger.info("🛒 Worker de escritura de carritos iniciado")
+    while True:
+        await asyncio.sleep(CART_FLUSH_INTERVAL_SECONDS)
+        try:
+            flushed = await asyncio.to_thread(flush_cart_store)
+            if flushed:
+                logger.debug(f"🛒 {flushed} carritos escritos en la BD")
+        except Exception as e:
+            logger.error(f"❌ Error al escribir carritos en la BD: {e}")
@@ -0,0 +1,95 @@
+"""
+Caché en memoria del catálogo de productos (nombre, precio, imagen,
+disponibilidad y stock) para las rutas que solo necesitan esos datos, como el
+carrito en memoria.
+
+Se construye desde la BD en la primera consulta y se reconstruye cada
+CATALOG_CACHE_TTL segundos (otros procesos pueden haber cambiado productos);
+product_service y order_service la actualizan en cada cambio de este proceso.
+El stock es orientativo: create_order lo vuelve a verificar en la BD.
+"""
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.product import Product
+
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", 60))
+
+_COLUMNS = (Product.id, Product.name, Product.price, Product.image_url, Product.is_available, Product.stock)
+
+
+def _entry(row) -> dict:
+    return {
+        "id": row.id,
+        "name": row.name,
+        "price": row.price,
+        "image_url": row.image_url,
+        "is_available": bool(row.is_available),
+        "stock": row.stock or 0,
+    }
+
+
+class ProductCatalogCache:
+    def __init__(self, ttl: float = CATALOG_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._products: Dict[int, dict] = {}
+        self._built_at: Optional[float] = None
+        # Aumenta cuando pueden haber cambiado precios: invalida los totales de carritos en caché
+        self.generation = 0
+
+    @property
+    def built(self) -> bool:
+        return self._built_at is not None and time.monotonic() - self._built_at < self.ttl
+
+    def build(self, db: Session):
+        products = {row.id: _entry(row) for row in db.query(*_COLUMNS).all()}
+        with self._lock:
+            self._products = products
+            self._built_at = time.monotonic()
+            self.generation += 1
+
+    def get(self, db: Session, product_id: int) -> Optional[dict]:
+        """
+        Datos del producto o None si no existe. Un producto que no está en la
+        caché (creado por otro proceso) se consulta y se agrega.
+        """
+        if not self.built:
+            self.build(db)
+        product = self._products.get(product_id)
+        if product is None:
+            row = db.query(*_COLUMNS).filter(Product.id == product_id).first()
+            if row is None:
+                return None
+            product = _entry(row)
+            with self._lock:
+                self._products[product_id] = product
+        return product
+
+    def cached(self, product_id: int) -> Optional[dict]:
+        """Datos del producto solo si ya están en la caché (sin consultar la BD)."""
+        return self._products.get(product_id)
+
+    def update(self, product: Product):
+        with self._lock:
+            self.generation += 1
+            if self._built_at is not None:
+                self._products[product.id] = _entry(product)
+
+    def set_stock(self, product_id: int, stock: int):
+        with self._lock:
+            product = self._products.get(product_id)
+            if product is not None:
+                product["stock"] = stock
+
+    def remove(self, product_id: int):
+        with self._lock:
+            self.generation += 1
+            self._products.pop(product_id, None)
+
+
+product_catalog = ProductCatalogCache()
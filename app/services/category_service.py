@@ -4,6 +4,10 @@ from sqlalchemy.orm import Session, joinedload
 from app.models.category import Category
 from app.models.product import Product
 from app.schemas.category import CategoryCreate, CategoryUpdate
+from app.services.autocomplete_service import autocomplete_index
+from app.services.catalog_cache import product_catalog
+from app.services.image_service import image_service
+from app.services.search_service import product_search_index
 
 
 def get_categories(db: Session, skip: int = 0, limit: int = 100):
@@ -34,6 +38,7 @@ def create_category(db: Session, category: CategoryCreate):
     db.add(db_category)
     db.commit()
     db.refresh(db_category)
+    autocomplete_index.update("category", db_category.id, db_category.name)
     return db_category
 
 def update_category(db: Session, category_id: int, category_update: CategoryUpdate):
@@ -50,16 +55,27 @@ def update_category(db: Session, category_id: int, category_update: CategoryUpda
     
     db.commit()
     db.refresh(db_category)
+    autocomplete_index.update("category", db_category.id, db_category.name)
     return db_category
 
 def delete_category(db: Session, category_id: int):
     """
-    Eliminar una categoría.
+    Eliminar una categoría. Sus productos se borran en cascada, así que antes se
+    liberan sus imágenes (el commit también persiste esos borrados encolados) y
+    después se quitan de los índices y la caché en memoria.
     """
     db_category = db.query(Category).filter(Category.id == category_id).first()
     if db_category:
+        product_ids = [product.id for product in db_category.products]
+        for product in db_category.products:
+            image_service.release_image(db, product.image_url)
         db.delete(db_category)
         db.commit()
+        autocomplete_index.remove("category", category_id)
+        for product_id in product_ids:
+            autocomplete_index.remove("product", product_id)
+            product_search_index.remove(product_id)
+            product_catalog.remove(product_id)
     return db_category
 
 def get_categories_with_product_count(db: Session, skip: int = 0, limit: int = 100):
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import uuid
 from pathlib import Path
@@ -8,6 +9,7 @@ from dotenv import load_dotenv
 from fastapi import HTTPException, UploadFile, status
 from firebase_admin import auth, credentials, storage
 from firebase_admin.exceptions import FirebaseError
+from google.api_core.exceptions import NotFound
 
 load_dotenv()
 
@@ -73,9 +75,38 @@ class FirebaseService:
                 detail=f"Error subiendo imagen: {str(e)}"
             )
 
-    async def delete_image(self, image_url: str) -> bool:
+    async def upload_bytes(
+        self,
+        content: bytes,
+        blob_path: str,
+        content_type: str = "image/jpeg"
+    ) -> str:
+        """
+        Subir contenido binario a una ruta concreta de Firebase Storage y retornar URL pública
+        """
+        def _upload():
+            blob = self.bucket.blob(blob_path)
+            blob.upload_from_string(content, content_type=content_type)
+            blob.make_public()
+            return blob.public_url
+
+        try:
+            # La subida del SDK es bloqueante: se ejecuta fuera del event loop
+            public_url = await asyncio.to_thread(_upload)
+            print(f"✅ Archivo subido exitosamente: {public_url}")
+            return public_url
+        except Exception as e:
+            print(f"❌ Error subiendo archivo a Firebase: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error subiendo imagen: {str(e)}"
+            )
+
+    async def delete_image(self, image_url: str, raise_errors: bool = False) -> bool:
         """
-        Eliminar imagen de Firebase Storage
+        Eliminar imagen de Firebase Storage.
+        Con raise_errors=True los fallos se propagan (para reintentos); un objeto
+        que ya no existe se considera eliminado.
         """
         try:
             # Extraer el path del blob desde la URL
@@ -87,13 +118,18 @@ class FirebaseService:
             if len(path_parts) >= 3:
                 blob_path = '/'.join(path_parts[2:])  # Saltar el bucket name
                 blob = self.bucket.blob(blob_path)
-                blob.delete()
+                await asyncio.to_thread(blob.delete)
                 print(f"✅ Imagen eliminada: {image_url}")
                 return True
             return False
             
+        except NotFound:
+            print(f"⚠️ La imagen ya no existe: {image_url}")
+            return True
         except Exception as e:
             print(f"⚠️ Error eliminando imagen: {e}")
+            if raise_errors:
+                raise
             return False
 
     async def verify_id_token(self, id_token: str) -> dict:
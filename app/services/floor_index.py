@@ -0,0 +1,207 @@
+"""
+Índice espacial del plano de mesas: una grilla de celdas de FLOOR_GRID_CELL
+unidades del plano, cada una con las mesas cuya posición cae en ella.
+- vista: solo se recorren las celdas que cubren el rectángulo visible
+- mesa libre más cercana: anillos de celdas alrededor del punto, hasta que
+  ninguna celda sin revisar pueda tener una mesa más cerca
+- choques: mesas a menos de TABLE_MIN_DISTANCE, mirando solo las celdas vecinas
+
+Las mesas del plano son pocos cientos y casi no se mueven: una grilla uniforme
+alcanza y se actualiza en O(1) al mover una mesa (un R-tree no aporta aquí).
+Se construye desde la BD en la primera consulta y se reconstruye cada
+FLOOR_INDEX_TTL segundos; table_service y order_service lo actualizan en cada
+cambio de este proceso.
+"""
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.table import Table
+
+FLOOR_GRID_CELL = float(os.getenv("FLOOR_GRID_CELL", 120))
+FLOOR_INDEX_TTL = float(os.getenv("FLOOR_INDEX_TTL", 30))
+# Distancia mínima entre los centros de dos mesas. Opcional (0: sin verificación),
+# para no rechazar de golpe los movimientos en planos que ya tienen mesas juntas
+TABLE_MIN_DISTANCE = float(os.getenv("TABLE_MIN_DISTANCE", 0))
+
+Cell = Tuple[int, int]
+
+
+def _entry(table) -> dict:
+    return {
+        "id": table.id,
+        "number": table.number,
+        "capacity": table.capacity,
+        "position_x": table.position_x,
+        "position_y": table.position_y,
+        "is_available": bool(table.is_available),
+    }
+
+
+class FloorPlanIndex:
+    def __init__(self, cell_size: float = FLOOR_GRID_CELL, ttl: float = FLOOR_INDEX_TTL):
+        self.cell_size = cell_size
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._tables: Dict[int, dict] = {}
+        self._cells: Dict[Cell, Set[int]] = defaultdict(set)
+        # Celdas extremas con mesas (no se achica al quitar mesas): límite de los anillos
+        self._bounds: Optional[Tuple[int, int, int, int]] = None
+        self._built_at: Optional[float] = None
+
+    @property
+    def built(self) -> bool:
+        return self._built_at is not None and time.monotonic() - self._built_at < self.ttl
+
+    def build(self, db: Session):
+        rows = db.query(
+            Table.id, Table.number, Table.capacity, Table.position_x, Table.position_y, Table.is_available
+        ).filter(Table.is_active == True).all()
+        with self._lock:
+            self._tables = {}
+            self._cells = defaultdict(set)
+            self._bounds = None
+            for row in rows:
+                self._put(_entry(row))
+            self._built_at = time.monotonic()
+
+    def _ensure(self, db: Session):
+        if not self.built:
+            self.build(db)
+
+    def _cell(self, x: float, y: float) -> Cell:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def _put(self, entry: dict):
+        cx, cy = self._cell(entry["position_x"], entry["position_y"])
+        self._tables[entry["id"]] = entry
+        self._cells[(cx, cy)].add(entry["id"])
+        if self._bounds is None:
+            self._bounds = (cx, cy, cx, cy)
+        else:
+            min_cx, min_cy, max_cx, max_cy = self._bounds
+            self._bounds = (min(min_cx, cx), min(min_cy, cy), max(max_cx, cx), max(max_cy, cy))
+
+    def _drop(self, table_id: int):
+        entry = self._tables.pop(table_id, None)
+        if entry is None:
+            return
+        cell = self._cell(entry["position_x"], entry["position_y"])
+        self._cells[cell].discard(table_id)
+        if not self._cells[cell]:
+            del self._cells[cell]
+
+    def _in_cells(self, first: Cell, last: Cell) -> Iterable[dict]:
+        if self._bounds is None:
+            return
+        # Una vista más grande que el plano no recorre celdas vacías
+        min_cx, min_cy, max_cx, max_cy = self._bounds
+        for cx in range(max(first[0], min_cx), min(last[0], max_cx) + 1):
+            for cy in range(max(first[1], min_cy), min(last[1], max_cy) + 1):
+                for table_id in self._cells.get((cx, cy), ()):
+                    yield self._tables[table_id]
+
+    def viewport(self, db: Session, min_x: float, min_y: float, max_x: float, max_y: float) -> List[dict]:
+        """Mesas con el centro dentro del rectángulo, por número"""
+        self._ensure(db)
+        with self._lock:
+            tables = [
+                dict(table) for table in self._in_cells(self._cell(min_x, min_y), self._cell(max_x, max_y))
+                if min_x <= table["position_x"] <= max_x and min_y <= table["position_y"] <= max_y
+            ]
+        return sorted(tables, key=lambda table: table["number"])
+
+    def nearest_free(self, db: Session, x: float, y: float, capacity: Optional[int] = None,
+                     limit: int = 1) -> List[dict]:
+        """
+        Mesas disponibles más cercanas al punto (con `distance`), de capacidad
+        ≥ `capacity` si se indica
+        """
+        self._ensure(db)
+        with self._lock:
+            if not self._cells:
+                return []
+            center = self._cell(x, y)
+            # Anillo más lejano que puede tener mesas
+            min_cx, min_cy, max_cx, max_cy = self._bounds
+            max_ring = max(center[0] - min_cx, max_cx - center[0], center[1] - min_cy, max_cy - center[1], 0)
+            found = []
+            for ring in range(max_ring + 1):
+                # Todo lo que falta revisar está a más de (ring - 1) celdas del punto
+                if len(found) >= limit and found[limit - 1][0] <= (ring - 1) * self.cell_size:
+                    break
+                for cx in range(center[0] - ring, center[0] + ring + 1):
+                    for cy in range(center[1] - ring, center[1] + ring + 1):
+                        if max(abs(cx - center[0]), abs(cy - center[1])) != ring:
+                            continue
+                        for table_id in self._cells.get((cx, cy), ()):
+                            table = self._tables[table_id]
+                            if not table["is_available"] or (capacity and table["capacity"] < capacity):
+                                continue
+                            distance = math.hypot(table["position_x"] - x, table["position_y"] - y)
+                            found.append((distance, table["number"], table_id))
+                found.sort()
+            return [
+                dict(self._tables[table_id], distance=round(distance, 2))
+                for distance, _, table_id in found[:limit]
+            ]
+
+    def collisions(self, db: Session, x: float, y: float, exclude: Iterable[int] = (),
+                   min_distance: float = TABLE_MIN_DISTANCE) -> List[dict]:
+        """Mesas a menos de `min_distance` del punto (sin las de `exclude`)"""
+        if min_distance <= 0:
+            return []
+        self._ensure(db)
+        excluded = set(exclude)
+        with self._lock:
+            return [
+                dict(table) for table in self._in_cells(
+                    self._cell(x - min_distance, y - min_distance),
+                    self._cell(x + min_distance, y + min_distance)
+                )
+                if table["id"] not in excluded
+                and math.hypot(table["position_x"] - x, table["position_y"] - y) < min_distance
+            ]
+
+    def tables(self, db: Session, table_ids: Iterable[int]) -> List[dict]:
+        self._ensure(db)
+        with self._lock:
+            return [dict(self._tables[table_id]) for table_id in table_ids if table_id in self._tables]
+
+    def update(self, table: Table):
+        """Mesa creada, editada o movida (se quita si quedó inactiva)"""
+        if self._built_at is None:
+            return
+        with self._lock:
+            self._drop(table.id)
+            if table.is_active:
+                self._put(_entry(table))
+
+    def move(self, positions: Dict[int, Tuple[float, float]]):
+        if self._built_at is None:
+            return
+        with self._lock:
+            for table_id, (x, y) in positions.items():
+                entry = self._tables.get(table_id)
+                if entry is None:
+                    continue
+                self._drop(table_id)
+                self._put(dict(entry, position_x=x, position_y=y))
+
+    def set_available(self, table_id: int, is_available: bool):
+        with self._lock:
+            entry = self._tables.get(table_id)
+            if entry is not None:
+                entry["is_available"] = is_available
+
+    def remove(self, table_id: int):
+        with self._lock:
+            self._drop(table_id)
+
+
+floor_index = FloorPlanIndex()
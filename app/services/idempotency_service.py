@@ -0,0 +1,311 @@
+"""
+Idempotencia de la creación de pedidos (cabecera Idempotency-Key).
+
+La primera solicitud con una clave la reclama insertando una fila
+"en_proceso" en idempotency_keys y, al terminar, guarda el id del pedido y la
+respuesta. Las repeticiones reciben esa respuesta sin volver a crear el
+pedido, descontar stock ni avisar a la cocina:
+- en el mismo proceso, los duplicados simultáneos esperan a la primera (single-flight)
+- desde otro proceso, consultan la fila hasta IDEMPOTENCY_WAIT_SECONDS
+
+La fila pasa a "completado" con el id del pedido en la misma transacción que
+inserta el pedido. Si la primera falla antes de ese commit se borra la fila y
+el cliente puede reintentar con la misma clave; si falla después (al armar la
+respuesta, al avisar a la cocina o por cancelación) la clave queda ligada al
+pedido y el reintento lo recibe.
+
+Las claves se borran IDEMPOTENCY_KEY_TTL_HOURS horas después de reclamadas, en
+lotes cada IDEMPOTENCY_SWEEP_INTERVAL segundos (run_idempotency_sweep_worker).
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import delete, event, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db.database import SessionLocal
+from app.models.idempotency_key import IdempotencyKey
+from app.models.order import Order
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", 30))
+IDEMPOTENCY_POLL_SECONDS = float(os.getenv("IDEMPOTENCY_POLL_SECONDS", 0.1))
+# Una fila "en_proceso" más vieja que esto quedó de un proceso que murió
+IDEMPOTENCY_LOCK_TIMEOUT_SECONDS = float(os.getenv("IDEMPOTENCY_LOCK_TIMEOUT", 120))
+IDEMPOTENCY_KEY_TTL_HOURS = float(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", 24))
+IDEMPOTENCY_SWEEP_BATCH_SIZE = int(os.getenv("IDEMPOTENCY_SWEEP_BATCH_SIZE", 500))
+IDEMPOTENCY_SWEEP_INTERVAL_SECONDS = float(os.getenv("IDEMPOTENCY_SWEEP_INTERVAL", 3600))
+
+_keys = IdempotencyKey.__table__
+
+# Crea el pedido y retorna (order_id, respuesta serializable a JSON)
+Handler = Callable[[], Awaitable[Tuple[int, dict]]]
+
+# Solicitudes en curso de este proceso: (user_id, clave) → (futuro de la respuesta, hash)
+_inflight: Dict[Tuple[int, str], Tuple[asyncio.Future, str]] = {}
+
+
+class IdempotencyError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def request_hash(endpoint: str, payload) -> str:
+    return hashlib.sha256(json.dumps([endpoint, payload], sort_keys=True, default=str).encode()).hexdigest()
+
+
+class _OrderLink:
+    """
+    Mientras corre el handler, marca la clave "completado" con el id del pedido
+    en la misma transacción que inserta el pedido (el primer commit con una
+    Order nueva).
+    """
+
+    def __init__(self, db: Session, record_id: int):
+        self.db = db
+        self.record_id = record_id
+        self.order_id: Optional[int] = None
+        self._flushed: Optional[int] = None
+        event.listen(db, "after_flush", self._after_flush)
+        event.listen(db, "before_commit", self._before_commit)
+        event.listen(db, "after_rollback", self._after_rollback)
+
+    def _after_flush(self, session, flush_context):
+        if self.order_id is None and self._flushed is None:
+            for obj in session.new:
+                if isinstance(obj, Order):
+                    self._flushed = obj.id
+                    break
+
+    def _before_commit(self, session):
+        if self.order_id is not None:
+            return
+        # El commit escribe lo pendiente después de este evento: escribirlo ya
+        session.flush()
+        if self._flushed is not None:
+            session.execute(update(_keys).where(_keys.c.id == self.record_id).values(
+                status="completado",
+                order_id=self._flushed
+            ))
+            self.order_id = self._flushed
+
+    def _after_rollback(self, session):
+        if self.order_id is None:
+            self._flushed = None
+
+    def remove(self):
+        event.remove(self.db, "after_flush", self._after_flush)
+        event.remove(self.db, "before_commit", self._before_commit)
+        event.remove(self.db, "after_rollback", self._after_rollback)
+
+
+def _check_hash(stored: str, digest: str):
+    if stored != digest:
+        raise IdempotencyError(422, "Idempotency-Key ya usada con otra solicitud")
+
+
+def _claim(db: Session, user_id: int, key: str, endpoint: str, digest: str) -> Tuple[Optional[IdempotencyKey], bool]:
+    """
+    Insertar la fila "en_proceso" de la clave. Retorna la fila y si la
+    reclamó esta solicitud (o None si otra la acaba de borrar).
+    """
+    now = datetime.utcnow()
+    try:
+        db.execute(insert(IdempotencyKey).values(
+            user_id=user_id,
+            key=key,
+            endpoint=endpoint,
+            request_hash=digest,
+            status="en_proceso",
+            locked_at=now
+        ))
+        db.commit()
+        claimed = True
+    except IntegrityError:
+        db.rollback()
+        claimed = False
+
+    record = db.query(IdempotencyKey).filter(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.key == key
+    ).populate_existing().first()
+    if record is None or claimed or record.status != "en_proceso":
+        return record, claimed
+
+    if record.locked_at < now - timedelta(seconds=IDEMPOTENCY_LOCK_TIMEOUT_SECONDS) and record.request_hash == digest:
+        # Tomar la clave abandonada, solo si nadie la tomó antes
+        claimed = db.query(IdempotencyKey).filter(
+            IdempotencyKey.id == record.id,
+            IdempotencyKey.status == "en_proceso",
+            IdempotencyKey.locked_at == record.locked_at
+        ).update({IdempotencyKey.locked_at: now}, synchronize_session=False) == 1
+        db.commit()
+    return record, claimed
+
+
+def _release(db: Session, record_id: int):
+    db.rollback()
+    db.query(IdempotencyKey).filter(
+        IdempotencyKey.id == record_id,
+        IdempotencyKey.status == "en_proceso"
+    ).delete(synchronize_session=False)
+    db.commit()
+
+
+def _replay(db: Session, record: IdempotencyKey) -> dict:
+    if record.response_body:
+        return json.loads(record.response_body)
+    if record.order_id is None:
+        raise IdempotencyError(409, "El pedido de esta Idempotency-Key fue eliminado")
+    # El pedido se guardó pero la primera solicitud falló antes de guardar la respuesta
+    from app.schemas.order import OrderResponse
+    from app.services.order_service import get_order_by_id
+    return OrderResponse.model_validate(get_order_by_id(db, record.order_id)).model_dump(mode="json")
+
+
+def _complete(db: Session, record_id: int, order_id: int, body: dict):
+    db.query(IdempotencyKey).filter(IdempotencyKey.id == record_id).update({
+        IdempotencyKey.status: "completado",
+        IdempotencyKey.order_id: order_id,
+        IdempotencyKey.response_body: json.dumps(body, default=str),
+    }, synchronize_session=False)
+    db.commit()
+
+
+async def _run_claimed(db: Session, user_id: int, key: str, endpoint: str, digest: str,
+                       handler: Handler) -> Tuple[dict, bool]:
+    deadline = time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+    while True:
+        record, claimed = _claim(db, user_id, key, endpoint, digest)
+        if claimed:
+            break
+        if record is not None:
+            _check_hash(record.request_hash, digest)
+            if record.status == "completado":
+                return _replay(db, record), True
+        if time.monotonic() > deadline:
+            raise IdempotencyError(409, "Hay una solicitud en proceso con esta Idempotency-Key")
+        # En proceso en otro worker
+        await asyncio.sleep(IDEMPOTENCY_POLL_SECONDS)
+
+    record_id = record.id
+    link = _OrderLink(db, record_id)
+    try:
+        order_id, body = await handler()
+    except BaseException:
+        # Con el pedido ya guardado la clave no se libera: el reintento lo recibe
+        if link.order_id is None:
+            _release(db, record_id)
+        raise
+    finally:
+        link.remove()
+    _complete(db, record_id, order_id, body)
+    return body, False
+
+
+async def run_idempotent(
+    db: Session,
+    user_id: int,
+    key: Optional[str],
+    endpoint: str,
+    payload,
+    handler: Handler
+) -> Tuple[dict, bool]:
+    """
+    Ejecutar `handler` una sola vez por (usuario, Idempotency-Key). Retorna la
+    respuesta y si es una repetición. Sin clave se ejecuta siempre.
+    """
+    if not key:
+        _, body = await handler()
+        return body, False
+
+    digest = request_hash(endpoint, payload)
+    flight = (user_id, key)
+    if flight in _inflight:
+        first, first_digest = _inflight[flight]
+        _check_hash(first_digest, digest)
+        done, _ = await asyncio.wait({first}, timeout=IDEMPOTENCY_WAIT_SECONDS)
+        if not done:
+            raise IdempotencyError(409, "Hay una solicitud en proceso con esta Idempotency-Key")
+        if not first.cancelled():
+            if first.exception() is not None:
+                raise first.exception()
+            return first.result(), True
+        # La primera se canceló (cliente desconectado): intentar como nueva
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[flight] = (future, digest)
+    try:
+        body, replayed = await _run_claimed(db, user_id, key, endpoint, digest, handler)
+        future.set_result(body)
+        return body, replayed
+    except Exception as e:
+        future.set_exception(e)
+        # Marcar como leída aunque no haya duplicados esperando
+        future.exception()
+        raise
+    finally:
+        if not future.done():
+            future.cancel()
+        if _inflight.get(flight, (None,))[0] is future:
+            del _inflight[flight]
+
+
+def sweep_expired_keys(
+    db: Session,
+    hours: float = IDEMPOTENCY_KEY_TTL_HOURS,
+    batch_size: int = IDEMPOTENCY_SWEEP_BATCH_SIZE
+) -> int:
+    """
+    Borrar las claves reclamadas hace más de `hours` horas, en lotes (un
+    commit por lote). Retorna cuántas se borraron. Se compara locked_at
+    (UTC calculado en Python) y no created_at, que pone el servidor en su
+    propia zona horaria.
+    """
+    cutoff = datetime.utcnow() - timedelta(hours=hours)
+    deleted = 0
+    while True:
+        # Las más viejas tienen los ids más bajos: cada lote sale del inicio de la PK
+        ids = [
+            key_id for key_id, in db.query(IdempotencyKey.id).filter(
+                IdempotencyKey.locked_at < cutoff
+            ).order_by(IdempotencyKey.id).limit(batch_size)
+        ]
+        if not ids:
+            break
+        deleted += db.execute(delete(_keys).where(_keys.c.id.in_(ids))).rowcount
+        db.commit()
+        if len(ids) < batch_size:
+            break
+
+    if deleted:
+        logger.info(f"🧹 {deleted} claves de idempotencia vencidas eliminadas (reclamadas antes de {cutoff.isoformat()})")
+    return deleted
+
+
+def run_idempotency_sweep() -> int:
+    with SessionLocal() as db:
+        return sweep_expired_keys(db)
+
+
+async def run_idempotency_sweep_worker():
+    """
+    Bucle en segundo plano que elimina las claves de idempotencia vencidas
+    """
+    logger.info("🧹 Worker de limpieza de claves de idempotencia iniciado")
+    while True:
+        await asyncio.sleep(IDEMPOTENCY_SWEEP_INTERVAL_SECONDS)
+        try:
+            await asyncio.to_thread(run_idempotency_sweep)
+        except Exception as e:
+            logger.error(f"❌ Error en la limpieza de claves de idempotencia: {e}")
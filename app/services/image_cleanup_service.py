@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.db.database import SessionLocal
+from app.models.image_cleanup_job import ImageCleanupJob
+from app.models.stored_image import StoredImage
+from app.services.firebase_service import firebase_service
+
+logger = logging.getLogger(__name__)
+
+CLEANUP_BATCH_SIZE = int(os.getenv("IMAGE_CLEANUP_BATCH_SIZE", 20))
+CLEANUP_INTERVAL_SECONDS = float(os.getenv("IMAGE_CLEANUP_INTERVAL", 30))
+CLEANUP_MAX_ATTEMPTS = int(os.getenv("IMAGE_CLEANUP_MAX_ATTEMPTS", 6))
+CLEANUP_RETRY_BASE_SECONDS = float(os.getenv("IMAGE_CLEANUP_RETRY_BASE", 30))
+
+# Los objetos deduplicados llevan el SHA-256 del contenido al inicio del nombre
+_CONTENT_HASH_RE = re.compile(r"/([0-9a-f]{64})[^/]*$")
+
+_wakeup: Optional[asyncio.Event] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def enqueue_image_cleanup(db: Session, image_url: str) -> ImageCleanupJob:
+    """
+    Encolar el borrado de un objeto; se persiste con la misma transacción del llamador
+    """
+    job = ImageCleanupJob(
+        image_url=image_url,
+        status="pendiente",
+        attempts=0,
+        next_attempt_at=datetime.utcnow()
+    )
+    db.add(job)
+    return job
+
+
+def _schedule_retry(job: ImageCleanupJob, error: Exception):
+    job.attempts += 1
+    job.last_error = str(error)[:1000]
+    if job.attempts >= CLEANUP_MAX_ATTEMPTS:
+        job.status = "fallido"
+        logger.error(f"❌ Borrado de imagen abandonado tras {job.attempts} intentos: {job.image_url}")
+    else:
+        delay = CLEANUP_RETRY_BASE_SECONDS * (2 ** (job.attempts - 1))
+        job.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+        logger.warning(f"⚠️ Reintento {job.attempts} de borrado en {delay:.0f}s: {job.image_url}")
+
+
+def _used_by_live_image(db: Session, url: str) -> bool:
+    """
+    Si una URL sin fila propia (una variante, o la copia de una subida paralela)
+    es la original o una variante de la imagen viva con el mismo contenido
+    """
+    match = _CONTENT_HASH_RE.search(url)
+    if match is None:
+        return False
+    stored = db.query(StoredImage).filter(
+        StoredImage.content_hash == match.group(1)
+    ).with_for_update().first()
+    return (
+        stored is not None
+        and stored.status == "activo"
+        and url in (stored.url, *(stored.variants or {}).values())
+    )
+
+
+async def _run_job(db: Session, job_id: int) -> bool:
+    """
+    Borrar los objetos de un trabajo (la original y sus variantes). La fila de
+    StoredImage queda "borrando" mientras se borran, sin bloqueos, y se elimina
+    solo después, en otra transacción que vuelve a comprobarla: una subida del
+    mismo contenido en ese intervalo no la reutiliza y sube a otra ruta.
+    Retorna False si otro worker ya tomó el trabajo.
+    """
+    now = datetime.utcnow()
+    job = db.query(ImageCleanupJob).filter(
+        ImageCleanupJob.id == job_id,
+        ImageCleanupJob.status == "pendiente",
+        ImageCleanupJob.next_attempt_at <= now
+    ).with_for_update(skip_locked=True).first()
+    if job is None:
+        db.rollback()
+        return False
+
+    stored = db.query(StoredImage).filter(
+        StoredImage.url == job.image_url
+    ).with_for_update().first()
+
+    if (stored and stored.ref_count > 0) or (stored is None and _used_by_live_image(db, job.image_url)):
+        # La imagen se volvió a usar después de encolar el borrado (o se subió
+        # otra vez a las mismas rutas, p. ej. variantes encoladas como trabajos sueltos)
+        job.status = "omitido"
+        db.commit()
+        return True
+
+    urls = [job.image_url]
+    if stored:
+        urls.extend((stored.variants or {}).values())
+        stored.status = "borrando"
+    # Mientras se borran los objetos ningún otro worker toma el trabajo; si este
+    # proceso muere a mitad, se reintenta al vencer el plazo
+    job.next_attempt_at = now + timedelta(seconds=CLEANUP_RETRY_BASE_SECONDS)
+    db.commit()
+
+    try:
+        for url in urls:
+            await firebase_service.delete_image(url, raise_errors=True)
+    except Exception as e:
+        # La fila sigue "borrando": el reintento vuelve a borrar todo
+        _schedule_retry(job, e)
+        db.commit()
+        return True
+
+    stored = db.query(StoredImage).filter(
+        StoredImage.url == job.image_url
+    ).with_for_update().first()
+    if stored and stored.status == "borrando" and stored.ref_count == 0:
+        db.delete(stored)
+    job.status = "completado"
+    db.commit()
+    return True
+
+
+async def process_pending_cleanup_jobs(db: Session, batch_size: int = CLEANUP_BATCH_SIZE) -> int:
+    """
+    Procesar un lote de borrados pendientes con reintentos y backoff exponencial
+    """
+    job_ids = [
+        job_id for job_id, in db.query(ImageCleanupJob.id).filter(
+            ImageCleanupJob.status == "pendiente",
+            ImageCleanupJob.next_attempt_at <= datetime.utcnow()
+        ).order_by(ImageCleanupJob.id).limit(batch_size)
+    ]
+    db.rollback()
+
+    for job_id in job_ids:
+        try:
+            await _run_job(db, job_id)
+        except Exception as e:
+            # Error de BD antes de borrar nada: el trabajo sigue pendiente
+            db.rollback()
+            logger.error(f"❌ Error procesando el borrado {job_id}: {e}")
+
+    return len(job_ids)
+
+
+async def run_image_cleanup_worker():
+    """
+    Bucle en segundo plano que vacía la cola de borrado de imágenes
+    """
+    global _wakeup, _loop
+    _wakeup = asyncio.Event()
+    _loop = asyncio.get_running_loop()
+    logger.info("🧹 Worker de limpieza de imágenes iniciado")
+
+    while True:
+        processed = 0
+        try:
+            with SessionLocal() as db:
+                processed = await process_pending_cleanup_jobs(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Error en worker de limpieza de imágenes: {e}")
+
+        # Si el lote vino lleno hay más trabajo: seguir sin esperar
+        if processed >= CLEANUP_BATCH_SIZE:
+            continue
+
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=CLEANUP_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _wakeup.clear()
+
+
+def wake_image_cleanup_worker():
+    """
+    Avisar al worker de que hay trabajo nuevo (seguro desde cualquier hilo)
+    """
+    if _wakeup is not None and _loop is not None and not _loop.is_closed():
+        _loop.call_soon_threadsafe(_wakeup.set)
@@ -1,44 +1,367 @@
+import asyncio
+import hashlib
+import io
 import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 from fastapi import HTTPException, UploadFile, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.models.stored_image import StoredImage
 from app.services.firebase_service import firebase_service
+from app.services.image_cleanup_service import enqueue_image_cleanup
+
+# Variantes responsivas: nombre -> lado máximo en píxeles
+IMAGE_VARIANTS = {
+    "thumb": 160,
+    "card": 480,
+    "full": 1200,
+}
+VARIANT_FORMAT = "WEBP"
+VARIANT_CONTENT_TYPE = "image/webp"
+VARIANT_QUALITY = int(os.getenv("IMAGE_VARIANT_QUALITY", 80))
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", 2))
+HASH_CHUNK_SIZE = 64 * 1024
+
+# Dominios de los objetos que gestionamos en Firebase Storage
+MANAGED_STORAGE_HOSTS = ("firebasestorage.googleapis.com", "storage.googleapis.com")
+
+
+def is_managed_url(image_url: Optional[str]) -> bool:
+    """
+    Indicar si una URL apunta a un objeto de nuestro bucket
+    """
+    return bool(image_url) and any(host in image_url for host in MANAGED_STORAGE_HOSTS)
+
+
+def render_variants(content: bytes) -> Dict[str, bytes]:
+    """
+    Generar las variantes redimensionadas de una imagen (se ejecuta en el pool de procesos)
+    """
+    from PIL import Image, ImageOps
+
+    variants = {}
+    with Image.open(io.BytesIO(content)) as original:
+        image = ImageOps.exif_transpose(original)
+        has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+        for name, max_side in IMAGE_VARIANTS.items():
+            variant = image.copy()
+            # thumbnail nunca agranda: las imágenes pequeñas conservan su tamaño
+            variant.thumbnail((max_side, max_side), Image.LANCZOS)
+            buffer = io.BytesIO()
+            variant.save(buffer, format=VARIANT_FORMAT, quality=VARIANT_QUALITY, method=4)
+            variants[name] = buffer.getvalue()
+
+    return variants
 
 
 class ImageService:
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # El pool se crea bajo demanda para no lanzar procesos al importar
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=IMAGE_WORKERS)
+        return self._pool
+
+    def shutdown(self):
+        """
+        Cerrar el pool de procesos de imágenes
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def generate_variants(self, content: bytes) -> Dict[str, bytes]:
+        """
+        Redimensionar una imagen en el pool de procesos sin bloquear el event loop
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_pool(), render_variants, content)
+        except Exception as e:
+            # Formatos que Pillow no puede abrir (p. ej. SVG) se sirven sin variantes
+            print(f"⚠️ No se pudieron generar variantes: {e}")
+            return {}
+
+    async def read_and_hash(self, file: UploadFile) -> Tuple[bytes, str]:
+        """
+        Leer la subida por bloques calculando su SHA-256
+        """
+        hasher = hashlib.sha256()
+        chunks = []
+        while True:
+            chunk = await file.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            hasher.update(chunk)
+            chunks.append(chunk)
+        return b"".join(chunks), hasher.hexdigest()
+
+    async def _upload_content(
+        self,
+        content: bytes,
+        base_name: str,
+        extension: str,
+        content_type: str,
+        folder: str
+    ) -> Tuple[str, Dict[str, str]]:
+        image_url = await firebase_service.upload_bytes(
+            content,
+            f"{folder}/{base_name}{extension}",
+            content_type=content_type
+        )
+
+        rendered = await self.generate_variants(content)
+        urls = await asyncio.gather(*[
+            firebase_service.upload_bytes(
+                data,
+                f"{folder}/variants/{base_name}_{name}.webp",
+                content_type=VARIANT_CONTENT_TYPE
+            )
+            for name, data in rendered.items()
+        ])
+
+        return image_url, dict(zip(rendered.keys(), urls))
+
+    async def acquire_image(
+        self,
+        db: Session,
+        file: UploadFile,
+        folder: str = "products"
+    ) -> StoredImage:
+        """
+        Obtener la imagen por dirección de contenido, subiéndola solo si es nueva.
+        Incrementa su contador de referencias; el commit queda a cargo del llamador.
+        """
+        content, content_hash = await self.read_and_hash(file)
+
+        stored = db.query(StoredImage).filter(StoredImage.content_hash == content_hash).first()
+        if stored and self._add_reference(db, stored, 1):
+            # Duplicado: no se toca el almacenamiento, solo se suma una referencia
+            print(f"♻️ Imagen reutilizada ({content_hash[:12]}): {stored.url}")
+            return stored
+
+        # Con la fila "borrando" (o recién borrada) el worker de limpieza puede
+        # estar borrando la ruta del hash: la copia nueva va a otra ruta
+        base_name = content_hash if stored is None else f"{content_hash}-{uuid.uuid4().hex[:8]}"
+        extension = Path(file.filename).suffix if file.filename else ".jpg"
+        content_type = file.content_type or "image/jpeg"
+        image_url, variants = await self._upload_content(
+            content, base_name, extension, content_type, folder
+        )
+        return self._register(db, content_hash, image_url, variants or None, content_type, len(content))
+
+    def _register(
+        self,
+        db: Session,
+        content_hash: str,
+        image_url: str,
+        variants: Optional[Dict[str, str]],
+        content_type: str,
+        size_bytes: int
+    ) -> StoredImage:
+        """
+        Registrar una subida con una referencia, bajo el bloqueo de la fila del hash
+        """
+        stored = db.query(StoredImage).filter(
+            StoredImage.content_hash == content_hash
+        ).with_for_update().first()
+
+        if stored is None:
+            stored = StoredImage(
+                content_hash=content_hash,
+                url=image_url,
+                variants=variants,
+                content_type=content_type,
+                size_bytes=size_bytes,
+                ref_count=1,
+                status="activo"
+            )
+            try:
+                with db.begin_nested():
+                    db.add(stored)
+            except IntegrityError:
+                # Otra petición registró el mismo contenido en paralelo
+                return self._register(db, content_hash, image_url, variants, content_type, size_bytes)
+            return stored
+
+        if stored.status == "borrando":
+            # El worker todavía no eliminó la fila: pasa a la copia nueva y el
+            # worker, al ver que ya no está "borrando", la conserva
+            stored.url = image_url
+            stored.variants = variants
+            stored.content_type = content_type
+            stored.size_bytes = size_bytes
+            stored.ref_count = 1
+            stored.status = "activo"
+            db.flush()
+            return stored
+
+        # Otra petición registró el mismo contenido en paralelo: se usa la suya
+        self._add_reference(db, stored, 1)
+        if stored.url != image_url:
+            # Nuestra copia quedó en una ruta propia que nadie usa
+            for url in [image_url, *(variants or {}).values()]:
+                enqueue_image_cleanup(db, url)
+        return stored
+
+    def _add_reference(self, db: Session, stored: StoredImage, delta: int) -> bool:
+        # Incremento atómico en SQL para no perder referencias concurrentes
+        updated = db.query(StoredImage).filter(
+            StoredImage.id == stored.id,
+            StoredImage.status == "activo"
+        ).update(
+            {StoredImage.ref_count: StoredImage.ref_count + delta},
+            synchronize_session=False
+        )
+        if not updated:
+            # El worker de limpieza está borrando sus objetos o ya borró la fila
+            db.expunge(stored)
+            return False
+        db.flush()
+        db.refresh(stored)
+        return True
+
+    def release_image(self, db: Session, image_url: Optional[str]) -> bool:
+        """
+        Quitar una referencia a la imagen y, si era la última, encolar el borrado
+        del objeto. No hace commit ni llamadas remotas.
+        Retorna True si se encoló un borrado.
+        """
+        if not is_managed_url(image_url):
+            return False
+
+        stored = db.query(StoredImage).filter(StoredImage.url == image_url).first()
+        if stored:
+            if not self._add_reference(db, stored, -1):
+                # Ya se borró con su último trabajo de limpieza
+                return False
+            if stored.ref_count > 0:
+                return False
+
+        # El worker vuelve a comprobar ref_count antes de borrar, por si
+        # la misma imagen se sube otra vez mientras el trabajo espera
+        enqueue_image_cleanup(db, image_url)
+        return True
+
+    def _validate_image(self, file: UploadFile):
+        if not file.content_type or not file.content_type.startswith("image/"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="El archivo debe ser una imagen"
+            )
+
+    async def replace_image(
+        self,
+        db: Session,
+        db_model,
+        file: UploadFile,
+        folder: str = "products",
+        model_field: str = "image_url",
+        variants_field: str = "image_variants"
+    ) -> str:
+        """
+        Reemplazar la imagen de un modelo: sube (o reutiliza) la nueva y encola el
+        borrado de la anterior. El llamador hace un único commit.
+        """
+        self._validate_image(file)
+
+        old_url = getattr(db_model, model_field)
+        stored = await self.acquire_image(db, file, folder)
+
+        setattr(db_model, model_field, stored.url)
+        if hasattr(db_model, variants_field):
+            setattr(db_model, variants_field, stored.variants)
+
+        if old_url and old_url != stored.url:
+            self.release_image(db, old_url)
+        elif old_url == stored.url:
+            # Misma imagen: acquire sumó una referencia que el modelo ya tenía
+            self._add_reference(db, stored, -1)
+
+        return stored.url
+
+    def replace_image_url(
+        self,
+        db: Session,
+        db_model,
+        image_url: str,
+        model_field: str = "image_url",
+        variants_field: str = "image_variants"
+    ):
+        """
+        Poner una URL indicada a mano y liberar la anterior. Una URL de nuestro
+        bucket debe ser una imagen registrada y suma una referencia; las externas
+        se guardan tal cual, sin variantes. El llamador hace un único commit.
+        """
+        stored = None
+        if is_managed_url(image_url):
+            stored = db.query(StoredImage).filter(StoredImage.url == image_url).first()
+            if stored is None or not self._add_reference(db, stored, 1):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="La URL no corresponde a una imagen subida; sube el archivo"
+                )
+
+        old_url = getattr(db_model, model_field)
+        setattr(db_model, model_field, image_url)
+        if hasattr(db_model, variants_field):
+            setattr(db_model, variants_field, stored.variants if stored else None)
+
+        # Con la misma URL, la referencia sumada compensa la que se libera
+        if old_url:
+            self.release_image(db, old_url)
+
     async def upload_and_save_image(
         self,
         file: UploadFile,
         folder: str = "products",
         db_model = None,  # Opcional: modelo SQLAlchemy para guardar URL
         db: Session = None,  # Opcional: sesión de BD
-        model_field: str = "image_url"  # Campo donde guardar la URL
+        model_field: str = "image_url",  # Campo donde guardar la URL
+        variants_field: str = "image_variants"  # Campo donde guardar las variantes
     ) -> str:
         """
         Subir imagen a Firebase y opcionalmente guardar URL en base de datos
         """
         try:
             # Validar que sea una imagen
-            if not file.content_type or not file.content_type.startswith("image/"):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="El archivo debe ser una imagen"
+            self._validate_image(file)
+
+            # Subir a Firebase (o reutilizar) la original y sus variantes
+            if db:
+                stored = await self.acquire_image(db, file, folder)
+                image_url, variants = stored.url, stored.variants
+            else:
+                content, content_hash = await self.read_and_hash(file)
+                image_url, variants = await self._upload_content(
+                    content,
+                    content_hash,
+                    Path(file.filename).suffix if file.filename else ".jpg",
+                    file.content_type or "image/jpeg",
+                    folder
                 )
-            
-            # Subir a Firebase
-            image_url = await firebase_service.upload_image(file, folder)
-            
+
             # Si se proporciona un modelo y sesión, guardar la URL
             if db_model and db:
                 setattr(db_model, model_field, image_url)
+                if hasattr(db_model, variants_field):
+                    setattr(db_model, variants_field, variants or None)
                 db.commit()
                 db.refresh(db_model)
-            
+            elif db:
+                db.commit()
+
             return image_url
-            
+
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -50,20 +373,29 @@ class ImageService:
         image_url: Optional[str],
         db_model = None,
         db: Session = None,
-        model_field: str = "image_url"
+        model_field: str = "image_url",
+        variants: Optional[Dict[str, str]] = None,
+        variants_field: str = "image_variants"
     ) -> bool:
         """
-        Eliminar imagen de Firebase si existe
+        Liberar la imagen de un modelo. Con sesión de BD el borrado del objeto se
+        encola para el worker y el commit queda a cargo del llamador.
         """
-        if image_url and "firebasestorage.googleapis.com" in image_url:
+        if is_managed_url(image_url):
             try:
-                await firebase_service.delete_image(image_url)
-                
+                if db:
+                    self.release_image(db, image_url)
+                else:
+                    await firebase_service.delete_image(image_url)
+                    for variant_url in (variants or {}).values():
+                        await firebase_service.delete_image(variant_url)
+
                 # Si hay un modelo, limpiar el campo
-                if db_model and db:
+                if db_model is not None:
                     setattr(db_model, model_field, None)
-                    db.commit()
-                    
+                    if hasattr(db_model, variants_field):
+                        setattr(db_model, variants_field, None)
+
                 return True
             except Exception as e:
                 print(f"⚠️ No se pudo eliminar imagen: {e}")
@@ -71,4 +403,4 @@ class ImageService:
         return False
 
 # Instancia global
-image_service = ImageService()
\ No newline at end of file
+image_service = ImageService()
@@ -1,23 +1,60 @@
-from sqlalchemy.orm import Session, joinedload
-from app.models.extra import OrderExtra
+from typing import Optional
+
+from sqlalchemy.orm import Session, joinedload, selectinload
+from app.models.extra import Extra, OrderExtra
+from app.models.idempotency_key import IdempotencyKey
 from app.models.order import Order, OrderItem
 from app.models.product import Product
 from app.models.table import Table
+from app.models.user import User
 from app.schemas.order import OrderCreate, OrderUpdate
+from app.services.catalog_cache import product_catalog
+from app.services.floor_index import floor_index
+from app.services.pagination import decode_cursor, keyset_before
+from app.services.table_service import claim_table, release_table
 
 
-def get_orders(db: Session, skip: int = 0, limit: int = 100, user_id: int = None):
-    query = db.query(Order).options(
-        joinedload(Order.items).joinedload(OrderItem.product),
-        joinedload(Order.extras).joinedload(OrderExtra.extra), 
-        joinedload(Order.table),
-        joinedload(Order.user)
+def order_graph_options():
+    """
+    Carga del grafo de un pedido: las colecciones (items, extras) con selectinload,
+    una consulta por colección sin producto cartesiano items × extras ni subconsulta
+    por el LIMIT, y de producto, extra, mesa y usuario solo las columnas de OrderResponse
+    """
+    return (
+        selectinload(Order.items).joinedload(OrderItem.product).load_only(
+            Product.name, Product.image_url, Product.description
+        ),
+        selectinload(Order.extras).joinedload(OrderExtra.extra).load_only(Extra.name, Extra.image_url),
+        joinedload(Order.table).load_only(Table.number, Table.capacity),
+        joinedload(Order.user).load_only(User.full_name),
     )
+
+
+def get_orders(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    user_id: int = None,
+    cursor: Optional[str] = None
+):
+    """
+    Pedidos del más reciente al más antiguo. Con `cursor` (ver pagination.py) se
+    pagina por (created_at, id) en vez de OFFSET: el coste no crece con la profundidad.
+    Lanza ValueError si el cursor no es válido.
+    """
+    query = db.query(Order).options(*order_graph_options())
     
     if user_id:
         query = query.filter(Order.user_id == user_id)
-    
-    orders = query.order_by(Order.created_at.desc()).offset(skip).limit(limit).all()
+
+    # id desempata pedidos con el mismo created_at para que el orden sea estable
+    query = query.order_by(Order.created_at.desc(), Order.id.desc())
+    if cursor:
+        query = query.filter(keyset_before(Order.created_at, Order.id, decode_cursor(cursor)))
+    else:
+        query = query.offset(skip)
+
+    orders = query.limit(limit).all()
     
     # 🔥 AGREGAR ESTA PARTE: Asignar campos adicionales a todas las órdenes
     for order in orders:
@@ -40,19 +77,13 @@ def get_orders(db: Session, skip: int = 0, limit: int = 100, user_id: int = None
                 item.product_name = "Producto no disponible"
                 item.product_image = ""
                 item.product_description = ""
-        
-        for extra in order.extras:
-            pass
     
     return orders
 
 # En order_service.py - CORREGIR el método get_order_by_id
 def get_order_by_id(db: Session, order_id: int):
     order = db.query(Order).options(
-        joinedload(Order.items).joinedload(OrderItem.product),
-        joinedload(Order.extras).joinedload(OrderExtra.extra),
-        joinedload(Order.table),
-        joinedload(Order.user)
+        *order_graph_options()
     ).filter(Order.id == order_id).first()
     
     if order:
@@ -64,6 +95,10 @@ def get_order_by_id(db: Session, order_id: int):
             order.table_number = order.table.number
             order.table_capacity = order.table.capacity
             print(f"DEBUG: Mesa - Número: {order.table_number}, Capacidad: {order.table_capacity}")
+        else:
+            # Pedidos delivery: el checkout lee estos campos al notificar
+            order.table_number = None
+            order.table_capacity = None
         
         # Agregar información del usuario
         order.user_name = order.user.full_name if order.user else "Usuario"
@@ -89,16 +124,6 @@ def get_order_by_id(db: Session, order_id: int):
     return order
 
 def create_order(db: Session, order: OrderCreate, user_id: int):
-    # Validar mesa si es dine_in
-    if order.order_type == 'dine_in' and order.table_id:
-        table = db.query(Table).filter(Table.id == order.table_id).first()
-        if not table:
-            raise ValueError("Mesa no encontrada")
-        if not table.is_available:
-            raise ValueError("Mesa no disponible")
-        if not table.is_active:
-            raise ValueError("Mesa no está activa")
-    
     # Calcular total y verificar stock
     total_amount = 0
     order_items = []
@@ -121,6 +146,12 @@ def create_order(db: Session, order: OrderCreate, user_id: int):
             "special_instructions": item.special_instructions
         })
     
+    # Si es dine_in, ocupar la mesa (falla si otro pedido la tomó antes);
+    # queda ocupada en el mismo commit que la orden
+    if order.order_type == 'dine_in' and order.table_id:
+        claim_table(db, order.table_id)
+        print(f"DEBUG: Mesa {order.table_id} marcada como no disponible")
+    
     # Crear la orden
     db_order = Order(
         user_id=user_id,
@@ -138,6 +169,7 @@ def create_order(db: Session, order: OrderCreate, user_id: int):
     print(f"DEBUG: Orden creada - ID: {db_order.id}")
     
     # Crear items de la orden y actualizar stock
+    stock_updates = {}
     for item_data in order_items:
         db_item = OrderItem(
             order_id=db_order.id,
@@ -150,16 +182,15 @@ def create_order(db: Session, order: OrderCreate, user_id: int):
         product.stock -= item_data["quantity"]
         if product.stock < 0:
             product.stock = 0
+        stock_updates[product.id] = product.stock
         
         print(f"DEBUG: Item creado - Product ID: {item_data['product_id']}, Cantidad: {item_data['quantity']}")
     
-    # Si es dine_in, marcar mesa como no disponible
-    if order.order_type == 'dine_in' and order.table_id:
-        table = db.query(Table).filter(Table.id == order.table_id).first()
-        table.is_available = False
-        print(f"DEBUG: Mesa {table.id} marcada como no disponible")
-    
     db.commit()
+    for product_id, stock in stock_updates.items():
+        product_catalog.set_stock(product_id, stock)
+    if order.order_type == 'dine_in' and order.table_id:
+        floor_index.set_available(order.table_id, False)
     
     # 🔥 FORZAR la recarga con todas las relaciones
     db.expire_all()  # Esto fuerza a recargar todos los objetos desde la BD
@@ -184,12 +215,13 @@ def update_order_status(db: Session, order_id: int, status: str):
         db_order.status = status
         
         # Si la orden se completa y es dine_in, liberar la mesa
-        if status == "completado" and db_order.order_type == 'dine_in' and db_order.table_id:
-            table = db.query(Table).filter(Table.id == db_order.table_id).first()
-            if table:
-                table.is_available = True
+        released = status == "completado" and db_order.order_type == 'dine_in' and db_order.table_id
+        if released:
+            release_table(db, db_order.table_id)
         
         db.commit()
+        if released:
+            floor_index.set_available(db_order.table_id, True)
         db.refresh(db_order)
         
         # 🔥 CORREGIDO: Usar BackgroundTasks en lugar de asyncio.create_task
@@ -215,11 +247,16 @@ def delete_order(db: Session, order_id: int):
     db_order = get_order_by_id(db, order_id)
     if db_order:
         # Si es dine_in, liberar la mesa
-        if db_order.order_type == 'dine_in' and db_order.table_id:
-            table = db.query(Table).filter(Table.id == db_order.table_id).first()
-            if table:
-                table.is_available = True
-        
+        table_id = db_order.table_id if db_order.order_type == 'dine_in' else None
+        if table_id:
+            release_table(db, table_id)
+
+        # Las BD creadas antes de ondelete="SET NULL" no sueltan la clave solas
+        db.query(IdempotencyKey).filter(IdempotencyKey.order_id == order_id).update(
+            {IdempotencyKey.order_id: None}, synchronize_session=False
+        )
         db.delete(db_order)
         db.commit()
+        if table_id:
+            floor_index.set_available(table_id, True)
     return db_order
\ No newline at end of file
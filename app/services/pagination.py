@@ -0,0 +1,58 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import DateTime, and_, bindparam, func, or_, select
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """
+    Cursor opaco con la posición (created_at, id) del último elemento de la página
+    """
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Inverso de encode_cursor. Lanza ValueError si el cursor no es válido.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise ValueError("Cursor de paginación inválido")
+
+
+def keyset_before(created_at_column, id_column, cursor: Tuple[datetime, int]):
+    """
+    Condición "anterior al cursor" para un orden (created_at DESC, id DESC).
+    La cota sobre created_at sola permite un range scan del índice compuesto.
+
+    Se compara con el created_at guardado en la fila del cursor (una búsqueda
+    por PK), no con el valor del cursor: en SQLite las fechas son texto y
+    conviven "12:00:00" (CURRENT_TIMESTAMP) y "12:00:00.000000" (SQLAlchemy),
+    así que un mismo instante no siempre es igual al valor enlazado. El del
+    cursor, como fecha, queda para cuando la fila ya no existe.
+    """
+    created_at, row_id = cursor
+    boundary = func.coalesce(
+        select(created_at_column).where(id_column == row_id).correlate(None).scalar_subquery(),
+        bindparam(None, created_at, type_=DateTime)
+    )
+    return and_(
+        created_at_column <= boundary,
+        or_(created_at_column < boundary, id_column < row_id)
+    )
+
+
+def next_cursor(items, limit: int) -> Optional[str]:
+    """
+    Cursor de la página siguiente, o None si esta era la última
+    """
+    if len(items) < limit or not items:
+        return None
+    last = items[-1]
+    return encode_cursor(last.created_at, last.id)
@@ -1,8 +1,10 @@
-from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
 from app.models.product import Product
 from app.schemas.product import ProductCreate, ProductUpdate
+from app.services.autocomplete_service import autocomplete_index
+from app.services.catalog_cache import product_catalog
+from app.services.search_service import product_search_index, search_product_ids
 
 
 def get_products(
@@ -33,6 +35,11 @@ def create_product(db: Session, product: ProductCreate):
     db.add(db_product)
     db.commit()
     db.refresh(db_product)
+    product_search_index.update(db_product)
+    product_catalog.update(db_product)
+    autocomplete_index.update(
+        "product", db_product.id, db_product.name, db_product.category_id, db_product.is_available
+    )
     return db_product
 
 def update_product(db: Session, product_id: int, product_update: ProductUpdate):
@@ -46,6 +53,11 @@ def update_product(db: Session, product_id: int, product_update: ProductUpdate):
     
     db.commit()
     db.refresh(db_product)
+    product_search_index.update(db_product)
+    product_catalog.update(db_product)
+    autocomplete_index.update(
+        "product", db_product.id, db_product.name, db_product.category_id, db_product.is_available
+    )
     return db_product
 
 def delete_product(db: Session, product_id: int):
@@ -53,6 +65,9 @@ def delete_product(db: Session, product_id: int):
     if db_product:
         db.delete(db_product)
         db.commit()
+        product_search_index.remove(product_id)
+        product_catalog.remove(product_id)
+        autocomplete_index.remove("product", product_id)
     return db_product
 
 def update_product_stock(db: Session, product_id: int, quantity: int):
@@ -63,6 +78,7 @@ def update_product_stock(db: Session, product_id: int, quantity: int):
             db_product.stock = 0
         db.commit()
         db.refresh(db_product)
+        product_catalog.set_stock(product_id, db_product.stock)
     return db_product
 
 def search_products(
@@ -74,24 +90,13 @@ def search_products(
     limit: int = 100
 ):
     """
-    Buscar productos por nombre, descripción o SKU.
+    Buscar productos por nombre o descripción, ordenados por relevancia.
     """
-    db_query = db.query(Product)
-
-    # Filtro de búsqueda en varios campos
-    search = f"%{query}%"
-    db_query = db_query.filter(
-        or_(
-            Product.name.ilike(search),
-            Product.description.ilike(search)
-        )
+    product_ids = search_product_ids(
+        db, query, category_id=category_id, available_only=available_only, skip=skip, limit=limit
     )
+    if not product_ids:
+        return []
 
-    # Filtros opcionales
-    if category_id:
-        db_query = db_query.filter(Product.category_id == category_id)
-
-    if available_only:
-        db_query = db_query.filter(Product.is_available == True)
-
-    return db_query.offset(skip).limit(limit).all()
\ No newline at end of file
+    products = {product.id: product for product in db.query(Product).filter(Product.id.in_(product_ids))}
+    return [products[product_id] for product_id in product_ids if product_id in products]
\ No newline at end of file
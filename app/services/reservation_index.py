@@ -0,0 +1,231 @@
+"""
+Índice en memoria de la agenda de reservas, para responder "qué mesas de
+capacidad ≥ N están libres entre T1 y T2" sin consultar la BD:
+- mesas activas ordenadas por capacidad (bisect hasta la primera que alcanza)
+- por día y mesa, los intervalos reservados ordenados por inicio. Las reservas
+  de una mesa no se solapan, así que los finales también quedan ordenados y
+  basta comparar con el intervalo anterior a T2: O(log k) por mesa
+
+Cada intervalo incluye RESERVATION_BUFFER_MINUTES al final (preparar la mesa).
+Los días se cargan de la BD en la primera consulta y se recargan cada
+RESERVATION_INDEX_TTL segundos (otros procesos pueden haber reservado);
+reservation_service y table_service lo actualizan en cada cambio de este proceso.
+La BD sigue siendo la referencia: create_reservation verifica el choque con la
+mesa bloqueada antes de insertar.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.reservation import Reservation
+from app.models.table import Table
+
+RESERVATION_INDEX_TTL = float(os.getenv("RESERVATION_INDEX_TTL", 30))
+RESERVATION_BUFFER_MINUTES = int(os.getenv("RESERVATION_BUFFER_MINUTES", 15))
+# Duración máxima de una reserva: hasta dónde mirar en los días anteriores a T1
+RESERVATION_MAX_MINUTES = int(os.getenv("RESERVATION_MAX_MINUTES", 6 * 60))
+
+BUFFER = timedelta(minutes=RESERVATION_BUFFER_MINUTES)
+MAX_DURATION = timedelta(minutes=RESERVATION_MAX_MINUTES)
+# Hueco sin reserva vecina en el día: cuenta como el más largo posible
+OPEN_GAP_MINUTES = 24 * 60
+
+
+class _TableSlots:
+    """Intervalos [inicio, fin + buffer) de una mesa en un día, ordenados por inicio"""
+    __slots__ = ("starts", "ends", "ids")
+
+    def __init__(self):
+        self.starts: List[datetime] = []
+        self.ends: List[datetime] = []
+        self.ids: List[int] = []
+
+    def add(self, reservation_id: int, start: datetime, end: datetime):
+        index = bisect_left(self.starts, start)
+        self.starts.insert(index, start)
+        self.ends.insert(index, end)
+        self.ids.insert(index, reservation_id)
+
+    def remove(self, reservation_id: int) -> bool:
+        if reservation_id not in self.ids:
+            return False
+        index = self.ids.index(reservation_id)
+        del self.starts[index], self.ends[index], self.ids[index]
+        return True
+
+    def neighbors(self, start: datetime, end: datetime) -> Tuple[bool, Optional[datetime], Optional[datetime]]:
+        """
+        (libre, fin del intervalo anterior, inicio del siguiente) para [start, end)
+        """
+        index = bisect_left(self.starts, end)
+        previous_end = self.ends[index - 1] if index else None
+        next_start = self.starts[index] if index < len(self.starts) else None
+        return previous_end is None or previous_end <= start, previous_end, next_start
+
+
+class _DaySchedule:
+    __slots__ = ("tables", "loaded_at")
+
+    def __init__(self):
+        self.tables: Dict[int, _TableSlots] = {}
+        self.loaded_at = time.monotonic()
+
+    def slots(self, table_id: int) -> _TableSlots:
+        slots = self.tables.get(table_id)
+        if slots is None:
+            slots = self.tables[table_id] = _TableSlots()
+        return slots
+
+
+def _day_start(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day)
+
+
+class ReservationIndex:
+    def __init__(self, ttl: float = RESERVATION_INDEX_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._days: Dict[date, _DaySchedule] = {}
+        # (capacidad, número, id) de las mesas activas, y sus datos por id
+        self._by_capacity: List[Tuple[int, int, int]] = []
+        self._tables: Dict[int, dict] = {}
+        self._tables_loaded_at: Optional[float] = None
+
+    def _fresh(self, loaded_at: Optional[float]) -> bool:
+        return loaded_at is not None and time.monotonic() - loaded_at < self.ttl
+
+    def _load_tables(self, db: Session):
+        rows = db.query(
+            Table.id, Table.number, Table.capacity, Table.position_x, Table.position_y
+        ).filter(Table.is_active == True).all()
+        tables = {
+            row.id: {
+                "id": row.id,
+                "number": row.number,
+                "capacity": row.capacity,
+                "position_x": row.position_x,
+                "position_y": row.position_y,
+            }
+            for row in rows
+        }
+        with self._lock:
+            self._tables = tables
+            self._by_capacity = sorted((row.capacity, row.number, row.id) for row in rows)
+            self._tables_loaded_at = time.monotonic()
+
+    def _load_day(self, db: Session, day: date) -> _DaySchedule:
+        start = _day_start(day)
+        rows = db.query(
+            Reservation.id, Reservation.table_id, Reservation.starts_at, Reservation.ends_at
+        ).filter(
+            Reservation.status == "confirmada",
+            Reservation.starts_at >= start,
+            Reservation.starts_at < start + timedelta(days=1)
+        ).order_by(Reservation.starts_at).all()
+        schedule = _DaySchedule()
+        for row in rows:
+            slots = schedule.slots(row.table_id)
+            # Ya vienen ordenadas por inicio
+            slots.starts.append(row.starts_at)
+            slots.ends.append(row.ends_at + BUFFER)
+            slots.ids.append(row.id)
+        with self._lock:
+            self._days[day] = schedule
+        return schedule
+
+    @staticmethod
+    def _days_for(start: datetime, end: datetime) -> List[date]:
+        """Días que pueden tener reservas que se cruzan con [start, end)"""
+        day = (start - MAX_DURATION - BUFFER).date()
+        days = []
+        while day <= end.date():
+            days.append(day)
+            day += timedelta(days=1)
+        return days
+
+    def _schedules(self, db: Session, start: datetime, end: datetime) -> List[_DaySchedule]:
+        if not self._fresh(self._tables_loaded_at):
+            self._load_tables(db)
+        schedules = []
+        for day in self._days_for(start, end):
+            schedule = self._days.get(day)
+            if schedule is None or not self._fresh(schedule.loaded_at):
+                schedule = self._load_day(db, day)
+            schedules.append(schedule)
+        return schedules
+
+    def free_tables(self, db: Session, party_size: int, start: datetime, end: datetime,
+                    limit: Optional[int] = None) -> List[dict]:
+        """
+        Mesas activas de capacidad ≥ party_size libres en [start, end), de mejor
+        a peor ajuste: primero menos asientos sobrantes y, a igual capacidad, la
+        que deja el hueco más corto en su agenda (los huecos largos quedan para
+        otras reservas).
+        """
+        schedules = self._schedules(db, start, end)
+        blocked_until = end + BUFFER
+        result = []
+        with self._lock:
+            first = bisect_left(self._by_capacity, (party_size,))
+            for capacity, _, table_id in self._by_capacity[first:]:
+                if limit is not None and len(result) >= limit and capacity > result[-1]["capacity"]:
+                    break
+                previous_end, next_start = None, None
+                free = True
+                for schedule in schedules:
+                    slots = schedule.tables.get(table_id)
+                    if slots is None:
+                        continue
+                    slot_free, day_previous, day_next = slots.neighbors(start, blocked_until)
+                    if not slot_free:
+                        free = False
+                        break
+                    if day_previous is not None and (previous_end is None or day_previous > previous_end):
+                        previous_end = day_previous
+                    if day_next is not None and (next_start is None or day_next < next_start):
+                        next_start = day_next
+                if not free:
+                    continue
+                # Minutos sin uso que quedan a los lados de la reserva
+                idle = OPEN_GAP_MINUTES if previous_end is None else (start - previous_end).total_seconds() / 60
+                idle += OPEN_GAP_MINUTES if next_start is None else (next_start - blocked_until).total_seconds() / 60
+                result.append(dict(self._tables[table_id], wasted_seats=capacity - party_size, idle_minutes=idle))
+        result.sort(key=lambda table: (table["wasted_seats"], table["idle_minutes"], table["number"]))
+        for table in result:
+            del table["idle_minutes"]
+        return result[:limit] if limit is not None else result
+
+    def add(self, reservation_id: int, table_id: int, start: datetime, end: datetime):
+        with self._lock:
+            schedule = self._days.get(start.date())
+            if schedule is not None:
+                schedule.slots(table_id).add(reservation_id, start, end + BUFFER)
+
+    def remove(self, reservation_id: int, table_id: int, start: datetime):
+        with self._lock:
+            schedule = self._days.get(start.date())
+            if schedule is not None and table_id in schedule.tables:
+                schedule.tables[table_id].remove(reservation_id)
+
+    def invalidate(self, start: datetime, end: datetime):
+        """Recargar en la próxima consulta los días de [start, end) (otro proceso reservó)"""
+        with self._lock:
+            for day in self._days_for(start, end):
+                self._days.pop(day, None)
+
+    def invalidate_tables(self):
+        with self._lock:
+            self._tables_loaded_at = None
+
+    def clear(self):
+        with self._lock:
+            self._days.clear()
+            self._tables_loaded_at = None
+
+
+reservation_index = ReservationIndex()
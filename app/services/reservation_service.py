@@ -0,0 +1,168 @@
+"""
+Reservas de mesas por horario.
+
+La disponibilidad sale del índice en memoria (reservation_index.py). Al
+reservar sin mesa se asigna la de mejor ajuste: la que deja menos asientos
+vacíos y, entre ellas, la que deja el hueco más corto en su agenda. La mesa se
+bloquea y se verifica el choque en la BD antes de insertar, así dos reservas
+simultáneas (de este u otro proceso) no pueden quedarse con el mismo horario.
+"""
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy.orm import Session, joinedload
+
+from app.models.reservation import Reservation
+from app.models.table import Table
+from app.schemas.reservation import ReservationCreate
+from app.services.reservation_index import BUFFER, MAX_DURATION, reservation_index
+
+RESERVATION_DEFAULT_MINUTES = int(os.getenv("RESERVATION_DEFAULT_MINUTES", 90))
+
+
+def _utc(value: datetime) -> datetime:
+    # Las reservas se guardan en UTC sin zona; una fecha sin zona ya se toma como UTC
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def reservation_window(starts_at: datetime, ends_at: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """
+    Horario [inicio, fin) de una reserva en UTC. Lanza ValueError si no es válido.
+    """
+    start = _utc(starts_at)
+    end = _utc(ends_at) if ends_at else start + timedelta(minutes=RESERVATION_DEFAULT_MINUTES)
+    if end <= start:
+        raise ValueError("La reserva debe terminar después de empezar")
+    if end - start > MAX_DURATION:
+        raise ValueError(f"La reserva no puede durar más de {int(MAX_DURATION.total_seconds() // 60)} minutos")
+    if start < datetime.utcnow():
+        raise ValueError("La reserva debe ser en el futuro")
+    return start, end
+
+
+def find_free_tables(
+    db: Session,
+    party_size: int,
+    starts_at: datetime,
+    ends_at: Optional[datetime] = None,
+    limit: Optional[int] = None
+) -> List[dict]:
+    """
+    Mesas libres para `party_size` personas en el horario, de mejor a peor ajuste
+    """
+    start, end = reservation_window(starts_at, ends_at)
+    return reservation_index.free_tables(db, party_size, start, end, limit=limit)
+
+
+def _overlapping(db: Session, table_id: int, start: datetime, end: datetime) -> bool:
+    """
+    Si la mesa tiene una reserva confirmada que se cruza con [start, end),
+    contando el tiempo de preparación. El límite inferior de starts_at acota el
+    rango de ix_reservations_table_id_starts_at.
+    """
+    return db.query(Reservation.id).filter(
+        Reservation.table_id == table_id,
+        Reservation.status == "confirmada",
+        Reservation.starts_at < end + BUFFER,
+        Reservation.starts_at > start - MAX_DURATION - BUFFER,
+        Reservation.ends_at > start - BUFFER
+    ).first() is not None
+
+
+def _fill_table_fields(reservation: Reservation) -> Reservation:
+    if reservation.table:
+        reservation.table_number = reservation.table.number
+        reservation.table_capacity = reservation.table.capacity
+    return reservation
+
+
+def get_reservation_by_id(db: Session, reservation_id: int) -> Optional[Reservation]:
+    reservation = db.query(Reservation).options(
+        joinedload(Reservation.table).load_only(Table.number, Table.capacity)
+    ).filter(Reservation.id == reservation_id).first()
+    return _fill_table_fields(reservation) if reservation else None
+
+
+def get_reservations(
+    db: Session,
+    day: Optional[date] = None,
+    user_id: Optional[int] = None,
+    include_cancelled: bool = False,
+    skip: int = 0,
+    limit: int = 100
+) -> List[Reservation]:
+    query = db.query(Reservation).options(
+        joinedload(Reservation.table).load_only(Table.number, Table.capacity)
+    )
+    if day is not None:
+        day_start = datetime(day.year, day.month, day.day)
+        query = query.filter(
+            Reservation.starts_at >= day_start,
+            Reservation.starts_at < day_start + timedelta(days=1)
+        )
+    if user_id is not None:
+        query = query.filter(Reservation.user_id == user_id)
+    if not include_cancelled:
+        query = query.filter(Reservation.status == "confirmada")
+    reservations = query.order_by(Reservation.starts_at, Reservation.id).offset(skip).limit(limit).all()
+    return [_fill_table_fields(reservation) for reservation in reservations]
+
+
+def create_reservation(db: Session, user_id: int, reservation: ReservationCreate) -> Reservation:
+    """
+    Reservar la mesa indicada o, sin mesa, la de mejor ajuste. Lanza ValueError
+    si no hay mesa libre para el grupo en ese horario.
+    """
+    start, end = reservation_window(reservation.starts_at, reservation.ends_at)
+
+    if reservation.table_id:
+        table = db.query(Table.capacity, Table.is_active).filter(Table.id == reservation.table_id).first()
+        if not table or not table.is_active:
+            raise ValueError("Mesa no encontrada")
+        if table.capacity < reservation.party_size:
+            raise ValueError(f"La mesa es para {table.capacity} personas")
+        candidates = [reservation.table_id]
+    else:
+        candidates = [
+            table["id"] for table in reservation_index.free_tables(db, reservation.party_size, start, end)
+        ]
+
+    for table_id in candidates:
+        # Bloquear la mesa: las reservas de una misma mesa se verifican de a una
+        db.query(Table.id).filter(Table.id == table_id).with_for_update().first()
+        if _overlapping(db, table_id, start, end):
+            # Otro proceso la reservó: el índice de esos días está desactualizado
+            db.rollback()
+            reservation_index.invalidate(start, end)
+            continue
+
+        db_reservation = Reservation(
+            table_id=table_id,
+            user_id=user_id,
+            party_size=reservation.party_size,
+            starts_at=start,
+            ends_at=end,
+            status="confirmada",
+            special_instructions=reservation.special_instructions
+        )
+        db.add(db_reservation)
+        db.commit()
+        reservation_index.add(db_reservation.id, table_id, start, end)
+        return get_reservation_by_id(db, db_reservation.id)
+
+    if reservation.table_id:
+        raise ValueError("La mesa ya está reservada en ese horario")
+    raise ValueError(f"No hay mesas disponibles para {reservation.party_size} personas en ese horario")
+
+
+def cancel_reservation(db: Session, reservation_id: int) -> Optional[Reservation]:
+    db_reservation = get_reservation_by_id(db, reservation_id)
+    if db_reservation and db_reservation.status == "confirmada":
+        db_reservation.status = "cancelada"
+        db.commit()
+        reservation_index.remove(db_reservation.id, db_reservation.table_id, db_reservation.starts_at)
+        db_reservation = get_reservation_by_id(db, reservation_id)
+    return db_reservation
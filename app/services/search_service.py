@@ -0,0 +1,302 @@
+"""
+Búsqueda de productos por texto con el índice del motor de base de datos:
+- Postgres: tsvector (español, sin acentos) con índice GIN, ranking ts_rank
+- MySQL: índice FULLTEXT, ranking MATCH ... AGAINST
+- Otros (SQLite) o sin la migración 0002: índice invertido en memoria
+"""
+import heapq
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import Session
+
+from app.models.product import Product
+
+SEARCH_INDEX_NAME = "ix_products_search"
+# Reconstrucción del índice en memoria (otros procesos pueden haber cambiado productos)
+SEARCH_INDEX_TTL = float(os.getenv("SEARCH_INDEX_TTL", 300))
+
+# Debe coincidir con la expresión del índice GIN de la migración 0002
+POSTGRES_DOCUMENT = (
+    "(setweight(to_tsvector('spanish', immutable_unaccent(coalesce(products.name, ''))), 'A') || "
+    "setweight(to_tsvector('spanish', immutable_unaccent(coalesce(products.description, ''))), 'B'))"
+)
+
+NAME_WEIGHT = 3.0
+DESCRIPTION_WEIGHT = 1.0
+
+_TOKEN_RE = re.compile(r"[a-z0-9ñ]+")
+# Vocales acentuadas más comunes; el resto pasa por unicodedata
+_ACCENTS = str.maketrans("áéíóúüàèìòùâêîôûäëïö", "aeiouuaeiouaeiouaeio")
+
+
+def normalize(value: str) -> str:
+    """
+    Minúsculas y sin acentos (conserva la ñ)
+    """
+    value = (value or "").lower().translate(_ACCENTS)
+    if value.replace("ñ", "").isascii():
+        return value
+    value = unicodedata.normalize("NFD", value.replace("ñ", "\0"))
+    return "".join(char for char in value if unicodedata.category(char) != "Mn").replace("\0", "ñ")
+
+
+# Consonantes en que termina un singular cuyo plural añade "es" (limón, flor, pan, rey)
+_PLURAL_ES_ENDINGS = "lnrdjy"
+
+
+def stem(token: str) -> str:
+    """
+    Stemming ligero del español: solo plurales (limones → limon, papas → papa,
+    tomates → tomate, luces → luz). "-es" se quita entero solo si deja un
+    singular que termina en vocal + consonante; si no, el singular acaba en "e"
+    """
+    if len(token) > 4 and token.endswith("es") and token[-4] in "aeiou":
+        if token[-3] == "c":
+            return token[:-3] + "z"
+        if token[-3] in _PLURAL_ES_ENDINGS:
+            return token[:-2]
+    if len(token) > 3 and token.endswith("s"):
+        return token[:-1]
+    return token
+
+
+def tokenize(value: str) -> List[str]:
+    return _TOKEN_RE.findall(normalize(value))
+
+
+class ProductSearchIndex:
+    """
+    Índice invertido en memoria (token → {producto: peso}) con ranking tipo
+    TF-IDF y prefijo en el último término (búsqueda mientras se escribe).
+    Se construye desde la BD en la primera búsqueda y se reconstruye cada
+    SEARCH_INDEX_TTL segundos; product_service y category_service lo
+    actualizan al crear, editar o eliminar productos en este proceso.
+    """
+
+    def __init__(self, ttl: float = SEARCH_INDEX_TTL):
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._reset()
+        self._built_at: Optional[float] = None
+
+    @property
+    def built(self) -> bool:
+        return self._built_at is not None and time.monotonic() - self._built_at < self.ttl
+
+    def _reset(self):
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._tokens: Dict[int, List[str]] = {}
+        self._category_of: Dict[int, Optional[int]] = {}
+        self._by_category: Dict[Optional[int], Set[int]] = defaultdict(set)
+        self._unavailable: Set[int] = set()
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = True
+
+    def build(self, db: Session):
+        rows = db.query(
+            Product.id, Product.name, Product.description, Product.category_id, Product.is_available
+        ).order_by(Product.id).all()
+        with self._lock:
+            self._reset()
+            for row in rows:
+                self._add(row.id, row.name, row.description, row.category_id, row.is_available)
+            self._built_at = time.monotonic()
+
+    def _add(self, product_id, name, description, category_id, is_available):
+        weights: Dict[str, float] = defaultdict(float)
+        for token in tokenize(name):
+            weights[stem(token)] += NAME_WEIGHT
+        for token in tokenize(description):
+            weights[stem(token)] += DESCRIPTION_WEIGHT
+        for token, weight in weights.items():
+            self._postings[token][product_id] = weight
+        self._tokens[product_id] = list(weights)
+        self._category_of[product_id] = category_id
+        self._by_category[category_id].add(product_id)
+        if not is_available:
+            self._unavailable.add(product_id)
+
+    def _remove(self, product_id: int):
+        tokens = self._tokens.pop(product_id, None)
+        if tokens is None:
+            return
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(product_id, None)
+                if not postings:
+                    del self._postings[token]
+        self._by_category[self._category_of.pop(product_id)].discard(product_id)
+        self._unavailable.discard(product_id)
+
+    def update(self, product: Product):
+        if self._built_at is None:
+            return
+        with self._lock:
+            self._remove(product.id)
+            self._add(product.id, product.name, product.description, product.category_id, product.is_available)
+            self._vocabulary_dirty = True
+
+    def remove(self, product_id: int):
+        if self._built_at is None:
+            return
+        with self._lock:
+            self._remove(product_id)
+            self._vocabulary_dirty = True
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        start = bisect_left(self._vocabulary, prefix)
+        matches = []
+        for token in self._vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            matches.append(token)
+        return matches
+
+    def _term_frequency(self, term: str, prefix: bool) -> int:
+        tokens = self._expand_prefix(term) if prefix else [term]
+        return sum(len(self._postings.get(token, ())) for token in tokens)
+
+    def _term_scores(self, term: str, prefix: bool, candidates=None) -> Dict[int, float]:
+        """
+        Puntaje de cada producto para un término (el mejor de los tokens que
+        coinciden con el prefijo), limitado a `candidates` si se indica
+        """
+        total = len(self._tokens) or 1
+        scores: Dict[int, float] = {}
+        for token in (self._expand_prefix(term) if prefix else [term]):
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + total / len(postings))
+            keys = postings.keys() if candidates is None else postings.keys() & candidates
+            if not scores:
+                scores = {product_id: postings[product_id] * idf for product_id in keys}
+                continue
+            for product_id in keys:
+                score = postings[product_id] * idf
+                if score > scores.get(product_id, 0.0):
+                    scores[product_id] = score
+        return scores
+
+    def search(
+        self,
+        query: str,
+        category_id: Optional[int] = None,
+        available_only: bool = True,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[int]:
+        """
+        IDs de productos que contienen todos los términos, por relevancia
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        with self._lock:
+            # El último término puede estar a medio escribir: se busca como prefijo
+            terms = [(stem(token), False) for token in tokens[:-1]]
+            terms.append((stem(tokens[-1]), True))
+            # Primero el término más selectivo: acota los candidatos del resto
+            terms.sort(key=lambda term: self._term_frequency(*term))
+
+            scores = None
+            for term, prefix in terms:
+                term_scores = self._term_scores(term, prefix, candidates=None if scores is None else scores.keys())
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {product_id: scores[product_id] + score for product_id, score in term_scores.items()}
+                if not scores:
+                    return []
+
+            candidates = scores.keys()
+            if category_id:
+                candidates = candidates & self._by_category.get(category_id, set())
+            if available_only:
+                candidates = candidates - self._unavailable
+            # Mayor puntaje primero; a igual puntaje, menor ID
+            top = heapq.nsmallest(skip + limit, candidates, key=lambda product_id: (-scores[product_id], product_id))
+        return top[skip:]
+
+
+product_search_index = ProductSearchIndex()
+
+# Backend de búsqueda por URL de la base de datos (se detecta una vez)
+_backends: Dict[str, str] = {}
+
+
+def _backend(db: Session) -> str:
+    bind = db.get_bind()
+    key = str(bind.url)
+    if key not in _backends:
+        dialect = bind.dialect.name
+        backend = "memory"
+        if dialect in ("postgresql", "mysql"):
+            indexes = inspect(bind).get_indexes("products")
+            if any(index["name"] == SEARCH_INDEX_NAME for index in indexes):
+                backend = dialect
+        _backends[key] = backend
+    return _backends[key]
+
+
+def _postgres_tsquery(query: str) -> str:
+    # unaccent también convierte la ñ
+    tokens = [token.replace("ñ", "n") for token in tokenize(query)]
+    terms = tokens[:-1] + [f"{tokens[-1]}:*"]
+    return " & ".join(terms)
+
+
+def _mysql_boolean_query(query: str) -> str:
+    tokens = tokenize(query)
+    return " ".join([f"+{token}" for token in tokens[:-1]] + [f"+{tokens[-1]}*"])
+
+
+def search_product_ids(
+    db: Session,
+    query: str,
+    category_id: Optional[int] = None,
+    available_only: bool = True,
+    skip: int = 0,
+    limit: int = 100
+) -> List[int]:
+    """
+    IDs de los productos que coinciden con `query`, ordenados por relevancia
+    """
+    if not tokenize(query):
+        return []
+
+    backend = _backend(db)
+    if backend == "memory":
+        if not product_search_index.built:
+            product_search_index.build(db)
+        return product_search_index.search(query, category_id, available_only, skip, limit)
+
+    if backend == "postgresql":
+        match = text(f"{POSTGRES_DOCUMENT} @@ to_tsquery('spanish', :q)")
+        rank = text(f"ts_rank({POSTGRES_DOCUMENT}, to_tsquery('spanish', :q)) DESC")
+        params = {"q": _postgres_tsquery(query)}
+    else:
+        match = text("MATCH (products.name, products.description) AGAINST (:q IN BOOLEAN MODE)")
+        rank = text("MATCH (products.name, products.description) AGAINST (:q IN BOOLEAN MODE) DESC")
+        params = {"q": _mysql_boolean_query(query)}
+
+    db_query = db.query(Product.id).filter(match)
+    if category_id:
+        db_query = db_query.filter(Product.category_id == category_id)
+    if available_only:
+        db_query = db_query.filter(Product.is_available == True)
+    rows = db_query.order_by(rank, Product.id).offset(skip).limit(limit).params(**params).all()
+    return [row.id for row in rows]
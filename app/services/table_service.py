@@ -1,9 +1,22 @@
-from sqlalchemy import or_
+import math
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, or_, update
 from sqlalchemy.orm import Session
 
 from app.models.order import Order
 from app.models.table import Table
-from app.schemas.table import TableCreate, TablePositionUpdate, TableUpdate
+from app.schemas.table import (TableCreate, TablePositionItem,
+                               TablePositionUpdate, TableUpdate)
+from app.services.floor_index import TABLE_MIN_DISTANCE, floor_index
+from app.services.reservation_index import reservation_index
+
+# Tabla Core: executemany sin pasar por la sincronización de la sesión
+_tables = Table.__table__
+_MOVE_TABLE = update(_tables).where(_tables.c.id == bindparam("table_id")).values(
+    position_x=bindparam("x"),
+    position_y=bindparam("y"),
+)
 
 
 def get_tables_with_status(db: Session):
@@ -62,10 +75,14 @@ def create_table(db: Session, table: TableCreate):
     if existing_table:
         raise ValueError("Ya existe una mesa con este número")
     
+    check_collisions(db, {None: (table.position_x, table.position_y)}, {None: table.number})
+    
     db_table = Table(**table.dict())
     db.add(db_table)
     db.commit()
     db.refresh(db_table)
+    floor_index.update(db_table)
+    reservation_index.invalidate_tables()
     return db_table
 
 def update_table(db: Session, table_id: int, table_update: TableUpdate):
@@ -81,11 +98,20 @@ def update_table(db: Session, table_id: int, table_update: TableUpdate):
         if existing_table:
             raise ValueError("Ya existe una mesa con este número")
     
+    if 'position_x' in update_data or 'position_y' in update_data:
+        position = (
+            update_data.get('position_x', db_table.position_x),
+            update_data.get('position_y', db_table.position_y)
+        )
+        check_collisions(db, {db_table.id: position}, {db_table.id: update_data.get('number', db_table.number)})
+    
     for field, value in update_data.items():
         setattr(db_table, field, value)
     
     db.commit()
     db.refresh(db_table)
+    floor_index.update(db_table)
+    reservation_index.invalidate_tables()
     return db_table
 
 def update_table_position(db: Session, table_id: int, position_update: TablePositionUpdate):
@@ -93,13 +119,78 @@ def update_table_position(db: Session, table_id: int, position_update: TablePosi
     if not db_table:
         return None
     
+    check_collisions(
+        db,
+        {db_table.id: (position_update.position_x, position_update.position_y)},
+        {db_table.id: db_table.number}
+    )
+    
     db_table.position_x = position_update.position_x
     db_table.position_y = position_update.position_y
     
     db.commit()
     db.refresh(db_table)
+    floor_index.update(db_table)
+    reservation_index.invalidate_tables()
     return db_table
 
+def update_table_positions(db: Session, positions: List[TablePositionItem]) -> List[dict]:
+    """
+    Mover varias mesas en una transacción: un UPDATE múltiple y un solo commit
+    por gesto de arrastre del editor del plano, en lugar de uno por movimiento
+    del mouse. Lanza ValueError si una mesa no existe o queda encima de otra.
+    """
+    # Si una mesa se repite, vale su última posición
+    moved = {item.id: (item.position_x, item.position_y) for item in positions}
+    numbers = {
+        row.id: row.number
+        for row in db.query(Table.id, Table.number).filter(Table.id.in_(moved), Table.is_active == True)
+    }
+    for table_id in moved:
+        if table_id not in numbers:
+            raise ValueError(f"Mesa {table_id} no encontrada")
+    check_collisions(db, moved, numbers)
+    
+    db.execute(_MOVE_TABLE, [
+        {"table_id": table_id, "x": x, "y": y}
+        for table_id, (x, y) in moved.items()
+    ])
+    db.commit()
+    floor_index.move(moved)
+    reservation_index.invalidate_tables()
+    return floor_index.tables(db, moved)
+
+def get_floor_tables(db: Session, min_x: float, min_y: float, max_x: float, max_y: float) -> List[dict]:
+    """Mesas activas dentro de la vista del plano"""
+    return floor_index.viewport(db, min_x, min_y, max_x, max_y)
+
+def get_nearest_free_tables(db: Session, x: float, y: float, capacity: Optional[int] = None, limit: int = 1) -> List[dict]:
+    return floor_index.nearest_free(db, x, y, capacity=capacity, limit=limit)
+
+def get_position_collisions(db: Session, x: float, y: float, table_id: Optional[int] = None) -> List[dict]:
+    """Mesas con las que chocaría una mesa en (x, y), para el editor mientras arrastra"""
+    return floor_index.collisions(db, x, y, exclude=(table_id,) if table_id else ())
+
+def check_collisions(db: Session, moved: Dict[Optional[int], Tuple[float, float]], numbers: Dict[Optional[int], int]):
+    """
+    Lanza ValueError si alguna de las mesas en sus posiciones nuevas queda a
+    menos de TABLE_MIN_DISTANCE de otra (None: mesa aún sin crear)
+    """
+    placed = []
+    for table_id, (x, y) in moved.items():
+        hits = floor_index.collisions(db, x, y, exclude=moved)
+        # Las que se mueven juntas, entre sí (pocas por gesto)
+        hits += [
+            {"number": number}
+            for number, other_x, other_y in placed
+            if math.hypot(other_x - x, other_y - y) < TABLE_MIN_DISTANCE
+        ]
+        if hits:
+            raise ValueError(
+                f"La mesa {numbers[table_id]} queda a menos de {TABLE_MIN_DISTANCE:g} de la mesa {hits[0]['number']}"
+            )
+        placed.append((numbers[table_id], x, y))
+
 def delete_table(db: Session, table_id: int):
     db_table = get_table_by_id(db, table_id)
     if db_table:
@@ -107,11 +198,49 @@ def delete_table(db: Session, table_id: int):
         db_table.is_active = False
         db.commit()
         db.refresh(db_table)
+        floor_index.remove(db_table.id)
+        reservation_index.invalidate_tables()
     return db_table
 
-def get_available_tables(db: Session):
-    return db.query(Table).filter(
+def get_available_tables(db: Session, capacity: Optional[int] = None):
+    query = db.query(Table).filter(
         Table.is_available == True, 
         Table.is_active == True
-    ).order_by(Table.number).all()
+    )
+    if capacity:
+        query = query.filter(Table.capacity >= capacity)
+    return query.order_by(Table.number).all()
+
+
+def claim_table(db: Session, table_id: int):
+    """
+    Ocupar la mesa para un pedido con un solo UPDATE condicional: si dos
+    pedidos la piden a la vez, solo uno cambia la fila. No hace commit (la
+    mesa queda ocupada con el pedido). Lanza ValueError si no se puede ocupar.
+    """
+    claimed = db.execute(
+        update(Table)
+        .where(Table.id == table_id, Table.is_available == True, Table.is_active == True)
+        .values(is_available=False)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if claimed == 1:
+        return
+
+    # Solo en el caso de error: leer la mesa para explicar el motivo
+    table = db.query(Table.is_active).filter(Table.id == table_id).first()
+    if table is None:
+        raise ValueError("Mesa no encontrada")
+    if not table.is_active:
+        raise ValueError("Mesa no está activa")
+    raise ValueError("Mesa no disponible")
+
 
+def release_table(db: Session, table_id: int):
+    """Liberar la mesa de un pedido terminado o eliminado. No hace commit."""
+    db.execute(
+        update(Table)
+        .where(Table.id == table_id)
+        .values(is_available=True)
+        .execution_options(synchronize_session=False)
+    )
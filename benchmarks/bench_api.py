@@ -0,0 +1,262 @@
+"""
+Benchmark de carga de la API del restaurante.
+
+Puebla una base de datos local (SQLite por defecto, o Postgres con --database-url)
+con un dataset sintético escalable y ejecuta la app FastAPI real en proceso con
+httpx. Mide throughput y latencias p50/p95/p99 por escenario y guarda el
+resultado en JSON para comparar ejecuciones entre commits.
+
+Escenarios:
+    menu         Navegación del menú (productos paginados, categorías, detalle)
+    cart_add     Agregar productos al carrito
+    checkout     Convertir el carrito en pedido
+    my_orders    Historial de pedidos del cliente
+    all_orders   Listado de pedidos del administrador
+    tables       Estado de las mesas con sus pedidos activos
+    ws_fanout    Difusión de un pedido nuevo a N suscriptores WebSocket
+
+Uso:
+    python -m benchmarks.bench_api --scale 1 --requests 500 --concurrency 8
+    python -m benchmarks.compare benchmarks/results/a.json benchmarks/results/b.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+from datetime import datetime
+
+from benchmarks.harness import DEFAULT_DATABASE_URL, git_revision, load_app, run_load
+
+SCENARIOS = ("menu", "cart_add", "checkout", "my_orders", "all_orders", "tables", "ws_fanout")
+
+
+class FakeSubscriber:
+    """
+    Conexión WebSocket en memoria: mide la serialización y el bucle de envío
+    del manager sin depender de la red
+    """
+
+    def __init__(self):
+        self.received = 0
+        self.bytes = 0
+
+    async def send_text(self, message: str):
+        self.received += 1
+        self.bytes += len(message)
+
+
+class BenchContext:
+    def __init__(self, client, dataset, args):
+        from app.services.auth import create_access_token
+        from benchmarks.dataset import bench_email
+
+        self.client = client
+        self.dataset = dataset
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.tokens = [
+            create_access_token({"sub": bench_email(i), "role": "administrador" if i == 0 else "usuario"})
+            for i in range(len(dataset["user_ids"]))
+        ]
+
+    def auth(self, user_index: int):
+        return {"Authorization": f"Bearer {self.tokens[user_index]}"}
+
+    def random_customer(self) -> int:
+        return self.rng.randrange(1, len(self.tokens))
+
+
+async def scenario_menu(ctx: BenchContext):
+    product_ids = ctx.dataset["product_ids"]
+
+    async def operation(i):
+        kind = i % 3
+        if kind == 0:
+            response = await ctx.client.get("/products/", params={"skip": ctx.rng.randrange(0, 500), "limit": 50})
+        elif kind == 1:
+            response = await ctx.client.get("/categories/")
+        else:
+            response = await ctx.client.get(f"/products/{ctx.rng.choice(product_ids)}")
+        return response.status_code == 200
+
+    return await run_load(operation, ctx.args.requests, ctx.args.concurrency, warmup=10)
+
+
+async def scenario_cart_add(ctx: BenchContext):
+    product_ids = ctx.dataset["available_product_ids"]
+
+    async def operation(i):
+        response = await ctx.client.post(
+            "/cart/items",
+            json={"product_id": ctx.rng.choice(product_ids), "quantity": 1},
+            headers=ctx.auth(ctx.random_customer())
+        )
+        return response.status_code == 200
+
+    return await run_load(operation, ctx.args.requests, ctx.args.concurrency, warmup=10)
+
+
+async def scenario_checkout(ctx: BenchContext):
+    product_ids = ctx.dataset["available_product_ids"]
+    # Un cliente distinto por checkout; el carrito se llena antes de medir
+    customers = list(range(1, len(ctx.tokens)))[:ctx.args.requests]
+    for user_index in customers:
+        for product_id in ctx.rng.sample(product_ids, 3):
+            await ctx.client.post(
+                "/cart/items",
+                json={"product_id": product_id, "quantity": 1},
+                headers=ctx.auth(user_index)
+            )
+
+    async def operation(i):
+        response = await ctx.client.post(
+            "/cart/checkout-with-table",
+            json={"order_type": "delivery", "delivery_address": f"Calle {i}"},
+            headers=ctx.auth(customers[i])
+        )
+        return response.status_code == 200
+
+    return await run_load(operation, len(customers), ctx.args.concurrency)
+
+
+async def scenario_my_orders(ctx: BenchContext):
+    async def operation(i):
+        response = await ctx.client.get(
+            "/orders/my-orders", params={"limit": 20}, headers=ctx.auth(ctx.random_customer())
+        )
+        return response.status_code == 200
+
+    return await run_load(operation, ctx.args.requests, ctx.args.concurrency, warmup=5)
+
+
+async def scenario_all_orders(ctx: BenchContext):
+    async def operation(i):
+        response = await ctx.client.get(
+            "/orders/", params={"skip": ctx.rng.randrange(0, 1000), "limit": 100}, headers=ctx.auth(0)
+        )
+        return response.status_code == 200
+
+    return await run_load(operation, ctx.args.requests, ctx.args.concurrency, warmup=5)
+
+
+async def scenario_tables(ctx: BenchContext):
+    async def operation(i):
+        response = await ctx.client.get("/tables/with-status")
+        return response.status_code == 200
+
+    return await run_load(operation, ctx.args.requests, ctx.args.concurrency, warmup=5)
+
+
+async def scenario_ws_fanout(ctx: BenchContext):
+    from app.websocket.websocket_manager import manager, notify_new_order
+
+    subscribers = [FakeSubscriber() for _ in range(ctx.args.subscribers)]
+    previous = manager.active_connections
+    manager.active_connections = list(subscribers)
+    order = {
+        "id": 1,
+        "user_name": "Cliente Bench",
+        "order_type": "dine_in",
+        "status": "recibido",
+        "total_amount": 84.5,
+        "items": [
+            {"product_id": product_id, "quantity": 2, "unit_price": 12.5, "subtotal": 25.0}
+            for product_id in ctx.dataset["product_ids"][:5]
+        ],
+    }
+
+    async def operation(i):
+        await notify_new_order({**order, "id": i})
+        return True
+
+    try:
+        # Secuencial: cada difusión recorre todos los suscriptores
+        result = await run_load(operation, ctx.args.requests, 1, warmup=5)
+    finally:
+        manager.active_connections = previous
+    result["subscribers"] = len(subscribers)
+    result["messages_delivered"] = sum(subscriber.received for subscriber in subscribers)
+    return result
+
+
+async def run_scenarios(app, dataset, args):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        ctx = BenchContext(client, dataset, args)
+        for name in args.scenarios:
+            print(f"▶️  {name}...", file=sys.stderr)
+            # La app imprime trazas de depuración: no deben contaminar la salida
+            with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+                results[name] = await globals()[f"scenario_{name}"](ctx)
+    return results
+
+
+def print_report(results):
+    print(f"{'escenario':<12} {'req':>6} {'err':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, stats in results.items():
+        print(
+            f"{name:<12} {stats['requests']:>6} {stats['errors']:>5} {stats['throughput_rps']:>9} "
+            f"{stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL))
+    parser.add_argument("--scale", type=float, default=1.0, help="Factor de escala del dataset")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=300, help="Peticiones por escenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--subscribers", type=int, default=200, help="Suscriptores para ws_fanout")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--output", default=None, help="Archivo JSON de resultados")
+    args = parser.parse_args()
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Escenarios desconocidos: {', '.join(sorted(unknown))}")
+
+    app = load_app(args.database_url)
+
+    from app.db.database import engine
+    from benchmarks.dataset import seed_dataset
+
+    print(f"🌱 Poblando {engine.dialect.name} (scale={args.scale}, seed={args.seed})...", file=sys.stderr)
+    dataset = seed_dataset(engine, scale=args.scale, seed=args.seed)
+    print(f"   {dataset['counts']} en {dataset['seconds']} s", file=sys.stderr)
+
+    results = asyncio.run(run_scenarios(app, dataset, args))
+    print_report(results)
+
+    revision = git_revision()
+    output = args.output or os.path.join(
+        "benchmarks", "results", f"{datetime.utcnow():%Y%m%dT%H%M%S}_{revision or 'local'}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "meta": {
+                "revision": revision,
+                "timestamp": datetime.utcnow().isoformat(),
+                "python": platform.python_version(),
+                "database": engine.dialect.name,
+                "scale": args.scale,
+                "seed": args.seed,
+                "concurrency": args.concurrency,
+                "requests": args.requests,
+                "dataset": dataset["counts"],
+            },
+            "scenarios": results,
+        }, f, indent=2)
+    print(f"💾 Resultados guardados en {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark del autocompletado (/products/autocomplete) en memoria.
+
+Genera un catálogo con generate_data.py y simula la caja de búsqueda: cada
+consulta se envía letra por letra, con y sin errores de escritura. Reporta el
+tiempo de construcción del índice y los percentiles por pulsación.
+
+Uso:
+    python -m benchmarks.bench_autocomplete --products 2000
+"""
+import argparse
+import time
+
+from benchmarks.harness import DEFAULT_DATABASE_URL, percentile, use_database
+
+TYPED = ["ceviche", "cebiche", "sevíche", "lomo saltado", "lomo zaltado", "aji de gallina",
+         "tiramizu", "pisco sour", "parrillada", "chicha morada", "postres"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    use_database(args.database_url)
+    from app.db.database import SessionLocal, engine
+    from app.services.autocomplete_service import autocomplete_index
+    from generate_data import CATEGORIES, generate_data
+
+    generate_data(
+        engine, scale=0.01, seed=args.seed, reset=True, verbose=False,
+        products_per_category=max(1, args.products // len(CATEGORIES))
+    )
+    with SessionLocal() as db:
+        start = time.perf_counter()
+        autocomplete_index.build(db)
+        build = time.perf_counter() - start
+
+    samples = []
+    for _ in range(args.rounds):
+        for text in TYPED:
+            for end in range(1, len(text) + 1):
+                start = time.perf_counter()
+                autocomplete_index.suggest(text[:end])
+                samples.append(time.perf_counter() - start)
+    samples.sort()
+
+    print(f"📊 {args.products} productos, índice construido en {build * 1000:.0f} ms")
+    print(f"⌨️  {len(samples)} pulsaciones: p50 {percentile(samples, 0.5) * 1000:.3f} ms, "
+          f"p95 {percentile(samples, 0.95) * 1000:.3f} ms, p99 {percentile(samples, 0.99) * 1000:.3f} ms")
+    for text in TYPED:
+        names = [suggestion["name"] for suggestion in autocomplete_index.suggest(text, limit=3)]
+        print(f"   {text:<16} → {', '.join(names) or '—'}")
+
+
+if __name__ == "__main__":
+    main()
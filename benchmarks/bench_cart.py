@@ -0,0 +1,123 @@
+"""
+Benchmark de una sesión de carrito con muchos toques ("+1", "-1", quitar, vaciar).
+
+Compara la implementación anterior de add_item_to_cart (get_or_create_cart,
+consulta del producto, consulta de la línea, commit y recarga completa) con la
+actual basada en upsert y con el backend en memoria (CART_BACKEND=memory, más
+la escritura diferida al final): sentencias SQL y latencia por toque.
+
+Uso:
+    python -m benchmarks.bench_cart --users 50 --taps 40
+"""
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks.harness import DEFAULT_DATABASE_URL, use_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--users", type=int, default=50, help="Sesiones (una por usuario)")
+    parser.add_argument("--taps", type=int, default=40, help="Toques por sesión")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    use_database(args.database_url)
+    from sqlalchemy import event
+
+    from app.db.database import SessionLocal, engine
+    from app.models.cart import Cart, CartItem
+    from app.models.product import Product
+    from app.schemas.cart import CartItemCreate, CartItemUpdate
+    from app.services import cart_service
+    from app.services.cart_store import cart_store
+    from benchmarks.dataset import seed_dataset
+
+    dataset = seed_dataset(engine, scale=0.05, seed=args.seed)
+
+    def legacy_add(db, user_id, item_data):
+        # add_item_to_cart antes del upsert
+        cart = cart_service.get_or_create_cart(db, user_id)
+        product = db.query(Product).filter(Product.id == item_data.product_id).first()
+        if not product or not product.is_available:
+            raise ValueError("Producto no disponible")
+        if product.stock < item_data.quantity:
+            raise ValueError(f"Stock insuficiente. Disponible: {product.stock}")
+        existing_item = db.query(CartItem).filter(
+            CartItem.cart_id == cart.id,
+            CartItem.product_id == item_data.product_id
+        ).first()
+        if existing_item:
+            existing_item.quantity += item_data.quantity
+        else:
+            db.add(CartItem(cart_id=cart.id, product_id=item_data.product_id, quantity=item_data.quantity))
+        db.commit()
+        return cart_service.get_cart_with_items(db, user_id)
+
+    statements = [0]
+
+    def count(*_):
+        statements[0] += 1
+
+    def session(add, users):
+        """Sesión típica: varios "+1" sobre pocos platos, ajustes y al final vaciar"""
+        rng = random.Random(args.seed)
+        latencies, counts = [], []
+        for user_id in users:
+            products = rng.sample(dataset["available_product_ids"], 4)
+            with SessionLocal() as db:
+                for tap in range(args.taps):
+                    statements[0] = 0
+                    start = time.perf_counter()
+                    if tap % 10 == 9:
+                        cart = cart_service.get_cart_with_items(db, user_id)
+                        cart_service.update_cart_item(db, user_id, cart.items[0].id, CartItemUpdate(quantity=1))
+                    else:
+                        add(db, user_id, CartItemCreate(product_id=rng.choice(products), quantity=1))
+                    latencies.append(time.perf_counter() - start)
+                    counts.append(statements[0])
+                cart_service.clear_cart(db, user_id)
+        return latencies, counts
+
+    def reset_carts():
+        with SessionLocal() as db:
+            db.query(CartItem).delete()
+            db.query(Cart).delete()
+            db.commit()
+
+    user_ids = dataset["user_ids"][1:args.users + 1]
+    results = {}
+    flush_statements = 0
+    for name, add, backend in (
+        ("anterior", legacy_add, "database"),
+        ("upsert", cart_service.add_item_to_cart, "database"),
+        ("memoria", cart_service.add_item_to_cart, "memory"),
+    ):
+        # Cada implementación empieza sin carritos (el primer toque los crea)
+        reset_carts()
+        cart_service.CART_BACKEND = backend
+        event.listen(engine, "before_cursor_execute", count)
+        results[name] = session(add, user_ids)
+        if backend == "memory":
+            # Lo que el worker escribiría en la BD por todas las sesiones
+            statements[0] = 0
+            with SessionLocal() as db:
+                cart_store.flush_dirty(db)
+            flush_statements = statements[0]
+        event.remove(engine, "before_cursor_execute", count)
+    cart_service.CART_BACKEND = "database"
+
+    print(f"📊 {len(user_ids)} sesiones × {args.taps} toques ({engine.dialect.name})")
+    print(f"{'implementación':<16} {'sentencias/toque':>17} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, (latencies, counts) in results.items():
+        latencies.sort()
+        print(f"{name:<16} {statistics.mean(counts):>17.2f} "
+              f"{statistics.median(latencies) * 1000:>8.3f} {latencies[int(len(latencies) * 0.95)] * 1000:>8.3f}")
+    print(f"💾 escritura diferida de los carritos en memoria: {flush_statements} sentencias en total")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark del plano de mesas con el índice espacial (floor_index).
+
+Compara con las consultas equivalentes a la BD:
+- vista: mesas dentro de un rectángulo del plano
+- mesa libre más cercana a un punto
+- arrastre en el editor: un commit por movimiento del mouse
+  (PATCH /tables/{id}/position) contra uno por gesto (PATCH /tables/positions)
+
+Uso:
+    python -m benchmarks.bench_floor --tables 500 --moves 30
+"""
+import argparse
+import random
+import time
+
+from benchmarks.harness import DEFAULT_DATABASE_URL, percentile, use_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--tables", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--gestures", type=int, default=20, help="Gestos de arrastre")
+    parser.add_argument("--moves", type=int, default=30, help="Movimientos del mouse por gesto")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    use_database(args.database_url)
+    from sqlalchemy import event, update
+
+    from app.db.database import SessionLocal, engine
+    from app.models.table import Table
+    from app.schemas.table import TablePositionItem, TablePositionUpdate
+    from app.services.floor_index import floor_index
+    from app.services.table_service import (update_table_position,
+                                            update_table_positions)
+    from generate_data import generate_data
+
+    dataset = generate_data(engine, scale=0.01, seed=args.seed, reset=True, verbose=False, tables=args.tables)
+    rng = random.Random(args.seed)
+    with SessionLocal() as db:
+        # Un tercio de las mesas ocupadas
+        busy = rng.sample(dataset["table_ids"], len(dataset["table_ids"]) // 3)
+        db.execute(update(Table).where(Table.id.in_(busy)).values(is_available=False))
+        db.commit()
+        width = max(x for x, in db.query(Table.position_x)) + 60
+        height = max(y for y, in db.query(Table.position_y)) + 60
+
+    def sql_viewport(db, min_x, min_y, max_x, max_y):
+        return db.query(Table).filter(
+            Table.is_active == True,
+            Table.position_x.between(min_x, max_x),
+            Table.position_y.between(min_y, max_y)
+        ).order_by(Table.number).all()
+
+    def sql_nearest(db, x, y):
+        distance = (Table.position_x - x) * (Table.position_x - x) + (Table.position_y - y) * (Table.position_y - y)
+        return db.query(Table).filter(Table.is_active == True, Table.is_available == True).order_by(distance).first()
+
+    viewports = []
+    for _ in range(args.queries):
+        # Vista de una tablet: unas 8 × 5 mesas
+        x, y = rng.uniform(0, width), rng.uniform(0, height)
+        viewports.append((x, y, x + 480, y + 300))
+    points = [(rng.uniform(0, width), rng.uniform(0, height)) for _ in range(args.queries)]
+
+    print(f"📊 {args.tables} mesas en un plano de {width:.0f} × {height:.0f} ({engine.dialect.name})")
+    with SessionLocal() as db:
+        start = time.perf_counter()
+        floor_index.build(db)
+        print(f"🧱 índice construido en {(time.perf_counter() - start) * 1000:.1f} ms")
+        for name, queries, indexed, plain in (
+            ("vista", viewports, lambda *a: floor_index.viewport(db, *a), lambda *a: sql_viewport(db, *a)),
+            ("más cercana", points, lambda *a: floor_index.nearest_free(db, *a), lambda *a: sql_nearest(db, *a)),
+        ):
+            for label, run in (("índice", indexed), ("SQL", plain)):
+                samples = []
+                for query in queries:
+                    began = time.perf_counter()
+                    run(*query)
+                    samples.append(time.perf_counter() - began)
+                samples.sort()
+                print(f"🔎 {name:<12} ({label:<6}): p50 {percentile(samples, 0.5) * 1000:.3f} ms, "
+                      f"p95 {percentile(samples, 0.95) * 1000:.3f} ms")
+
+    commits = [0]
+
+    def count_commit(*_):
+        commits[0] += 1
+
+    event.listen(engine, "commit", count_commit)
+    table_ids = dataset["table_ids"]
+    for label in ("por movimiento", "por gesto"):
+        commits[0] = 0
+        elapsed = 0.0
+        with SessionLocal() as db:
+            for _ in range(args.gestures):
+                table = db.get(Table, rng.choice(table_ids))
+                # Arrastrar la mesa a una esquina libre, fuera de la grilla de generate_data
+                x0, y0 = table.position_x, table.position_y
+                target_x, target_y = width + rng.uniform(100, 400), height + rng.uniform(100, 400)
+                path = [
+                    (x0 + (target_x - x0) * step / args.moves, y0 + (target_y - y0) * step / args.moves)
+                    for step in range(1, args.moves + 1)
+                ]
+                began = time.perf_counter()
+                if label == "por movimiento":
+                    # Con TABLE_MIN_DISTANCE, los que pasan sobre otra mesa se rechazan (sin commit)
+                    for x, y in path:
+                        try:
+                            update_table_position(db, table.id, TablePositionUpdate(position_x=x, position_y=y))
+                        except ValueError:
+                            pass
+                else:
+                    try:
+                        update_table_positions(db, [TablePositionItem(id=table.id, position_x=path[-1][0], position_y=path[-1][1])])
+                    except ValueError:
+                        pass
+                elapsed += time.perf_counter() - began
+                # Dejarla donde estaba para el siguiente gesto
+                update_table_positions(db, [TablePositionItem(id=table.id, position_x=x0, position_y=y0)])
+                commits[0] -= 1
+        print(f"🖱️  arrastre {label:<15}: {commits[0] / args.gestures:.1f} commits por gesto, "
+              f"{elapsed / args.gestures * 1000:.2f} ms por gesto")
+    event.remove(engine, "commit", count_commit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark de los índices de acceso (migración 0001): mide las consultas de los
+servicios con y sin índices sobre el mismo volumen de datos.
+
+Puebla la base de datos con generate_data.py (más un carrito por usuario),
+elimina los índices con el downgrade de la migración, mide, los vuelve a crear
+con el upgrade y mide otra vez.
+
+Uso:
+    python -m benchmarks.bench_indexes --scale 2 --rounds 200
+"""
+import argparse
+import importlib
+import random
+import statistics
+import time
+
+from benchmarks.harness import DEFAULT_DATABASE_URL, use_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cart-items", type=int, default=4, help="Items por carrito")
+    parser.add_argument("--rounds", type=int, default=100)
+    args = parser.parse_args()
+
+    use_database(args.database_url)
+    from sqlalchemy import insert
+
+    from app.db.database import SessionLocal, engine
+    from app.models.cart import Cart, CartItem
+    from app.services.cart_service import get_cart_with_items
+    from app.services.extra_service import get_extras, get_order_extras
+    from app.services.order_service import get_orders
+    from app.services.product_service import get_products
+    from app.services.review_service import get_reviews_by_product
+    from app.services.table_service import get_tables_with_status
+    from generate_data import generate_data
+
+    migration = importlib.import_module("app.db.migrations.0001_access_pattern_indexes")
+
+    dataset = generate_data(engine, scale=args.scale, seed=args.seed, reset=True, verbose=False)
+    rng = random.Random(args.seed)
+    with SessionLocal() as db:
+        db.execute(insert(Cart), [{"user_id": user_id} for user_id in dataset["user_ids"]])
+        cart_ids = [cart.id for cart in db.query(Cart.id)]
+        db.execute(insert(CartItem), [
+            {"cart_id": cart_id, "product_id": product_id, "quantity": 1}
+            for cart_id in cart_ids
+            for product_id in rng.sample(dataset["product_ids"], args.cart_items)
+        ])
+        db.commit()
+    print(f"🌱 {dataset['counts']['orders']} pedidos, {len(cart_ids)} carritos ({engine.dialect.name})")
+
+    order_count = dataset["counts"]["orders"]
+    queries = {
+        "mis pedidos": lambda db: get_orders(db, limit=50, user_id=rng.choice(dataset["user_ids"])),
+        "mesas con estado": lambda db: get_tables_with_status(db),
+        "carrito": lambda db: get_cart_with_items(db, rng.choice(dataset["user_ids"])),
+        "reseñas de producto": lambda db: get_reviews_by_product(db, rng.choice(dataset["product_ids"])),
+        "extras de pedido": lambda db: get_order_extras(db, rng.randint(1, order_count)),
+        "menú por categoría": lambda db: get_products(db, category_id=rng.choice(dataset["category_ids"])),
+        "extras por categoría": lambda db: get_extras(db, category=rng.choice(("bebida", "condimento"))),
+    }
+
+    def measure():
+        results = {}
+        for name, query in queries.items():
+            rng.seed(args.seed)
+            # Mesas con estado recorre todas las mesas: menos rondas
+            rounds = max(1, args.rounds // 20) if name == "mesas con estado" else args.rounds
+            samples = []
+            with SessionLocal() as db:
+                for _ in range(rounds):
+                    start = time.perf_counter()
+                    query(db)
+                    samples.append(time.perf_counter() - start)
+                    db.expunge_all()
+            results[name] = statistics.median(samples)
+        return results
+
+    # Autocommit como en migrate.py (transactional = False)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        migration.downgrade(conn)
+        without = measure()
+        migration.upgrade(conn)
+        with_indexes = measure()
+
+    print(f"{'consulta':<22} {'sin índices ms':>15} {'con índices ms':>15} {'mejora':>8}")
+    for name in queries:
+        before, after = without[name], with_indexes[name]
+        print(f"{name:<22} {before * 1000:>15.3f} {after * 1000:>15.3f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark del overhead del subsistema de métricas.
+
+Compara una app FastAPI mínima con y sin MetricsMiddleware, y la ejecución
+de consultas SQLite con y sin los eventos de SQLAlchemy instalados.
+
+Uso:
+    python -m benchmarks.bench_metrics_overhead --requests 5000 --queries 20000
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+
+from app.monitoring.db_events import install_db_hooks
+from app.monitoring.middleware import MetricsMiddleware
+
+
+def build_app(with_metrics: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        return {"id": item_id}
+
+    if with_metrics:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def time_requests(app: FastAPI, total: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Calentamiento
+        for i in range(100):
+            await client.get(f"/items/{i}")
+        start = time.perf_counter()
+        for i in range(total):
+            await client.get(f"/items/{i}")
+        return (time.perf_counter() - start) / total
+
+
+def time_queries(with_hooks: bool, total: int) -> float:
+    engine = create_engine("sqlite://")
+    if with_hooks:
+        install_db_hooks(engine)
+    with engine.connect() as conn:
+        statement = text("SELECT 1")
+        start = time.perf_counter()
+        for _ in range(total):
+            conn.execute(statement).scalar()
+        return (time.perf_counter() - start) / total
+
+
+def best_of(func, rounds: int) -> float:
+    return min(func() for _ in range(rounds))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    plain_app, metrics_app = build_app(False), build_app(True)
+    plain = best_of(lambda: asyncio.run(time_requests(plain_app, args.requests)), args.rounds)
+    measured = best_of(lambda: asyncio.run(time_requests(metrics_app, args.requests)), args.rounds)
+
+    query_plain = best_of(lambda: time_queries(False, args.queries), args.rounds)
+    query_hooked = best_of(lambda: time_queries(True, args.queries), args.rounds)
+
+    print("📊 Overhead de métricas")
+    print(f"   HTTP sin middleware:  {plain * 1e6:8.1f} µs/petición")
+    print(f"   HTTP con middleware:  {measured * 1e6:8.1f} µs/petición "
+          f"(+{(measured - plain) * 1e6:.1f} µs, {(measured / plain - 1) * 100:+.1f}%)")
+    print(f"   SQL sin eventos:      {query_plain * 1e6:8.1f} µs/consulta")
+    print(f"   SQL con eventos:      {query_hooked * 1e6:8.1f} µs/consulta "
+          f"(+{(query_hooked - query_plain) * 1e6:.1f} µs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark de la carga del grafo de pedidos: joinedload anidado vs selectinload.
+
+Genera pedidos con muchos items y extras y compara la estrategia anterior
+(joinedload de items→producto y extras→extra en una sola consulta) con
+order_graph_options(): número de sentencias, filas y celdas devueltas por la
+base de datos y latencia de get_orders/get_order_by_id.
+
+Uso:
+    python -m benchmarks.bench_order_loading --orders 200 --items 20 --extras 8
+"""
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks.harness import DEFAULT_DATABASE_URL, use_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--orders", type=int, default=200, help="Pedidos grandes a generar")
+    parser.add_argument("--items", type=int, default=20, help="Items por pedido")
+    parser.add_argument("--extras", type=int, default=8, help="Extras por pedido")
+    parser.add_argument("--limit", type=int, default=50, help="Tamaño de página del listado")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    use_database(args.database_url)
+    from sqlalchemy import event, insert
+    from sqlalchemy.orm import joinedload
+
+    from app.db.database import SessionLocal, engine
+    from app.models.extra import Extra, OrderExtra
+    from app.models.order import Order, OrderItem
+    from app.services.order_service import order_graph_options
+    from generate_data import generate_data
+
+    dataset = generate_data(engine, scale=0.05, seed=args.seed, reset=True, verbose=False)
+    rng = random.Random(args.seed)
+    with SessionLocal() as db:
+        products = dataset["product_ids"]
+        extras = dataset["extra_ids"]
+        for _ in range(args.orders):
+            order = Order(user_id=rng.choice(dataset["user_ids"]), order_type="delivery", status="completado")
+            db.add(order)
+            db.flush()
+            db.execute(insert(OrderItem), [
+                {"order_id": order.id, "product_id": product_id, "quantity": 1, "unit_price": 10.0, "subtotal": 10.0}
+                for product_id in rng.sample(products, args.items)
+            ])
+            db.execute(insert(OrderExtra), [
+                {"order_id": order.id, "extra_id": rng.choice(extras), "quantity": 1, "unit_price": 2.0, "subtotal": 2.0}
+                for _ in range(args.extras)
+            ])
+        db.commit()
+
+    legacy_options = (
+        joinedload(Order.items).joinedload(OrderItem.product),
+        joinedload(Order.extras).joinedload(OrderExtra.extra),
+        joinedload(Order.table),
+        joinedload(Order.user),
+    )
+    strategies = {
+        "joinedload": lambda detail: legacy_options,
+        "selectinload": lambda detail: order_graph_options(),
+    }
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    def measure(load, detail: bool):
+        samples = []
+        for _ in range(args.rounds):
+            with SessionLocal() as db:
+                query = db.query(Order).options(*load(detail))
+                start = time.perf_counter()
+                if detail:
+                    for order_id in range(1, 21):
+                        query.filter(Order.id == dataset["counts"]["orders"] + order_id).first()
+                else:
+                    query.order_by(Order.created_at.desc(), Order.id.desc()).limit(args.limit).all()
+                samples.append(time.perf_counter() - start)
+
+        # Volumen devuelto por la BD: se re-ejecutan las sentencias de una pasada
+        captured.clear()
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            with SessionLocal() as db:
+                query = db.query(Order).options(*load(detail))
+                if detail:
+                    query.filter(Order.id == dataset["counts"]["orders"] + 1).first()
+                else:
+                    query.order_by(Order.created_at.desc(), Order.id.desc()).limit(args.limit).all()
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        rows = cells = 0
+        raw = engine.raw_connection()
+        try:
+            for statement, parameters in captured:
+                cursor = raw.cursor()
+                cursor.execute(statement, parameters)
+                fetched = cursor.fetchall()
+                rows += len(fetched)
+                cells += len(fetched) * len(cursor.description or ())
+                cursor.close()
+        finally:
+            raw.close()
+        return statistics.median(samples), len(captured), rows, cells
+
+    print(f"📊 Pedidos con {args.items} items y {args.extras} extras ({engine.dialect.name})")
+    print(f"{'consulta':<22} {'estrategia':<13} {'sentencias':>10} {'filas':>8} {'celdas':>9} {'ms':>9}")
+    for label, detail in ((f"listado ({args.limit})", False), ("detalle (×20)", True)):
+        for name, load in strategies.items():
+            elapsed, statements, rows, cells = measure(load, detail)
+            print(f"{label:<22} {name:<13} {statements:>10} {rows:>8} {cells:>9} {elapsed * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
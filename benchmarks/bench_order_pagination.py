@@ -0,0 +1,102 @@
+"""
+Benchmark de paginación del listado de pedidos: OFFSET vs cursor (keyset).
+
+Puebla la base de datos con generate_data.py y mide, a distintas profundidades,
+la consulta de IDs de la página (coste puro de la paginación) y get_orders()
+completo, con skip/limit y con el cursor (created_at, id) equivalente,
+comprobando que ambas devuelven la misma página.
+
+Uso:
+    python -m benchmarks.bench_order_pagination --scale 2 --depths 0,1000,10000,30000
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.harness import DEFAULT_DATABASE_URL, use_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--depths", default="0,1000,5000,10000,19000")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--no-seed", action="store_true", help="Reutilizar los datos existentes")
+    args = parser.parse_args()
+
+    use_database(args.database_url)
+    from sqlalchemy import func, select
+
+    from app.db.database import SessionLocal, engine
+    from app.models.order import Order
+    from app.services.order_service import get_orders
+    from app.services.pagination import decode_cursor, encode_cursor, keyset_before
+    from benchmarks.dataset import seed_dataset
+
+    if not args.no_seed:
+        dataset = seed_dataset(engine, scale=args.scale, seed=args.seed)
+        print(f"🌱 {dataset['counts']['orders']} pedidos generados en {dataset['seconds']} s")
+
+    def timed(**kwargs):
+        samples, ids = [], None
+        for _ in range(args.rounds):
+            with SessionLocal() as db:
+                start = time.perf_counter()
+                orders = get_orders(db, limit=args.limit, **kwargs)
+                samples.append(time.perf_counter() - start)
+                ids = [order.id for order in orders]
+        return statistics.median(samples), ids
+
+    def timed_ids(skip=0, cursor=None):
+        query = select(Order.id).order_by(Order.created_at.desc(), Order.id.desc()).limit(args.limit)
+        if cursor:
+            query = query.where(keyset_before(Order.created_at, Order.id, decode_cursor(cursor)))
+        else:
+            query = query.offset(skip)
+        samples = []
+        with engine.connect() as conn:
+            for _ in range(args.rounds * 10):
+                start = time.perf_counter()
+                conn.execute(query).all()
+                samples.append(time.perf_counter() - start)
+        return statistics.median(samples)
+
+    with SessionLocal() as db:
+        total = db.execute(select(func.count(Order.id))).scalar()
+
+    print(f"📊 Paginación de {total} pedidos, páginas de {args.limit} ({engine.dialect.name})")
+    print(f"{'':>12} {'— solo IDs —':^30} {'— get_orders —':^30}")
+    print(f"{'profundidad':>12} {'offset ms':>10} {'cursor ms':>10} {'mejora':>8} "
+          f"{'offset ms':>10} {'cursor ms':>10} {'mejora':>8}")
+    for depth in (int(value) for value in args.depths.split(",")):
+        if depth >= total:
+            continue
+        cursor = None
+        if depth:
+            # Cursor del último pedido de la página anterior
+            with SessionLocal() as db:
+                created_at, order_id = db.execute(
+                    select(Order.created_at, Order.id)
+                    .order_by(Order.created_at.desc(), Order.id.desc())
+                    .offset(depth - 1).limit(1)
+                ).one()
+            cursor = encode_cursor(created_at, order_id)
+
+        offset_ids_time = timed_ids(skip=depth)
+        cursor_ids_time = timed_ids(cursor=cursor)
+        offset_time, offset_ids = timed(skip=depth)
+        cursor_time, cursor_ids = timed(cursor=cursor)
+        status = "" if offset_ids == cursor_ids else "  ⚠️ páginas distintas"
+        print(
+            f"{depth:>12} {offset_ids_time * 1000:>10.3f} {cursor_ids_time * 1000:>10.3f} "
+            f"{offset_ids_time / cursor_ids_time:>7.1f}x "
+            f"{offset_time * 1000:>10.2f} {cursor_time * 1000:>10.2f} "
+            f"{offset_time / cursor_time:>7.1f}x{status}"
+        )
+
+
+if __name__ == "__main__":
+    main()
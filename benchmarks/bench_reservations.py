@@ -0,0 +1,127 @@
+"""
+Benchmark de reservas: un día con cientos de mesas y miles de solicitudes.
+
+Reserva el día completo con dos estrategias de asignación y compara cuántas
+solicitudes se aceptan y cuántos asientos quedan vacíos:
+- primera mesa libre: la de menor número con capacidad suficiente
+- mejor ajuste (create_reservation sin mesa): menos asientos vacíos y hueco más corto
+
+Después mide la consulta de disponibilidad ("mesas de capacidad ≥ N libres
+entre T1 y T2") con el índice en memoria y con una consulta NOT EXISTS a la BD.
+
+Uso:
+    python -m benchmarks.bench_reservations --tables 300 --bookings 3000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.harness import DEFAULT_DATABASE_URL, percentile, use_database
+
+PARTY_SIZES = (1, 2, 2, 2, 2, 3, 3, 4, 4, 4, 5, 6, 6, 7, 8)
+DURATIONS = (60, 75, 90, 90, 90, 105, 120, 150)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--tables", type=int, default=300)
+    parser.add_argument("--bookings", type=int, default=3000, help="Solicitudes de reserva en el día")
+    parser.add_argument("--queries", type=int, default=2000, help="Consultas de disponibilidad medidas")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    use_database(args.database_url)
+    from sqlalchemy import and_, exists
+
+    from app.db.database import SessionLocal, engine
+    from app.models.reservation import Reservation
+    from app.models.table import Table
+    from app.schemas.reservation import ReservationCreate
+    from app.services.reservation_index import BUFFER, reservation_index
+    from app.services.reservation_service import create_reservation
+    from generate_data import generate_data
+
+    dataset = generate_data(engine, scale=0.01, seed=args.seed, reset=True, verbose=False, tables=args.tables)
+    user_id = dataset["user_ids"][-1]
+
+    rng = random.Random(args.seed)
+    day = (datetime.utcnow() + timedelta(days=2)).replace(hour=0, minute=0, second=0, microsecond=0)
+    requests = []
+    for _ in range(args.bookings):
+        # Inicio cada 15 minutos entre las 12:00 y las 22:00
+        start = day + timedelta(hours=12, minutes=15 * rng.randrange(40))
+        requests.append((rng.choice(PARTY_SIZES), start, start + timedelta(minutes=rng.choice(DURATIONS))))
+
+    with SessionLocal() as db:
+        total_seats = sum(capacity for capacity, in db.query(Table.capacity).filter(Table.is_active == True))
+
+    def book(strategy):
+        with SessionLocal() as db:
+            db.query(Reservation).delete()
+            db.commit()
+            reservation_index.clear()
+            accepted, seated, offered = 0, 0, 0
+            latencies = []
+            for party_size, start, end in requests:
+                began = time.perf_counter()
+                table_id = None
+                if strategy == "primera libre":
+                    free = reservation_index.free_tables(db, party_size, start, end)
+                    if not free:
+                        latencies.append(time.perf_counter() - began)
+                        continue
+                    table_id = min(free, key=lambda table: table["number"])["id"]
+                try:
+                    reservation = create_reservation(db, user_id, ReservationCreate(
+                        party_size=party_size, starts_at=start, ends_at=end, table_id=table_id
+                    ))
+                except ValueError:
+                    latencies.append(time.perf_counter() - began)
+                    continue
+                latencies.append(time.perf_counter() - began)
+                accepted += 1
+                minutes = (end - start).total_seconds() / 60
+                seated += party_size * minutes
+                offered += reservation.table_capacity * minutes
+            latencies.sort()
+            return accepted, seated, offered, latencies
+
+    print(f"📊 {args.tables} mesas ({total_seats} asientos), {args.bookings} solicitudes en un día ({engine.dialect.name})")
+    print(f"{'asignación':<16} {'aceptadas':>10} {'asientos usados':>16} {'p50 ms':>8} {'p95 ms':>8}")
+    for strategy in ("primera libre", "mejor ajuste"):
+        accepted, seated, offered, latencies = book(strategy)
+        print(f"{strategy:<16} {accepted:>10} {seated / offered if offered else 0:>15.1%} "
+              f"{percentile(latencies, 0.5) * 1000:>8.3f} {percentile(latencies, 0.95) * 1000:>8.3f}")
+
+    def sql_free_tables(db, party_size, start, end):
+        # La misma pregunta sin índice: una consulta por solicitud
+        busy = exists().where(and_(
+            Reservation.table_id == Table.id,
+            Reservation.status == "confirmada",
+            Reservation.starts_at < end + BUFFER,
+            Reservation.ends_at > start - BUFFER
+        ))
+        return db.query(Table.id).filter(
+            Table.is_active == True, Table.capacity >= party_size, ~busy
+        ).order_by(Table.capacity, Table.number).all()
+
+    queries = [requests[rng.randrange(len(requests))] for _ in range(args.queries)]
+    with SessionLocal() as db:
+        for name, query in (
+            ("índice", lambda party_size, start, end: reservation_index.free_tables(db, party_size, start, end)),
+            ("SQL", lambda party_size, start, end: sql_free_tables(db, party_size, start, end)),
+        ):
+            samples = []
+            for party_size, start, end in queries:
+                began = time.perf_counter()
+                query(party_size, start, end)
+                samples.append(time.perf_counter() - began)
+            samples.sort()
+            print(f"🔎 disponibilidad ({name}): p50 {percentile(samples, 0.5) * 1000:.3f} ms, "
+                  f"p95 {percentile(samples, 0.95) * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
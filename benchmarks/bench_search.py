@@ -0,0 +1,82 @@
+"""
+Benchmark de la búsqueda de productos: doble ILIKE '%q%' vs search_products().
+
+Genera un catálogo grande con generate_data.py y mide, para varias consultas
+típicas de la caja de búsqueda, la latencia del filtro ILIKE anterior y la del
+índice de búsqueda del motor (tsvector/GIN, FULLTEXT o índice en memoria).
+
+Uso:
+    python -m benchmarks.bench_search --products 100000 --rounds 20
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.harness import DEFAULT_DATABASE_URL, use_database
+
+QUERIES = ["ceviche", "lomo salt", "aji de gallina", "ají", "receta picante", "tiramisu gourmet", "chich"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    use_database(args.database_url)
+    from sqlalchemy import or_
+
+    from app.db.database import SessionLocal, engine
+    from app.db.migrate import upgrade
+    from app.models.product import Product
+    from app.services.product_service import search_products
+    from app.services.search_service import _backend, product_search_index
+    from generate_data import CATEGORIES, generate_data
+
+    dataset = generate_data(
+        engine, scale=0.01, seed=args.seed, reset=True, verbose=False,
+        products_per_category=max(1, args.products // len(CATEGORIES))
+    )
+    upgrade(engine)
+
+    def legacy_search(db, query):
+        pattern = f"%{query}%"
+        return db.query(Product).filter(
+            or_(Product.name.ilike(pattern), Product.description.ilike(pattern)),
+            Product.is_available == True
+        ).limit(args.limit).all()
+
+    def timed(search, query):
+        samples, results = [], []
+        with SessionLocal() as db:
+            for _ in range(args.rounds):
+                start = time.perf_counter()
+                results = search(db, query)
+                samples.append(time.perf_counter() - start)
+                db.expunge_all()
+        return statistics.median(samples), len(results)
+
+    with SessionLocal() as db:
+        backend = _backend(db)
+        build = None
+        if backend == "memory":
+            start = time.perf_counter()
+            product_search_index.build(db)
+            build = time.perf_counter() - start
+
+    print(f"📊 {len(dataset['product_ids'])} productos ({engine.dialect.name}, búsqueda: {backend})")
+    if build is not None:
+        print(f"🏗️  Índice en memoria construido en {build * 1000:.0f} ms")
+    print(f"{'consulta':<20} {'ILIKE ms':>10} {'hits':>5} {'índice ms':>10} {'hits':>5} {'mejora':>8}")
+    for query in QUERIES:
+        legacy_time, legacy_hits = timed(legacy_search, query)
+        search_time, search_hits = timed(lambda db, q: search_products(db, q, limit=args.limit), query)
+        print(f"{query:<20} {legacy_time * 1000:>10.2f} {legacy_hits:>5} "
+              f"{search_time * 1000:>10.2f} {search_hits:>5} {legacy_time / search_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
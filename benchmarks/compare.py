@@ -0,0 +1,45 @@
+"""
+Comparar dos resultados de benchmarks.bench_api.
+
+Uso:
+    python -m benchmarks.compare benchmarks/results/antes.json benchmarks/results/despues.json
+"""
+import argparse
+import json
+
+METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def change(before: float, after: float) -> str:
+    if not before:
+        return "n/a"
+    return f"{(after / before - 1) * 100:+.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    print(f"📊 {baseline['meta'].get('revision')} → {candidate['meta'].get('revision')}")
+    for name, after in candidate["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            print(f"{name:<12} (nuevo)")
+            continue
+        parts = [
+            f"{metric} {before[metric]} → {after[metric]} ({change(before[metric], after[metric])})"
+            for metric in METRICS
+        ]
+        print(f"{name:<12} " + " | ".join(parts))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+Dataset sintético para los benchmarks, construido con generate_data.py.
+"""
+from typing import Dict
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.product import Product
+from generate_data import generate_data, user_email
+
+# Stock ilimitado en la práctica: los checkouts medidos no deben agotar productos
+BENCH_STOCK = 1_000_000
+
+
+def bench_email(index: int) -> str:
+    return user_email(index)
+
+
+def seed_dataset(engine, scale: float = 1.0, seed: int = 42, reset: bool = True) -> Dict:
+    """
+    Poblar la base de datos y devolver los IDs que usan los escenarios
+    """
+    dataset = generate_data(engine, scale=scale, seed=seed, reset=reset, verbose=False)
+    with Session(engine) as db:
+        db.execute(update(Product).values(stock=BENCH_STOCK))
+        db.commit()
+    return dataset
@@ -0,0 +1,131 @@
+"""
+Utilidades comunes de los benchmarks: arranque de la app real contra una base
+de datos local, almacenamiento en memoria y medición de latencias.
+"""
+import asyncio
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import time
+import types
+from typing import Awaitable, Callable, Dict, List, Optional
+
+DEFAULT_DATABASE_URL = "sqlite:///benchmarks/.data/bench.db"
+
+
+class InMemoryStorage:
+    """
+    Sustituto de firebase_service: los benchmarks no deben subir nada al bucket
+    ni requerir credenciales
+    """
+
+    def __init__(self):
+        self.objects: Dict[str, bytes] = {}
+
+    async def upload_bytes(self, content: bytes, blob_path: str, content_type: str = "image/jpeg") -> str:
+        url = f"https://storage.googleapis.com/bench/{blob_path}"
+        self.objects[url] = content
+        return url
+
+    async def upload_image(self, file, folder: str = "products", filename: Optional[str] = None) -> str:
+        return await self.upload_bytes(await file.read(), f"{folder}/{filename or file.filename}")
+
+    async def delete_image(self, image_url: str, raise_errors: bool = False) -> bool:
+        return self.objects.pop(image_url, None) is not None
+
+
+def use_database(database_url: str = DEFAULT_DATABASE_URL):
+    """
+    Apuntar la app a la base de datos indicada. Debe llamarse antes de cualquier
+    import de `app` (database.py lee DATABASE_URL al importarse).
+    """
+    if database_url.startswith("sqlite:///"):
+        directory = os.path.dirname(database_url[len("sqlite:///"):])
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    os.environ["DATABASE_URL"] = database_url
+
+
+def load_app(database_url: str = DEFAULT_DATABASE_URL):
+    """
+    Importar main con la base de datos indicada y el almacenamiento en memoria.
+    Debe llamarse antes de cualquier import de `app`.
+    """
+    use_database(database_url)
+
+    storage = InMemoryStorage()
+    sys.modules.setdefault(
+        "app.services.firebase_service",
+        types.SimpleNamespace(firebase_service=storage, FirebaseService=InMemoryStorage)
+    )
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import main
+    return main.app
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    total = len(ordered)
+    return {
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(ordered) / total * 1000, 3) if total else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if total else 0.0,
+    }
+
+
+async def run_load(
+    operation: Callable[[int], Awaitable[bool]],
+    total: int,
+    concurrency: int,
+    warmup: int = 0
+) -> Dict[str, float]:
+    """
+    Ejecutar `operation(i)` `total` veces con `concurrency` tareas en paralelo.
+    La operación retorna False (o lanza) si la petición falló.
+    """
+    for i in range(warmup):
+        await operation(-(i + 1))
+
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                ok = await operation(i)
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
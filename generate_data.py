@@ -0,0 +1,368 @@
+"""
+Generador de datos sintéticos a escala de producción.
+
+A diferencia de init_db.py (pocos registros, uno a uno), inserta en bloque
+usuarios, categorías, productos, extras, mesas, meses de historial de pedidos
+con sus items y extras, reseñas de productos y de pedidos, y favoritos.
+El resultado es determinista para una misma semilla y factor de escala.
+
+Uso:
+    python generate_data.py --scale 1 --seed 42 --reset
+    python generate_data.py --users 5000 --products-per-category 100 --months 12 --reset
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.db.database import Base, engine
+from app.models.category import Category
+from app.models.extra import Extra, OrderExtra
+from app.models.favorite import Favorite
+from app.models.order import Order, OrderItem
+from app.models.order_review import OrderReview
+from app.models.product import Product
+from app.models.review import Review
+from app.models.table import Table
+from app.models.user import User
+from app.services.auth import get_password_hash
+
+# Volúmenes con scale=1 (~20k pedidos en 6 meses)
+BASE_SIZES = {
+    "users": 1000,
+    "products_per_category": 250,
+    "tables": 200,
+    "orders_per_day": 110,
+    "favorites_per_user": 3,
+    "reviews": 5000,
+}
+DEFAULT_MONTHS = 6
+DEFAULT_PASSWORD = "password123"
+BATCH_SIZE = 5000
+
+CATEGORIES = [
+    ("Entradas", "Platos para comenzar tu comida"),
+    ("Platos Fuertes", "Platos principales del menú"),
+    ("Postres", "Dulces delicias para terminar"),
+    ("Bebidas", "Refrescantes bebidas y cócteles"),
+    ("Ensaladas", "Ensaladas frescas y saludables"),
+    ("Sopas", "Sopas y cremas de la casa"),
+    ("Pastas", "Pastas artesanales"),
+    ("Parrillas", "Carnes a la parrilla"),
+]
+DISHES = ["Ceviche", "Lomo Saltado", "Ají de Gallina", "Causa", "Anticucho", "Tiramisú", "Pisco Sour",
+          "Hamburguesa", "Ensalada", "Chupe", "Tallarín", "Risotto", "Parrillada", "Suspiro", "Chicha"]
+STYLES = ["Clásico", "de la Casa", "Criollo", "Especial", "Norteño", "Light", "Picante", "Gourmet",
+          "Tradicional", "Mixto"]
+EXTRAS = [
+    ("Salsa criolla", "condimento", 0.0), ("Ají de la casa", "condimento", 0.0),
+    ("Mayonesa", "condimento", 0.0), ("Papas fritas", "acompanamiento", 6.0),
+    ("Arroz", "acompanamiento", 4.0), ("Yuca frita", "acompanamiento", 6.5),
+    ("Ensalada extra", "acompanamiento", 5.0), ("Gaseosa", "bebida", 5.0),
+    ("Limonada", "bebida", 7.0), ("Agua", "bebida", 3.0),
+]
+COMMENTS = ["¡Excelente!", "Muy rico, volveré.", "Buena porción.", "Algo frío al llegar.",
+            "Recomendado.", "Podría mejorar la sazón.", "Perfecto para compartir."]
+ACTIVE_STATUSES = ("recibido", "en_preparacion", "listo")
+CLOSED_STATUSES = ("entregado", "completado")
+# Peso de cada hora del día: picos de almuerzo y cena
+HOUR_WEIGHTS = [0, 0, 0, 0, 0, 0, 0, 1, 2, 2, 3, 5, 9, 10, 7, 3, 2, 3, 5, 8, 10, 8, 4, 1]
+
+
+def user_email(index: int) -> str:
+    return "admin@restaurant.test" if index == 0 else f"cliente{index}@restaurant.test"
+
+
+def _scaled(value: float, scale: float) -> int:
+    return max(1, int(value * scale))
+
+
+def _insert_batches(db: Session, model, rows: List[Dict], return_ids: bool = True) -> List[int]:
+    """
+    Insertar filas por lotes (executemany) y devolver sus IDs en orden de inserción
+    """
+    ids = []
+    for start in range(0, len(rows), BATCH_SIZE):
+        batch = rows[start:start + BATCH_SIZE]
+        if not return_ids:
+            db.execute(insert(model), batch)
+            continue
+        last_id = db.execute(select(func.max(model.id))).scalar() or 0
+        db.execute(insert(model), batch)
+        ids.extend(db.execute(
+            select(model.id).where(model.id > last_id).order_by(model.id)
+        ).scalars())
+    return ids
+
+
+def _random_timestamp(rng: random.Random, now: datetime, days: int) -> datetime:
+    day = now - timedelta(days=rng.randrange(days))
+    hour = rng.choices(range(24), weights=HOUR_WEIGHTS)[0]
+    created_at = day.replace(hour=hour, minute=rng.randrange(60), second=rng.randrange(60), microsecond=0)
+    # Hoy solo hay pedidos hasta la hora actual
+    return created_at if created_at <= now else created_at - timedelta(days=1)
+
+
+def generate_data(
+    bind=engine,
+    scale: float = 1.0,
+    seed: int = 42,
+    months: int = DEFAULT_MONTHS,
+    reset: bool = False,
+    users: Optional[int] = None,
+    products_per_category: Optional[int] = None,
+    tables: Optional[int] = None,
+    verbose: bool = True,
+) -> Dict:
+    """
+    Poblar la base de datos en bloque. Retorna los IDs generados y los conteos.
+    """
+    def log(message: str):
+        if verbose:
+            print(message)
+
+    rng = random.Random(seed)
+    if reset:
+        log("🗑️  Eliminando tablas...")
+        Base.metadata.drop_all(bind=bind)
+    Base.metadata.create_all(bind=bind)
+
+    n_users = users or _scaled(BASE_SIZES["users"], scale)
+    n_per_category = products_per_category or _scaled(BASE_SIZES["products_per_category"], scale)
+    n_tables = tables or _scaled(BASE_SIZES["tables"], scale)
+    days = max(1, months * 30)
+    n_orders = _scaled(BASE_SIZES["orders_per_day"] * days, scale)
+
+    started = time.perf_counter()
+    now = datetime.utcnow()
+    counts: Dict[str, int] = {}
+
+    with Session(bind) as db:
+        if db.execute(select(func.count(User.id))).scalar():
+            raise RuntimeError("La base de datos ya tiene datos: usa --reset para regenerarla")
+
+        # Un solo hash bcrypt compartido: calcularlo por usuario tardaría minutos
+        password_hash = get_password_hash(DEFAULT_PASSWORD)
+        user_ids = _insert_batches(db, User, [
+            {
+                "email": user_email(i),
+                "password": password_hash,
+                "full_name": "Administrador Principal" if i == 0 else f"Cliente {i}",
+                "role": "administrador" if i == 0 else "usuario",
+                "auth_provider": "email",
+                "is_active": True,
+                "created_at": _random_timestamp(rng, now, days * 2),
+            }
+            for i in range(n_users)
+        ])
+        customer_ids = user_ids[1:] or user_ids
+        log(f"👥 Usuarios: {len(user_ids)}")
+
+        category_ids = _insert_batches(db, Category, [
+            {"name": name, "description": description}
+            for name, description in CATEGORIES
+        ])
+
+        product_rows = [
+            {
+                "name": f"{rng.choice(DISHES)} {rng.choice(STYLES)} #{i + 1}",
+                "description": f"Receta {rng.choice(STYLES).lower()} preparada al momento",
+                "price": round(rng.uniform(5, 60), 1),
+                "category_id": category_id,
+                "is_available": rng.random() > 0.05,
+                "stock": rng.randint(50, 500),
+            }
+            for category_id in category_ids
+            for i in range(n_per_category)
+        ]
+        product_ids = _insert_batches(db, Product, product_rows)
+        prices = {product_id: row["price"] for product_id, row in zip(product_ids, product_rows)}
+        # Popularidad tipo Zipf: pocos platos concentran la mayoría de pedidos
+        popularity = list(accumulate(1 / (rank + 1) for rank in range(len(product_ids))))
+        log(f"🍽️  Productos: {len(product_ids)} en {len(category_ids)} categorías")
+
+        extra_rows = [
+            {"name": name, "category": category, "price": price, "is_free": price == 0.0,
+             "is_available": True, "stock": 10_000}
+            for name, category, price in EXTRAS
+        ]
+        extra_ids = _insert_batches(db, Extra, extra_rows)
+        extra_prices = {extra_id: row["price"] for extra_id, row in zip(extra_ids, extra_rows)}
+
+        table_ids = _insert_batches(db, Table, [
+            {
+                "number": i + 1,
+                "capacity": rng.choice((2, 2, 4, 4, 4, 6, 8)),
+                "position_x": float((i % 20) * 60),
+                "position_y": float((i // 20) * 60),
+                "is_available": True,
+                "is_active": True,
+            }
+            for i in range(n_tables)
+        ])
+        log(f"🪑 Mesas: {len(table_ids)}")
+
+        order_rows, order_lines = [], []
+        for _ in range(n_orders):
+            created_at = _random_timestamp(rng, now, days)
+            # Los pedidos de las últimas horas siguen activos
+            active = created_at > now - timedelta(hours=3)
+            dine_in = rng.random() < 0.4
+            items = {
+                product_id: rng.randint(1, 3)
+                for product_id in rng.choices(product_ids, cum_weights=popularity, k=rng.randint(1, 5))
+            }
+            extras = {
+                extra_id: rng.randint(1, 2)
+                for extra_id in rng.sample(extra_ids, rng.choice((0, 0, 1, 2)))
+            }
+            total = sum(prices[p] * q for p, q in items.items()) + sum(extra_prices[e] * q for e, q in extras.items())
+            order_rows.append({
+                "user_id": rng.choice(customer_ids),
+                "table_id": rng.choice(table_ids) if dine_in else None,
+                "order_type": "dine_in" if dine_in else "delivery",
+                "status": rng.choice(ACTIVE_STATUSES if active else CLOSED_STATUSES),
+                "delivery_address": None if dine_in else f"Av. Principal {rng.randint(100, 9999)}",
+                "estimated_time": rng.choice((15, 20, 30, 45)),
+                "total_amount": round(total, 2),
+                "is_paid": not active,
+                "created_at": created_at,
+                "updated_at": None if active else created_at + timedelta(minutes=rng.randint(20, 90)),
+            })
+            order_lines.append((items, extras, created_at))
+
+        order_ids = _insert_batches(db, Order, order_rows)
+
+        item_rows, order_extra_rows = [], []
+        for order_id, (items, extras, created_at) in zip(order_ids, order_lines):
+            for product_id, quantity in items.items():
+                item_rows.append({
+                    "order_id": order_id,
+                    "product_id": product_id,
+                    "quantity": quantity,
+                    "unit_price": prices[product_id],
+                    "subtotal": round(prices[product_id] * quantity, 2),
+                })
+            for extra_id, quantity in extras.items():
+                order_extra_rows.append({
+                    "order_id": order_id,
+                    "extra_id": extra_id,
+                    "quantity": quantity,
+                    "unit_price": extra_prices[extra_id],
+                    "subtotal": round(extra_prices[extra_id] * quantity, 2),
+                    "created_at": created_at,
+                })
+        _insert_batches(db, OrderItem, item_rows, return_ids=False)
+        _insert_batches(db, OrderExtra, order_extra_rows, return_ids=False)
+        log(f"🧾 Pedidos: {len(order_ids)} ({len(item_rows)} items, {len(order_extra_rows)} extras)")
+
+        closed_orders = [
+            (order_id, row) for order_id, row in zip(order_ids, order_rows)
+            if row["status"] in CLOSED_STATUSES
+        ]
+        order_review_rows = [
+            {
+                "user_id": row["user_id"],
+                "order_id": order_id,
+                "overall_rating": float(rng.randint(2, 5)),
+                "food_quality_rating": float(rng.randint(2, 5)),
+                "service_rating": float(rng.randint(2, 5)),
+                "delivery_rating": float(rng.randint(2, 5)) if row["order_type"] == "delivery" else None,
+                "ambiance_rating": float(rng.randint(2, 5)) if row["order_type"] == "dine_in" else None,
+                "comment": rng.choice(COMMENTS),
+                "is_approved": rng.random() < 0.8,
+                "would_recommend": rng.random() < 0.85,
+                "created_at": row["updated_at"],
+            }
+            for order_id, row in rng.sample(closed_orders, len(closed_orders) // 10)
+        ]
+        _insert_batches(db, OrderReview, order_review_rows, return_ids=False)
+
+        review_rows = [
+            {
+                "user_id": rng.choice(customer_ids),
+                "product_id": rng.choices(product_ids, cum_weights=popularity)[0],
+                "rating": float(rng.randint(1, 5)),
+                "comment": rng.choice(COMMENTS),
+                "is_approved": rng.random() < 0.8,
+                "created_at": _random_timestamp(rng, now, days),
+            }
+            for _ in range(_scaled(BASE_SIZES["reviews"], scale))
+        ]
+        _insert_batches(db, Review, review_rows, return_ids=False)
+
+        favorite_pairs = set()
+        for user_id in customer_ids:
+            for product_id in rng.choices(product_ids, cum_weights=popularity, k=BASE_SIZES["favorites_per_user"]):
+                favorite_pairs.add((user_id, product_id))
+        _insert_batches(db, Favorite, [
+            {"user_id": user_id, "product_id": product_id}
+            for user_id, product_id in sorted(favorite_pairs)
+        ], return_ids=False)
+        log(f"⭐ Reseñas: {len(review_rows)} de productos, {len(order_review_rows)} de pedidos; "
+            f"favoritos: {len(favorite_pairs)}")
+
+        db.commit()
+
+    counts.update({
+        "users": len(user_ids),
+        "categories": len(category_ids),
+        "products": len(product_ids),
+        "extras": len(extra_ids),
+        "tables": len(table_ids),
+        "orders": len(order_ids),
+        "order_items": len(item_rows),
+        "order_extras": len(order_extra_rows),
+        "order_reviews": len(order_review_rows),
+        "reviews": len(review_rows),
+        "favorites": len(favorite_pairs),
+    })
+    seconds = round(time.perf_counter() - started, 2)
+    log(f"🎉 Datos generados en {seconds} s")
+
+    return {
+        "user_ids": user_ids,
+        "admin_id": user_ids[0],
+        "category_ids": category_ids,
+        "product_ids": product_ids,
+        "available_product_ids": [
+            product_id for product_id, row in zip(product_ids, product_rows) if row["is_available"]
+        ],
+        "extra_ids": extra_ids,
+        "table_ids": table_ids,
+        "counts": counts,
+        "seconds": seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0, help="Factor de escala de todos los volúmenes")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla (mismos datos con la misma semilla)")
+    parser.add_argument("--months", type=int, default=DEFAULT_MONTHS, help="Meses de historial de pedidos")
+    parser.add_argument("--users", type=int, default=None)
+    parser.add_argument("--products-per-category", type=int, default=None)
+    parser.add_argument("--tables", type=int, default=None)
+    parser.add_argument("--reset", action="store_true", help="Eliminar y recrear las tablas antes de generar")
+    args = parser.parse_args()
+
+    generate_data(
+        scale=args.scale,
+        seed=args.seed,
+        months=args.months,
+        reset=args.reset,
+        users=args.users,
+        products_per_category=args.products_per_category,
+        tables=args.tables,
+    )
+    print(f"\n🔑 Administrador: {user_email(0)} / {DEFAULT_PASSWORD}")
+    print(f"   Clientes: {user_email(1)} … / {DEFAULT_PASSWORD}")
+
+
+if __name__ == "__main__":
+    main()
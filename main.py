@@ -1,3 +1,5 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import os
@@ -9,14 +11,38 @@ from app.controllers.categories import router as categories_router
 from app.controllers.users import router as users_router
 from app.controllers.favorite_controller import router as favorites_router
 from app.controllers.tables import router as tables_router
+from app.controllers.reservations import router as reservations_router
 from app.controllers.reviews import router as reviews_router
 from app.controllers.orders import router as orders_router
 from app.controllers.cart import router as cart_router
 from app.controllers.client_websocket import router as client_ws_router
 from app.controllers.websocket import router as websocket_router
 from app.controllers.extras import router as extras_router
+from app.controllers.metrics import router as metrics_router
+from app.controllers.monitoring import router as monitoring_router
 
 from app.db.connection import create_tables
+from app.db.database import engine
+from app.monitoring.db_events import install_db_hooks
+from app.monitoring.middleware import MetricsMiddleware
+from app.monitoring.profiler import (PROFILING_ENABLED, ProfilerMiddleware,
+                                     instrument_routes)
+from app.monitoring.query_counter import (QUERY_DEBUG_ENABLED,
+                                          QueryCounterMiddleware,
+                                          install_query_counter)
+from app.monitoring.slow_queries import (SLOW_QUERY_LOG_ENABLED,
+                                         install_slow_query_log)
+from app.services.cart_cleanup_service import run_cart_sweep_worker
+from app.services.cart_service import CART_BACKEND
+from app.services.cart_store import flush_cart_store, run_cart_flush_worker
+from app.services.idempotency_service import run_idempotency_sweep_worker
+from app.services.image_cleanup_service import run_image_cleanup_worker
+from app.services.image_service import image_service
+
+# Medir consultas y tiempo en BD (también las de create_tables)
+install_db_hooks(engine)
+if SLOW_QUERY_LOG_ENABLED:
+    install_slow_query_log(engine)
 
 # Crear tablas en la base de datos
 create_tables()
@@ -38,6 +64,21 @@ app.add_middleware(
     max_age=600,
 )
 
+# Métricas por ruta (latencia, códigos de estado, consultas SQL)
+if os.getenv("METRICS_ENABLED", "true").lower() == "true":
+    app.add_middleware(MetricsMiddleware)
+
+# Modo desarrollo: contador de consultas por petición y detector de N+1
+if QUERY_DEBUG_ENABLED:
+    install_query_counter(engine)
+    app.add_middleware(QueryCounterMiddleware)
+
+# Perfilado bajo demanda (cabecera X-Profile de un administrador) o por muestreo,
+# solo con PROFILING=true. El perfil del event loop es de todo el loop: en código
+# async incluye lo que hicieron otras peticiones al mismo tiempo
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilerMiddleware)
+
 # Incluir routers
 app.include_router(auth_router)
 app.include_router(products_router)
@@ -45,12 +86,42 @@ app.include_router(categories_router)
 app.include_router(users_router)
 app.include_router(favorites_router)
 app.include_router(tables_router)
+app.include_router(reservations_router)
 app.include_router(reviews_router)
 app.include_router(orders_router)
 app.include_router(cart_router) 
 app.include_router(client_ws_router)
 app.include_router(websocket_router)
 app.include_router(extras_router)
+app.include_router(metrics_router)
+app.include_router(monitoring_router)
+
+# Los endpoints síncronos corren en el threadpool: envolverlos para perfilarlos allí
+if PROFILING_ENABLED:
+    instrument_routes(app)
+
+@app.on_event("startup")
+async def start_background_workers():
+    # Cola durable de borrado de imágenes antiguas
+    app.state.image_cleanup_task = asyncio.create_task(run_image_cleanup_worker())
+    # Limpieza periódica de carritos abandonados
+    app.state.cart_sweep_task = asyncio.create_task(run_cart_sweep_worker())
+    # Borrado de las claves de idempotencia vencidas
+    app.state.idempotency_sweep_task = asyncio.create_task(run_idempotency_sweep_worker())
+    # Escritura diferida de los carritos en memoria
+    if CART_BACKEND == "memory":
+        app.state.cart_flush_task = asyncio.create_task(run_cart_flush_worker())
+
+@app.on_event("shutdown")
+async def shutdown_background_workers():
+    app.state.image_cleanup_task.cancel()
+    app.state.cart_sweep_task.cancel()
+    app.state.idempotency_sweep_task.cancel()
+    if CART_BACKEND == "memory":
+        app.state.cart_flush_task.cancel()
+        flush_cart_store()
+    # Cerrar el pool de procesos que genera las variantes de imágenes
+    image_service.shutdown()
 
 @app.get("/")
 def read_root():
@@ -0,0 +1,71 @@
+"""
+Migraciones del esquema sobre bases de datos existentes.
+
+create_all solo crea tablas que no existen: los cambios posteriores (índices,
+columnas, restricciones) se aplican con las migraciones de app/db/migrations.
+
+Uso:
+    python migrate.py                    # aplicar las pendientes
+    python migrate.py upgrade [versión]  # hasta una versión
+    python migrate.py downgrade 0001     # revertir una migración
+    python migrate.py status             # aplicadas / pendientes
+    python migrate.py stamp [versión]    # marcar como aplicadas sin ejecutar
+    python migrate.py check              # cambios de modelos sin migración
+    python migrate.py new "nombre"       # crear una migración vacía
+"""
+import sys
+
+from app.db.connection import Base
+from app.db.database import engine
+from app.db.migrate import (applied_versions, discover_migrations, downgrade,
+                            new_migration, schema_differences, stamp, upgrade)
+
+
+def status():
+    with engine.begin() as conn:
+        applied = applied_versions(conn)
+    for migration in discover_migrations():
+        mark = "✅" if migration.version in applied else "⏳"
+        print(f"{mark} {migration.version} {migration.name}: {migration.description}")
+
+
+def check():
+    differences = schema_differences(engine, Base.metadata)
+    for difference in differences:
+        print(f"❌ {difference}")
+    if differences:
+        print("⚠️  Los modelos no coinciden con la base de datos: falta una migración o aplicarla")
+        return 1
+    print("✅ Esquema al día con los modelos")
+    return 0
+
+
+def main(argv):
+    command = argv[0] if argv else "upgrade"
+    target = argv[1] if len(argv) > 1 else "head"
+
+    if command == "status":
+        status()
+    elif command == "upgrade":
+        applied = upgrade(engine, target)
+        for migration in applied:
+            print(f"✅ {migration.version} {migration.name}")
+        print(f"🔄 {len(applied)} migraciones aplicadas" if applied else "✅ Esquema al día")
+    elif command == "downgrade" and len(argv) == 2:
+        migration = downgrade(engine, target)
+        print(f"↩️  {migration.version} {migration.name} revertida")
+    elif command == "stamp":
+        for migration in stamp(engine, target):
+            print(f"🏷️  {migration.version} {migration.name} marcada como aplicada")
+    elif command == "check":
+        return check()
+    elif command == "new" and len(argv) == 2:
+        print(f"📝 {new_migration(argv[1])}")
+    else:
+        print(__doc__)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
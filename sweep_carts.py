@@ -0,0 +1,38 @@
+"""
+Eliminar los carritos abandonados (sin cambios en N días) y sus líneas.
+
+La app lo hace sola cada CART_SWEEP_INTERVAL segundos; esto es para
+ejecutarlo bajo demanda o desde cron.
+
+Uso:
+    python sweep_carts.py                 # CART_ABANDONED_DAYS (30 por defecto)
+    python sweep_carts.py --days 7
+    python sweep_carts.py --dry-run       # solo contar
+"""
+import argparse
+
+from app.db.database import SessionLocal
+from app.services.cart_cleanup_service import (CART_ABANDONED_DAYS,
+                                               CART_SWEEP_BATCH_SIZE,
+                                               sweep_abandoned_carts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=CART_ABANDONED_DAYS)
+    parser.add_argument("--batch-size", type=int, default=CART_SWEEP_BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        report = sweep_abandoned_carts(db, days=args.days, batch_size=args.batch_size, dry_run=args.dry_run)
+
+    verb = "se eliminarían" if report["dry_run"] else "eliminados"
+    print(f"🧹 Carritos sin cambios desde {report['cutoff']}: {report['carts']} carritos y "
+          f"{report['items']} líneas {verb}")
+    if not report["dry_run"]:
+        print(f"   {report['batches']} lotes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2 @@
+# Fixtures compartidas: query_counter limita las consultas SQL de un bloque
+from app.monitoring.testing import query_counter  # noqa: F401
@@ -0,0 +1,180 @@
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401
+import app.models.extra  # noqa: F401
+from app.db.database import Base
+from app.models.cart import CartItem
+from app.models.category import Category
+from app.models.product import Product
+from app.models.user import User
+from app.schemas.cart import CartBatchOperation, CartItemCreate, CartItemUpdate
+from app.services.cart_service import (_bump_version, _plan_cart_operations,
+                                       add_item_to_cart, apply_cart_operations,
+                                       get_cart_with_items, remove_item_from_cart,
+                                       update_cart_item)
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'cart.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def menu(db):
+    user = User(email="cliente@example.com", full_name="Cliente")
+    category = Category(name="Menú")
+    db.add_all([user, category])
+    db.flush()
+    products = [
+        Product(name="Tacos", price=10, stock=5, category_id=category.id),
+        Product(name="Agua", price=2, stock=20, category_id=category.id),
+        Product(name="Flan", price=4, stock=1, category_id=category.id),
+    ]
+    db.add_all(products)
+    db.commit()
+    return user, products
+
+
+def _op(op, **fields):
+    return CartBatchOperation(op=op, **fields)
+
+
+def _products(**stock):
+    catalog = {
+        1: {"name": "Tacos", "is_available": True, "stock": stock.get("tacos", 5)},
+        2: {"name": "Agua", "is_available": True, "stock": 20},
+    }
+    return catalog.get
+
+
+def test_plan_add_update_and_remove_on_the_same_product():
+    lines = {1: {"quantity": 1, "special_instructions": None}}
+    final = _plan_cart_operations([
+        _op("add", product_id=1, quantity=2, special_instructions="sin cebolla"),
+        _op("update", item_id=10, quantity=4),
+        _op("remove", item_id=10),
+        _op("add", product_id=1, quantity=1),
+    ], lines, {10: 1}, _products())
+    assert final == {1: {"quantity": 1, "special_instructions": None}}
+    # Las líneas de entrada no se modifican
+    assert lines == {1: {"quantity": 1, "special_instructions": None}}
+
+
+def test_plan_validates_stock_against_the_final_quantity():
+    lines = {1: {"quantity": 3, "special_instructions": None}}
+    operations = [_op("add", product_id=1, quantity=3), _op("update", item_id=10, quantity=2)]
+    assert _plan_cart_operations(operations, lines, {10: 1}, _products())[1]["quantity"] == 2
+    with pytest.raises(ValueError, match="Stock insuficiente para Tacos"):
+        _plan_cart_operations(operations[:1], lines, {10: 1}, _products())
+
+
+def test_plan_rejects_unknown_items_and_products():
+    with pytest.raises(ValueError, match="Operación 2: Item no encontrado"):
+        _plan_cart_operations([_op("add", product_id=2, quantity=1), _op("remove", item_id=99)], {}, {}, _products())
+    with pytest.raises(ValueError, match="Operación 1: Producto no disponible"):
+        _plan_cart_operations([_op("add", product_id=7, quantity=1)], {}, {}, _products())
+
+
+def test_apply_mixed_operations_and_totals(db, menu):
+    user, (tacos, agua, flan) = menu
+    cart = add_item_to_cart(db, user.id, CartItemCreate(product_id=tacos.id, quantity=1))
+    tacos_item = cart.items[0].id
+    cart = add_item_to_cart(db, user.id, CartItemCreate(product_id=flan.id, quantity=1))
+    flan_item = next(item.id for item in cart.items if item.product_id == flan.id)
+
+    cart = apply_cart_operations(db, user.id, [
+        _op("add", product_id=agua.id, quantity=3),
+        _op("update", item_id=tacos_item, quantity=2),
+        _op("add", product_id=tacos.id, quantity=1),
+        _op("remove", item_id=flan_item),
+    ])
+    quantities = {item.product_id: item.quantity for item in cart.items}
+    assert quantities == {tacos.id: 3, agua.id: 3}
+    assert cart.items_count == 2
+    assert cart.total_amount == 3 * 10 + 3 * 2
+
+    result = apply_cart_operations(db, user.id, [_op("add", product_id=flan.id, quantity=1)], delta=True)
+    assert result["items_count"] == 3
+    assert result["total_amount"] == 3 * 10 + 3 * 2 + 4
+    assert [item.product_id for item in result["changed"]] == [flan.id]
+
+
+def test_apply_rejects_the_whole_batch_on_bad_stock(db, menu):
+    user, (tacos, agua, flan) = menu
+    cart = add_item_to_cart(db, user.id, CartItemCreate(product_id=tacos.id, quantity=2))
+    tacos_item = cart.items[0].id
+
+    with pytest.raises(ValueError, match="Stock insuficiente para Flan"):
+        apply_cart_operations(db, user.id, [
+            _op("add", product_id=agua.id, quantity=1),
+            _op("remove", item_id=tacos_item),
+            _op("add", product_id=flan.id, quantity=2),
+        ])
+    rows = [(item.product_id, item.quantity) for item in db.query(CartItem)]
+    assert rows == [(tacos.id, 2)]
+
+
+def test_bump_version_without_cart(db, menu):
+    user, _ = menu
+    assert _bump_version(db, user.id) is False
+
+
+def test_version_increases_on_each_change(db, menu):
+    user, (tacos, agua, _) = menu
+    result = add_item_to_cart(db, user.id, CartItemCreate(product_id=tacos.id, quantity=1), delta=True)
+    first = result["version"]
+    item_id = result["changed"][0].id
+
+    result = update_cart_item(db, user.id, item_id, CartItemUpdate(quantity=2), delta=True)
+    assert result["version"] == first + 1
+    assert [(item.id, item.quantity, item.subtotal) for item in result["changed"]] == [(item_id, 2, 20)]
+    assert result["removed"] == []
+
+    result = apply_cart_operations(db, user.id, [_op("add", product_id=agua.id, quantity=1)], delta=True)
+    assert result["version"] == first + 2
+
+    result = remove_item_from_cart(db, user.id, item_id, delta=True)
+    assert result["version"] == first + 3
+    assert result["changed"] == [] and result["removed"] == [item_id]
+    assert (result["total_amount"], result["items_count"]) == (2, 1)
+
+
+def test_version_does_not_change_on_a_no_op(db, menu):
+    user, (tacos, _, _) = menu
+    cart = add_item_to_cart(db, user.id, CartItemCreate(product_id=tacos.id, quantity=2))
+    item_id, version = cart.items[0].id, cart.version
+
+    result = update_cart_item(db, user.id, item_id, CartItemUpdate(), delta=True)
+    assert result["version"] == version
+    result = apply_cart_operations(db, user.id, [_op("update", item_id=item_id, quantity=2)], delta=True)
+    assert result["version"] == version
+    assert result["changed"] == [] and result["removed"] == []
+
+
+def test_stale_version_gets_the_full_cart(db, menu):
+    user, (tacos, agua, _) = menu
+    result = add_item_to_cart(db, user.id, CartItemCreate(product_id=tacos.id, quantity=1), delta=True)
+    local_version = result["version"]
+    # Otro dispositivo cambia el carrito: la copia local queda vieja
+    add_item_to_cart(db, user.id, CartItemCreate(product_id=agua.id, quantity=1))
+
+    result = add_item_to_cart(db, user.id, CartItemCreate(product_id=tacos.id, quantity=1), delta=True)
+    assert result["version"] != local_version + 1
+    assert [item.product_id for item in result["changed"]] == [tacos.id]
+    # El cliente pide el carrito completo, con la misma versión
+    cart = get_cart_with_items(db, user.id)
+    assert cart.version == result["version"]
+    assert {item.product_id: item.quantity for item in cart.items} == {tacos.id: 2, agua.id: 1}
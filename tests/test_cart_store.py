@@ -0,0 +1,92 @@
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401
+import app.models.extra  # noqa: F401
+from app.db.database import Base
+from app.models.cart import Cart, CartItem
+from app.models.category import Category
+from app.models.product import Product
+from app.models.user import User
+from app.services import cart_store as cart_store_module
+from app.services.cart_store import CartStore, MemoryCart, MemoryCartLine
+from app.services.catalog_cache import ProductCatalogCache
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'carts.db'}")
+
+    @event.listens_for(engine, "connect")
+    def _foreign_keys(dbapi_connection, _):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def catalog(db, monkeypatch):
+    catalog = ProductCatalogCache()
+    monkeypatch.setattr(cart_store_module, "product_catalog", catalog)
+    return catalog
+
+
+def _memory_carts(db, catalog, count):
+    category = Category(name="Menú")
+    users = [User(email=f"cliente{i}@example.com", full_name=f"Cliente {i}") for i in range(count)]
+    db.add_all([category, *users])
+    db.flush()
+    products = [Product(name=f"Plato {i}", price=10, stock=50, category_id=category.id) for i in range(count)]
+    carts = [Cart(user_id=user.id) for user in users]
+    db.add_all(products + carts)
+    db.commit()
+    catalog.build(db)
+
+    memory_carts = []
+    for cart, product in zip(carts, products):
+        memory_cart = MemoryCart(cart.id, cart.user_id, cart.created_at)
+        memory_cart.lines[product.id] = MemoryCartLine(product.id, 2)
+        memory_cart.touch()
+        memory_carts.append(memory_cart)
+    return memory_carts, products
+
+
+def test_flush_drops_only_the_cart_that_breaks_a_foreign_key(db, catalog):
+    store = CartStore()
+    memory_carts, products = _memory_carts(db, catalog, 3)
+    for memory_cart in memory_carts:
+        store.add(memory_cart)
+    # Otro proceso borró el producto del segundo carrito: sigue en la caché
+    db.query(Product).filter(Product.id == products[1].id).delete()
+    db.commit()
+
+    assert store.flush(db, memory_carts) == 2
+    written = sorted((item.cart_id, item.product_id) for item in db.query(CartItem))
+    assert written == [(memory_carts[0].id, products[0].id), (memory_carts[2].id, products[2].id)]
+    assert store.get(memory_carts[1].user_id) is None
+    assert not memory_carts[0].dirty and not memory_carts[2].dirty
+    assert store.dirty_carts() == []
+
+
+def test_flush_dirty_keeps_writing_batches_after_a_bad_cart(db, catalog):
+    store = CartStore()
+    memory_carts, products = _memory_carts(db, catalog, 4)
+    for memory_cart in memory_carts:
+        store.add(memory_cart)
+    db.query(Product).filter(Product.id == products[0].id).delete()
+    db.commit()
+
+    assert store.flush_dirty(db, batch_size=2) == 4
+    assert db.query(CartItem).count() == 3
+    assert store.dirty_carts() == []
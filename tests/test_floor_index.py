@@ -0,0 +1,132 @@
+import math
+import os
+import random
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401
+import app.models.extra  # noqa: F401
+from app.db.database import Base
+from app.models.table import Table
+from app.services.floor_index import FloorPlanIndex
+
+CELL = 50
+# Coordenadas en múltiplos de media celda: muchas caen justo en un borde
+COORDINATES = [value * CELL / 2 for value in range(-8, 9)]
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'floor.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def floor(db):
+    rng = random.Random(50)
+    tables = [
+        Table(
+            number=number, capacity=rng.choice([2, 4, 6]),
+            position_x=rng.choice(COORDINATES), position_y=rng.choice(COORDINATES),
+            is_available=rng.random() < 0.7, is_active=number % 10 != 0
+        )
+        for number in range(1, 41)
+    ]
+    db.add_all(tables)
+    db.commit()
+    index = FloorPlanIndex(cell_size=CELL)
+    index.build(db)
+    return index, rng
+
+
+def _active(db, positions=None):
+    rows = []
+    for table in db.query(Table).filter(Table.is_active == True):
+        x, y = (positions or {}).get(table.id, (table.position_x, table.position_y))
+        rows.append((table, x, y))
+    return rows
+
+
+def _brute_viewport(rows, min_x, min_y, max_x, max_y):
+    return sorted(table.number for table, x, y in rows if min_x <= x <= max_x and min_y <= y <= max_y)
+
+
+def _brute_nearest(rows, px, py, capacity, limit):
+    found = sorted(
+        (math.hypot(x - px, y - py), table.number) for table, x, y in rows
+        if table.is_available and (not capacity or table.capacity >= capacity)
+    )
+    return [(round(distance, 2), number) for distance, number in found[:limit]]
+
+
+def _brute_collisions(rows, px, py, min_distance, exclude=()):
+    return sorted(
+        table.number for table, x, y in rows
+        if table.id not in exclude and math.hypot(x - px, y - py) < min_distance
+    )
+
+
+def _check(db, index, rng, positions=None):
+    rows = _active(db, positions)
+    for _ in range(200):
+        a, b = rng.choice(COORDINATES), rng.choice(COORDINATES)
+        c, d = rng.choice(COORDINATES), rng.choice(COORDINATES)
+        min_x, max_x, min_y, max_y = min(a, c), max(a, c), min(b, d), max(b, d)
+        assert [table["number"] for table in index.viewport(db, min_x, min_y, max_x, max_y)] == \
+            _brute_viewport(rows, min_x, min_y, max_x, max_y)
+
+        px, py = rng.choice(COORDINATES) + rng.choice([0, 0.5]), rng.choice(COORDINATES)
+        capacity, limit = rng.choice([None, 2, 4, 6, 8]), rng.choice([1, 3, 10])
+        assert [(table["distance"], table["number"]) for table in index.nearest_free(db, px, py, capacity, limit)] == \
+            _brute_nearest(rows, px, py, capacity, limit)
+
+        min_distance = rng.choice([CELL / 2, CELL, 1.5 * CELL])
+        assert sorted(table["number"] for table in index.collisions(db, px, py, min_distance=min_distance)) == \
+            _brute_collisions(rows, px, py, min_distance)
+
+
+def test_queries_match_a_brute_force_scan(db, floor):
+    index, rng = floor
+    _check(db, index, rng)
+
+
+def test_queries_after_moves_match_a_brute_force_scan(db, floor):
+    index, rng = floor
+    positions = {
+        table.id: (rng.choice(COORDINATES), rng.choice(COORDINATES))
+        for table, _, _ in rng.sample(_active(db), 12)
+    }
+    index.move(positions)
+    _check(db, index, rng, positions)
+
+
+def test_points_on_cell_edges(db):
+    db.add_all([
+        Table(number=1, capacity=2, position_x=-CELL, position_y=0),
+        Table(number=2, capacity=4, position_x=CELL, position_y=-CELL),
+        Table(number=3, capacity=6, position_x=0, position_y=CELL, is_available=False),
+    ])
+    db.commit()
+    index = FloorPlanIndex(cell_size=CELL)
+
+    assert [table["number"] for table in index.viewport(db, -CELL, -CELL, CELL, CELL)] == [1, 2, 3]
+    assert [table["number"] for table in index.viewport(db, -CELL, 0, 0, CELL)] == [1, 3]
+    # Empate a la misma distancia: gana el menor número
+    assert [(table["number"], table["distance"]) for table in index.nearest_free(db, 0, -CELL / 2, limit=2)] == \
+        [(1, round(math.hypot(CELL, CELL / 2), 2)), (2, round(math.hypot(CELL, CELL / 2), 2))]
+    assert [table["number"] for table in index.nearest_free(db, 0, 0, capacity=3)] == [2]
+    assert index.nearest_free(db, 0, 0, capacity=8) == []
+    # Justo a la distancia mínima no es choque
+    assert [table["number"] for table in index.collisions(db, 0, 0, min_distance=CELL)] == []
+    assert [table["number"] for table in index.collisions(db, 0, 0, min_distance=CELL + 0.01)] == [1, 3]
+    assert index.collisions(db, 0, 0, exclude=[1, 3], min_distance=CELL + 0.01) == []
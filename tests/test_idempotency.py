@@ -0,0 +1,67 @@
+import os
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401
+import app.models.extra  # noqa: F401
+from app.db.database import Base
+from app.models.idempotency_key import IdempotencyKey
+from app.models.order import Order
+from app.models.user import User
+from app.services.idempotency_service import sweep_expired_keys
+from app.services.order_service import delete_order
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'idempotency.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def _key(db, user, key, locked_at, order=None):
+    record = IdempotencyKey(
+        user_id=user.id, key=key, endpoint="orders", request_hash="0" * 64,
+        status="completado", order_id=order.id if order else None, locked_at=locked_at
+    )
+    db.add(record)
+    db.commit()
+    return record
+
+
+@pytest.fixture
+def user(db):
+    user = User(email="cliente@example.com", full_name="Cliente")
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_sweep_uses_locked_at(db, user):
+    now = datetime.utcnow()
+    _key(db, user, "vieja", now - timedelta(hours=25))
+    _key(db, user, "nueva", now - timedelta(hours=1))
+    assert sweep_expired_keys(db, hours=24, batch_size=1) == 1
+    assert [record.key for record in db.query(IdempotencyKey)] == ["nueva"]
+
+
+def test_delete_order_unlinks_keys(db, user):
+    order = Order(user_id=user.id, order_type="delivery", total_amount=10, status="recibido")
+    db.add(order)
+    db.commit()
+    record = _key(db, user, "pedido", datetime.utcnow(), order)
+
+    delete_order(db, order.id)
+    db.refresh(record)
+    assert record.order_id is None
+    assert db.get(Order, order.id) is None
@@ -0,0 +1,79 @@
+import os
+from datetime import datetime
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401
+import app.models.extra  # noqa: F401
+from app.db.database import Base
+from app.models.order import Order
+from app.models.user import User
+from app.services.order_service import get_orders
+from app.services.pagination import decode_cursor, encode_cursor, next_cursor
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pagination.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def _orders(db, count):
+    user = User(email="cliente@example.com", full_name="Cliente")
+    db.add(user)
+    db.flush()
+    db.add_all([
+        Order(user_id=user.id, order_type="delivery", total_amount=10, status="recibido")
+        for _ in range(count)
+    ])
+    db.commit()
+
+
+def _pages(db, limit):
+    seen, cursor = [], None
+    # Acotado: un cursor que no avanza repetiría la misma página para siempre
+    for _ in range(10):
+        page = get_orders(db, limit=limit, cursor=cursor)
+        seen.extend(order.id for order in page)
+        cursor = next_cursor(page, limit)
+        if cursor is None:
+            break
+    return seen
+
+
+def test_cursor_roundtrip():
+    created_at = datetime(2026, 1, 1, 12, 0, 0, 123456)
+    assert decode_cursor(encode_cursor(created_at, 7)) == (created_at, 7)
+
+
+def test_invalid_cursor():
+    with pytest.raises(ValueError):
+        decode_cursor("no-es-un-cursor")
+
+
+def test_equal_timestamps_across_pages(db):
+    _orders(db, 7)
+    # Como los deja CURRENT_TIMESTAMP: mismo segundo, sin microsegundos
+    db.execute(text("UPDATE orders SET created_at = '2026-01-01 12:00:00'"))
+    db.commit()
+
+    assert _pages(db, limit=3) == [7, 6, 5, 4, 3, 2, 1]
+
+
+def test_mixed_timestamps_across_pages(db):
+    _orders(db, 6)
+    db.execute(text("UPDATE orders SET created_at = '2026-01-01 12:00:00' WHERE id <= 4"))
+    db.execute(text("UPDATE orders SET created_at = '2026-01-01 12:00:01' WHERE id > 4"))
+    db.commit()
+
+    assert _pages(db, limit=2) == [6, 5, 4, 3, 2, 1]
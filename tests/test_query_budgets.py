@@ -0,0 +1,94 @@
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401
+import app.models.extra  # noqa: F401
+from app.db.database import Base
+from app.models.category import Category
+from app.models.extra import Extra
+from app.models.order import Order
+from app.models.product import Product
+from app.models.table import Table
+from app.models.user import User
+from app.schemas.extra import OrderExtraCreate
+from app.schemas.favorite import FavoriteCreate
+from app.schemas.order import OrderCreate, OrderItemCreate
+from app.services.extra_service import add_extras_to_order
+from app.services.favorite_service import FavoriteService
+from app.services.order_service import create_order
+from app.services.table_service import get_tables_with_status
+
+
+# Presupuestos con el menú de 5 productos, 5 extras y 5 mesas: si un cambio
+# agrega consultas el test falla; si las reduce, bajar el número
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'budgets.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def menu(db):
+    user = User(email="cliente@example.com", full_name="Cliente")
+    category = Category(name="Menú")
+    db.add_all([user, category])
+    db.flush()
+    products = [Product(name=f"Plato {i}", price=10, stock=50, category_id=category.id) for i in range(5)]
+    extras = [Extra(name=f"Extra {i}", price=2, stock=50) for i in range(5)]
+    tables = [Table(number=i, capacity=4, position_x=i * 100, position_y=0) for i in range(1, 6)]
+    db.add_all(products + extras + tables)
+    db.commit()
+    return user, products, extras, tables
+
+
+def test_tables_with_status_budget(db, menu, query_counter):
+    user, _, _, tables = menu
+    db.add_all([
+        Order(user_id=user.id, order_type="dine_in", table_id=table.id, total_amount=10, status="recibido")
+        for table in tables
+    ])
+    db.commit()
+    db.expire_all()
+    with query_counter(6, engine=db.get_bind()):
+        assert len(get_tables_with_status(db)) == len(tables)
+
+
+def test_create_order_budget(db, menu, query_counter):
+    user, products, _, tables = menu
+    order = OrderCreate(
+        order_type="dine_in", table_id=tables[0].id,
+        items=[OrderItemCreate(product_id=product.id, quantity=1) for product in products]
+    )
+    db.expire_all()
+    with query_counter(28, engine=db.get_bind()):
+        create_order(db, order, user.id)
+
+
+def test_add_extras_budget(db, menu, query_counter):
+    user, _, extras, _ = menu
+    order = Order(user_id=user.id, order_type="delivery", total_amount=10, status="recibido")
+    db.add(order)
+    db.commit()
+    db.expire_all()
+    with query_counter(21, engine=db.get_bind()):
+        add_extras_to_order(db, order.id, [OrderExtraCreate(extra_id=extra.id, quantity=1) for extra in extras])
+
+
+def test_add_favorite_budget(db, menu, query_counter):
+    user, products, _, _ = menu
+    db.expire_all()
+    with query_counter(7, engine=db.get_bind()):
+        FavoriteService().add_favorite(db, FavoriteCreate(user_id=user.id, product_id=products[0].id), user.id)
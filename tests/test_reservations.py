@@ -0,0 +1,122 @@
+import os
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401
+import app.models.extra  # noqa: F401
+from app.db.database import Base
+from app.models.reservation import Reservation
+from app.models.table import Table
+from app.models.user import User
+from app.schemas.reservation import ReservationCreate
+from app.services import reservation_service
+from app.services.reservation_index import BUFFER, ReservationIndex
+from app.services.reservation_service import create_reservation, find_free_tables
+
+# Mañana a las 19:00 (UTC): siempre en el futuro
+EVENING = datetime.combine(datetime.utcnow().date() + timedelta(days=1), datetime.min.time()) + timedelta(hours=19)
+MINUTE = timedelta(minutes=1)
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'reservations.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def index(monkeypatch):
+    index = ReservationIndex()
+    monkeypatch.setattr(reservation_service, "reservation_index", index)
+    return index
+
+
+@pytest.fixture
+def floor(db):
+    user = User(email="cliente@example.com", full_name="Cliente")
+    tables = [
+        Table(number=1, capacity=2, position_x=0, position_y=0),
+        Table(number=2, capacity=4, position_x=100, position_y=0),
+        Table(number=3, capacity=4, position_x=200, position_y=0),
+        Table(number=4, capacity=6, position_x=300, position_y=0),
+    ]
+    db.add_all([user, *tables])
+    db.commit()
+    return user, tables
+
+
+def _reserve(db, user, table, start, end):
+    """Reserva escrita directo en la BD (como otro proceso)"""
+    db.add(Reservation(table_id=table.id, user_id=user.id, party_size=2, starts_at=start, ends_at=end,
+                       status="confirmada"))
+    db.commit()
+
+
+def _free_numbers(db, party_size, start, end):
+    return [table["number"] for table in find_free_tables(db, party_size, start, end)]
+
+
+def test_buffer_edges(db, index, floor):
+    user, tables = floor
+    _reserve(db, user, tables[0], EVENING, EVENING + timedelta(hours=1))
+    after = EVENING + timedelta(hours=1) + BUFFER
+    before = EVENING - BUFFER
+
+    # Seguidas, con el tiempo de preparación justo entre medio
+    assert 1 in _free_numbers(db, 2, after, after + timedelta(hours=1))
+    assert 1 in _free_numbers(db, 2, before - timedelta(hours=1), before)
+    # Un minuto de solapamiento con el buffer
+    assert 1 not in _free_numbers(db, 2, after - MINUTE, after + timedelta(hours=1))
+    assert 1 not in _free_numbers(db, 2, before - timedelta(hours=1), before + MINUTE)
+    # La BD coincide con el índice
+    assert not reservation_service._overlapping(db, tables[0].id, after, after + timedelta(hours=1))
+    assert reservation_service._overlapping(db, tables[0].id, after - MINUTE, after + timedelta(hours=1))
+
+
+def test_best_fit_picks_the_smallest_table(db, index, floor):
+    user, tables = floor
+    start, end = EVENING, EVENING + timedelta(hours=1)
+    assert _free_numbers(db, 3, start, end) == [2, 3, 4]
+    assert _free_numbers(db, 5, start, end) == [4]
+    assert _free_numbers(db, 7, start, end) == []
+    assert [table["number"] for table in find_free_tables(db, 3, start, end, limit=1)] == [2]
+
+    # A igual capacidad, la que deja el hueco más corto en su agenda
+    _reserve(db, user, tables[2], end + BUFFER + timedelta(minutes=30), end + timedelta(hours=2))
+    index.clear()
+    assert _free_numbers(db, 3, start, end) == [3, 2, 4]
+
+    reservation = create_reservation(db, user.id, ReservationCreate(party_size=3, starts_at=start, ends_at=end))
+    assert reservation.table_number == 3
+
+
+def test_create_retries_the_next_candidate_when_the_index_is_stale(db, index, floor):
+    user, tables = floor
+    start, end = EVENING, EVENING + timedelta(hours=1)
+    assert _free_numbers(db, 3, start, end) == [2, 3, 4]
+    # Otro proceso reserva la mejor mesa: este índice no se entera
+    _reserve(db, user, tables[1], start, end)
+
+    reservation = create_reservation(db, user.id, ReservationCreate(party_size=3, starts_at=start, ends_at=end))
+    assert reservation.table_number == 3
+    # El choque invalidó los días del índice: ya no ofrece la mesa 2
+    assert _free_numbers(db, 3, start, end) == [4]
+
+    _reserve(db, user, tables[3], start, end)
+    with pytest.raises(ValueError, match="No hay mesas disponibles para 3 personas"):
+        create_reservation(db, user.id, ReservationCreate(party_size=3, starts_at=start, ends_at=end))
+    with pytest.raises(ValueError, match="La mesa ya está reservada"):
+        create_reservation(db, user.id, ReservationCreate(
+            party_size=3, starts_at=start, ends_at=end, table_id=tables[1].id
+        ))
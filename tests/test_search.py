@@ -0,0 +1,66 @@
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401
+import app.models.extra  # noqa: F401
+from app.db.database import Base
+from app.models.category import Category
+from app.models.product import Product
+from app.services.search_service import ProductSearchIndex, normalize, stem
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'search.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def _index(db, *names):
+    category = Category(name="Menú")
+    db.add(category)
+    db.flush()
+    db.add_all([Product(name=name, price=10, category_id=category.id) for name in names])
+    db.commit()
+    index = ProductSearchIndex()
+    index.build(db)
+    return index
+
+
+@pytest.mark.parametrize("singular, plural", [
+    ("tomate", "tomates"),
+    ("postre", "postres"),
+    ("limón", "limones"),
+    ("papa", "papas"),
+    ("flor", "flores"),
+    ("pan", "panes"),
+    ("luz", "luces"),
+    ("dulce", "dulces"),
+    ("carne", "carnes"),
+])
+def test_stem_singular_and_plural_match(singular, plural):
+    assert stem(normalize(singular)) == stem(normalize(plural))
+
+
+@pytest.mark.parametrize("query", ["tomate salsa", "tomates salsa"])
+def test_search_matches_singular_and_plural(db, query):
+    index = _index(db, "Salsa de tomates", "Salsa de tomate", "Salsa verde")
+    assert sorted(index.search(query)) == [1, 2]
+
+
+def test_search_postres_and_limones(db):
+    index = _index(db, "Postres del día", "Agua de limones", "Postre de limón", "Limonada")
+    assert sorted(index.search("postres de")) == [1, 3]
+    assert sorted(index.search("postre de")) == [1, 3]
+    assert sorted(index.search("limones de")) == [2, 3]
+    assert sorted(index.search("limón de")) == [2, 3]